@@ -59,5 +59,37 @@ License: BSD 3 clause
     ...
 """
 
-from MissingData import *
-from CategoricalHero import *
+# Public names are resolved lazily (PEP 562): "import STLP_py" loads neither the submodules nor pandas, numpy or scipy,
+# and each submodule is imported the first time one of its names is accessed. scipy is imported only by the functions using it.
+import importlib
+
+_LAZY = {'MissingData': 'missing_data',
+         'CategoricalHero': 'categorical_hero',
+         'CategoricalImputer': 'categorical_hero',
+         'OrdinalEncoder': 'categorical_hero',
+         'HyperLogLog': 'sketches',
+         'CountMinSketch': 'sketches',
+         'BloomFilter': 'sketches',
+         'ColumnSketch': 'sketches',
+         'hash_values': 'sketches',
+         'Profiler': 'instrumentation',
+         'MemoryOptimizer': 'memory_optimizer',
+         'GeneralizedESD': 'outlier_detection',
+         'ResultCache': 'cache',
+         'Pipeline': 'pipeline'}
+
+__all__ = sorted(_LAZY)
+
+
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    value = getattr(importlib.import_module('.' + _LAZY[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
@@ -0,0 +1,227 @@
+"""
+Author: Francesco Capponi <capponi.francesco87@gmail.com>
+
+License: BSD 3 clause
+
+Arrow backend: the helpers below accept Pandas Data Frames and pyarrow Tables/RecordBatches alike, so that Arrow data are
+studied and sliced without being converted to pandas. pyarrow is never imported just to recognize an Arrow object.
+
+"""
+
+
+
+from __future__ import print_function, division
+import sys
+import pandas as pd
+import numpy as np
+
+
+
+def is_arrow(X):
+
+    """
+    True if X is a pyarrow Table or RecordBatch. If pyarrow has not been imported by anybody, X cannot be an Arrow object.
+    """
+
+    pa = sys.modules.get('pyarrow')
+    return pa is not None and isinstance(X, (pa.Table, pa.RecordBatch))
+
+
+
+def column_names(X):
+
+    return list(X.schema.names) if is_arrow(X) else list(X.columns)
+
+
+
+def null_counts(X, labels):
+
+    """
+    Number of missing values of each column, as pandas counts them: the null count kept next to the validity bitmap
+    (no data is read), plus the NaN values of floating point columns.
+
+    Parameters
+    ----------
+    X : Pandas Data Frame or pyarrow Table/RecordBatch
+
+    labels : list-like, shape = [n_features]
+    """
+
+    if not is_arrow(X):
+        return X[labels].isnull().sum()
+
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    counts = pd.Series(0, index=labels, dtype=np.int64)
+    for i in labels:
+        column = X.column(i)
+        counts[i] = column.null_count
+        if pa.types.is_floating(column.type):
+            counts[i] += pc.sum(pc.is_nan(column)).as_py() or 0
+    return counts
+
+
+
+def null_mask(X, labels):
+
+    """
+    Boolean array of shape [n_samples, n_features], True where a value is missing (null or NaN).
+    """
+
+    if not is_arrow(X):
+        return X[labels].isnull().values
+
+    import pyarrow.compute as pc
+    mask = np.empty((len(X), len(labels)), dtype=bool)
+    for j, i in enumerate(labels):
+        mask[:, j] = _to_numpy(pc.is_null(X.column(i), nan_is_null=True))
+    return mask
+
+
+
+def value_counts(X, i):
+
+    """
+    Pandas Series with the number of observations of each category of the column (missing values excluded), most common first.
+    Arrow columns are dictionary encoded (dictionary columns are used as they are): the counts are a bincount of the indices,
+    and only the dictionary is converted to Python objects.
+
+    Parameters
+    ----------
+    X : Pandas Data Frame or pyarrow Table/RecordBatch
+
+    i : string, column name
+    """
+
+    if not is_arrow(X):
+        return X[i].value_counts()
+
+    counts = None
+    for chunk in _chunks(X.column(i)):
+        encoded = _encoded(chunk)
+        indices = _to_numpy(encoded.indices.drop_null())
+        total = pd.Series(np.bincount(indices, minlength=len(encoded.dictionary)), index=encoded.dictionary.to_pandas())
+        counts = total if counts is None else counts.add(total, fill_value=0)
+    if counts is None:
+        return pd.Series([], dtype=np.int64)
+    counts = counts[(counts > 0) & counts.index.notnull()].astype(np.int64)
+    return counts.sort_values(ascending=False, kind='mergesort')
+
+
+
+def isin(X, i, values):
+
+    """
+    Boolean array, True where the value of the column belongs to values (missing values never do).
+    For Arrow columns the lookup is done once per dictionary entry, then spread to the observations through the indices.
+    """
+
+    if not is_arrow(X):
+        return X[i].isin(values).values
+
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    masks = []
+    for chunk in _chunks(X.column(i)):
+        encoded = _encoded(chunk)
+        found = _to_numpy(pc.is_in(encoded.dictionary, value_set=pa.array(list(values), type=encoded.dictionary.type)))
+        indices = _to_numpy(encoded.indices.fill_null(-1))
+        masks.append(np.append(found, False)[indices])
+    return np.concatenate(masks) if masks else np.zeros(0, dtype=bool)
+
+
+
+def is_numeric(X, i):
+
+    if not is_arrow(X):
+        return pd.api.types.is_numeric_dtype(X[i])
+
+    import pyarrow as pa
+    dtype = X.schema.field(i).type
+    return pa.types.is_integer(dtype) or pa.types.is_floating(dtype)
+
+
+
+def numeric_values(X, labels):
+
+    """
+    Float array of shape [n_samples, n_features], NaN where a value is missing.
+    """
+
+    if not is_arrow(X):
+        # nullable integers need an explicit missing value, which makes the copy much slower
+        frame = X[labels]
+        if any(pd.api.types.is_extension_array_dtype(dtype) for dtype in frame.dtypes):
+            return frame.to_numpy(dtype=np.float64, na_value=np.nan)
+        return frame.to_numpy(dtype=np.float64)
+
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    values = np.empty((len(X), len(labels)), dtype=np.float64)
+    for j, i in enumerate(labels):
+        values[:, j] = _to_numpy(pc.cast(X.column(i), pa.float64()))
+    return values
+
+
+
+def column_values(X, i, mask):
+
+    """
+    Numpy array with the values of the column where mask is True; only those are converted, for Arrow columns.
+    """
+
+    if not is_arrow(X):
+        return X[i].values[mask]
+
+    import pyarrow as pa
+    return X.column(i).filter(pa.array(mask)).to_numpy(zero_copy_only=False)
+
+
+
+def select(X, labels):
+
+    """
+    X restricted to the given columns, without copying any data.
+    """
+
+    return X.select(labels) if is_arrow(X) else X[labels]
+
+
+
+def take(X, keep):
+
+    """
+    The observations of X where keep is True. Arrow Tables whose kept observations form a few contiguous runs are
+    rebuilt from zero-copy slices, otherwise (and for RecordBatches) they are filtered.
+    """
+
+    if not is_arrow(X):
+        return X[keep]
+
+    import pyarrow as pa
+    edges = np.flatnonzero(np.diff(np.r_[0, keep.view(np.int8), 0]))
+    starts, stops = edges[::2], edges[1::2]
+    if isinstance(X, pa.Table) and len(starts) <= max(len(X) // 1024, 1):
+        return pa.concat_tables([X.slice(start, stop - start) for start, stop in zip(starts, stops)]) if len(starts) else X.slice(0, 0)
+    return X.filter(pa.array(keep))
+
+
+
+def _chunks(column):
+
+    # the arrays of a Table column (ChunkedArray), or the array of a RecordBatch column
+    return column.chunks if hasattr(column, 'chunks') else [column]
+
+
+
+def _encoded(chunk):
+
+    import pyarrow as pa
+    return chunk if pa.types.is_dictionary(chunk.type) else chunk.dictionary_encode()
+
+
+
+def _to_numpy(array):
+
+    # numpy copy of a boolean or numeric Arrow (chunked) array; nulls of floating point arrays become NaN
+    return np.asarray(array.to_numpy(zero_copy_only=False)) if not hasattr(array, 'chunks') else array.to_numpy()
@@ -0,0 +1,122 @@
+"""
+Author: Francesco Capponi <capponi.francesco87@gmail.com>
+
+License: BSD 3 clause
+
+"""
+
+
+
+from __future__ import print_function, division
+import os
+import pandas as pd
+import numpy as np
+
+
+
+def map_columns(func, X, labels, n_jobs=1, backend='threading'):
+
+    """
+    Applies func to blocks of columns of X and merges the per-column results.
+
+    Parameters
+    ----------
+    func : callable, func(columns, labels) -> dict {label: result}. columns is a mapping label -> Pandas Series.
+    With the "processes" backend it has to be a module level function.
+
+    X : Pandas Data Frame-like, shape = [n_samples, n_features]
+
+    labels : list-like, shape = [n_features]
+    List of strings characterizing the columns.
+
+    n_jobs : int, number of workers. 1 runs serially, -1 uses all the available cores.
+
+    backend : string, values = ["threading","processes"]
+    "threading": the workers share X, nothing is copied
+    "processes": numeric columns are placed in shared memory blocks, only object columns are pickled
+
+    """
+
+    _paramcheck(n_jobs, backend)
+    n_jobs = effective_n_jobs(n_jobs)
+
+    if n_jobs == 1 or len(labels) <= 1:
+        return func(X, labels)
+
+    blocks = [list(b) for b in np.array_split(np.asarray(labels, dtype=object), min(n_jobs, len(labels)))]
+    results = {}
+
+    if backend == 'threading':
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+            for result in pool.map(lambda block: func(X, block), blocks):
+                results.update(result)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        from multiprocessing import shared_memory
+        segments = []
+        try:
+            payloads = []
+            for block in blocks:
+                payload = {}
+                for i in block:
+                    column = X[i]
+                    # extension dtypes (categorical, nullable, tz-aware...) are pickled as they are
+                    if isinstance(column.dtype, np.dtype) and column.dtype.kind in 'biufcmM':
+                        values = column.values
+                        shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+                        segments.append(shm)
+                        np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf)[:] = values
+                        payload[i] = ('shared', shm.name, values.shape, values.dtype.str)
+                    else:
+                        payload[i] = ('pickled', column)
+                payloads.append(payload)
+            with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+                for result in pool.map(_run_shared, [func] * len(blocks), payloads, blocks):
+                    results.update(result)
+        finally:
+            for shm in segments:
+                shm.close()
+                shm.unlink()
+
+    return dict((i, results[i]) for i in labels)
+
+
+
+def effective_n_jobs(n_jobs):
+
+    if n_jobs < 0:
+        return max((os.cpu_count() or 1) + 1 + n_jobs, 1)
+    return n_jobs
+
+
+
+def _paramcheck(n_jobs, backend):
+    if not isinstance(n_jobs, int) or n_jobs == 0:
+        raise ValueError('n_jobs has to be a non zero integer!')
+    elif backend not in ('threading', 'processes'):
+        raise ValueError('backend can assumes only two values: "threading" and "processes"!')
+
+
+
+def _run_shared(func, payload, labels):
+
+    # worker side: columns are rebuilt on top of the shared buffers, without copying them
+    from multiprocessing import shared_memory
+    segments = []
+    columns = {}
+    try:
+        for i in labels:
+            if payload[i][0] == 'shared':
+                name, shape, dtype = payload[i][1:]
+                shm = shared_memory.SharedMemory(name=name)
+                segments.append(shm)
+                columns[i] = pd.Series(np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf), copy=False, name=i)
+            else:
+                columns[i] = payload[i][1]
+        result = func(columns, labels)
+    finally:
+        columns = None
+        for shm in segments:
+            shm.close()
+    return result
@@ -0,0 +1,147 @@
+"""
+Author: Francesco Capponi <capponi.francesco87@gmail.com>
+
+License: BSD 3 clause
+
+Row sampling and interval estimates for the sampled modes of MissingData and CategoricalHero.
+
+"""
+
+
+
+from __future__ import print_function, division
+from statistics import NormalDist
+import pandas as pd
+import numpy as np
+from ._arrow import is_arrow
+
+
+
+SAMPLE_PARAMS = {'size': 100000, 'confidence': 0.95, 'tolerance': None, 'batch': 10000, 'block': 1, 'random_state': None}
+
+
+
+def check_sample_params(params=None):
+
+    """
+    Complete and check the parameters of a sampled run (see SAMPLE_PARAMS for their default values).
+
+    Parameters
+    ----------
+    params : dictionary, any of size (number of sampled rows), confidence (level of the intervals), tolerance (the sampling
+    stops as soon as every interval is narrower than 2 * tolerance), batch (number of rows sampled between two checks of the
+    intervals), block (number of contiguous rows sampled together) and random_state.
+    """
+
+    params = dict(SAMPLE_PARAMS, **(params or {}))
+    if set(params) != set(SAMPLE_PARAMS):
+        raise ValueError('Unknown sampling parameters: %s!' % sorted(set(params) - set(SAMPLE_PARAMS)))
+    for name in ('size', 'batch', 'block'):
+        if not isinstance(params[name], int) or params[name] <= 0:
+            raise ValueError('The %s has to be a positive integer!' % name)
+    if not 0 < params['confidence'] < 1:
+        raise ValueError('The confidence has to be a number between 0 and 1!')
+    if params['tolerance'] is not None and not 0 < params['tolerance'] < 1:
+        raise ValueError('The tolerance has to be a number between 0 and 1!')
+    return params
+
+
+
+def wilson(successes, n, confidence=0.95):
+
+    """
+    Wilson score interval of a proportion, vectorized over successes (and n). It stays within [0, 1] and does not collapse
+    when no success (or no failure) has been observed, which matters for rare missing values and categories.
+    It returns the arrays of lower and upper bounds; with n = 0 the interval is [0, 1].
+    """
+
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    successes = np.asarray(successes, dtype=np.float64)
+    n = np.broadcast_to(np.asarray(n, dtype=np.float64), successes.shape)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        p = successes / n
+        denominator = 1 + z ** 2 / n
+        center = (p + z ** 2 / (2 * n)) / denominator
+        half = z * np.sqrt(p * (1 - p) / n + z ** 2 / (4 * n ** 2)) / denominator
+    # the bounds are exact when no success (or no failure) has been observed, center - half only up to rounding
+    lower = np.where((n > 0) & (successes > 0), np.clip(center - half, 0., 1.), 0.)
+    upper = np.where((n > 0) & (successes < n), np.clip(center + half, 0., 1.), 1.)
+    return lower, upper
+
+
+
+def missed_mass(counts):
+
+    """
+    Good-Turing estimate of the probability that a new observation belongs to a category never seen in the sample:
+    the fraction of the sample made of categories seen exactly once.
+    """
+
+    counts = np.asarray(counts)
+    total = counts.sum()
+    return (counts == 1).sum() / total if total else 1.
+
+
+
+def sample_batches(X, labels, size, batch=10000, block=1, random_state=None):
+
+    """
+    Generator of batches of rows (data frames, or Arrow tables), forming together a random sample of at most size rows.
+    Data frames and Arrow tables are sampled without replacement, in blocks of contiguous rows visited in random order;
+    parquet files by whole row groups, in random order (block sampling). In both cases the sample can be stopped after any batch.
+    csv files and iterables of data frames can only be read sequentially: a reservoir of size rows is filled during a single
+    pass and yielded at the end.
+    """
+
+    rng = np.random.RandomState(random_state)
+
+    if isinstance(X, str) and X.endswith(('.parquet', '.pq')):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError('pyarrow is required to read parquet files!')
+        pfile = pq.ParquetFile(X)
+        for group in rng.permutation(pfile.metadata.num_row_groups):
+            table = pfile.read_row_group(int(group), columns=labels)
+            yield table.slice(0, size)
+            size -= len(table)
+            if size <= 0:
+                return
+
+    elif isinstance(X, pd.DataFrame) or is_arrow(X):
+        n = len(X)
+        order = rng.permutation((n + block - 1) // block)
+        per_batch = max(batch // block, 1)
+        for start in range(0, len(order), per_batch):
+            rows = (order[start:start + per_batch, None] * block + np.arange(block)).ravel()
+            rows = np.sort(rows[rows < n][:size])
+            yield X.take(rows) if is_arrow(X) else X.iloc[rows]
+            size -= len(rows)
+            if size <= 0:
+                return
+
+    else:
+        from .missing_data import _iter_chunks
+        reservoir = None
+        seen = 0
+        for chunk in _iter_chunks(X, labels, batch):
+            chunk = chunk[labels]
+            if reservoir is None or len(reservoir) < size:
+                # filling phase
+                fill = chunk.iloc[:size - (0 if reservoir is None else len(reservoir))]
+                reservoir = fill if reservoir is None else pd.concat([reservoir, fill])
+                chunk = chunk.iloc[len(fill):]
+                seen += len(fill)
+            if len(chunk):
+                # the i-th row read replaces a random slot with probability size / i (Algorithm R), every row of the chunk at once;
+                # when several rows pick the same slot, the last one wins, as in the sequential algorithm
+                slots = rng.randint(0, seen + np.arange(1, len(chunk) + 1))
+                enter = np.flatnonzero(slots < size)
+                slots, last = np.unique(slots[enter][::-1], return_index=True)
+                enter = enter[::-1][last]
+                keep = np.ones(len(reservoir), dtype=bool)
+                keep[slots] = False
+                reservoir = pd.concat([reservoir.iloc[keep], chunk.iloc[enter]])
+                seen += len(chunk)
+        if reservoir is not None:
+            yield reservoir
@@ -0,0 +1,193 @@
+"""
+Author: Francesco Capponi <capponi.francesco87@gmail.com>
+
+License: BSD 3 clause
+
+Command line batch profiler: missing values and categories of every CSV/Parquet file of a directory (or glob).
+
+    stlp-profile data/extracts --output reports --format parquet --jobs -1
+    stlp-profile "data/*.csv.gz" --output reports --top 50
+
+Files are profiled concurrently by a bounded pool of workers (processes by default): at most two files per worker are in
+flight, so that reading the next files overlaps with the computation on the current ones without loading the whole
+directory in memory. Each file is read chunk by chunk and scanned once. Three reports are written to the output directory:
+
+    files      one row per file: rows, columns, seconds, error (if the file could not be profiled)
+    columns    one row per file and column: dtype, rows, missing values and their fraction, number of categories
+    categories one row per file, categorical column and category (the top most frequent ones): count and frequency
+
+"""
+
+from __future__ import print_function, division
+import argparse
+import glob
+import itertools
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+import pandas as pd
+from .missing_data import MissingData, _iter_chunks
+from ._parallel import effective_n_jobs, _paramcheck
+
+
+
+EXTENSIONS = ('.csv', '.csv.gz', '.csv.bz2', '.csv.zip', '.parquet', '.pq')
+
+
+
+def find_files(paths):
+
+    """
+    Returns the sorted list of data files found in paths: each path can be a file, a directory (searched recursively)
+    or a glob pattern.
+    """
+
+    files = set()
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                files.update(os.path.join(root, name) for name in names if name.endswith(EXTENSIONS))
+        elif os.path.isfile(path):
+            files.add(path)
+        else:
+            files.update(name for name in glob.glob(path, recursive=True) if name.endswith(EXTENSIONS))
+    return sorted(files)
+
+
+
+def profile_file(path, chunksize=100000, top=20):
+
+    """
+    Profiles one file in a single chunked scan and returns a dictionary with the "files", "columns" and "categories"
+    records of the file.
+    """
+
+    start = time.perf_counter()
+    md = MissingData()
+    counts = {}
+    dtypes = {}
+    rows = 0
+    for chunk in _iter_chunks(path, None, chunksize):
+        chunk.columns = [str(i) for i in chunk.columns]
+        md.partial_fit(chunk, list(chunk.columns))
+        rows += len(chunk)
+        for i in chunk.columns:
+            column = chunk[i]
+            dtypes.setdefault(i, str(column.dtype))
+            if column.dtype == object or str(column.dtype) == 'category':
+                vc = column.value_counts()
+                counts[i] = vc if i not in counts else counts[i].add(vc, fill_value=0)
+
+    columns = list(dtypes)
+    nulls = md.summary()['Total'].reindex(columns, fill_value=0) if columns else pd.Series(dtype='int64')
+    files = [{'file': path, 'rows': rows, 'columns': len(columns), 'seconds': time.perf_counter() - start, 'error': None}]
+    report = []
+    categories = []
+    for i in columns:
+        report.append({'file': path, 'column': i, 'dtype': dtypes[i], 'rows': rows, 'missing': int(nulls[i]),
+                       'percent': nulls[i] / rows if rows else 0., 'n_categories': len(counts[i]) if i in counts else None})
+        if i in counts:
+            total = counts[i].sum()
+            for category, count in counts[i].sort_values(ascending=False).iloc[:top].items():
+                categories.append({'file': path, 'column': i, 'category': str(category), 'count': int(count),
+                                   'frequency': count / total})
+    return {'files': files, 'columns': report, 'categories': categories}
+
+
+
+def profile_files(files, n_jobs=-1, backend='processes', chunksize=100000, top=20):
+
+    """
+    Profiles the files concurrently and yields the result of profile_file for each of them, in order of completion.
+    Files that cannot be read yield a single "files" record with the error.
+    """
+
+    _paramcheck(n_jobs, backend)
+    n_jobs = effective_n_jobs(n_jobs)
+    Executor = ThreadPoolExecutor if backend == 'threading' else ProcessPoolExecutor
+
+    with Executor(max_workers=n_jobs) as pool:
+        queue = iter(files)
+        pending = {}
+        # bounded number of files in flight: two per worker
+        for path in itertools.islice(queue, 2 * n_jobs):
+            pending[pool.submit(profile_file, path, chunksize, top)] = path
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                path = pending.pop(future)
+                try:
+                    yield future.result()
+                except Exception as error:
+                    yield {'files': [{'file': path, 'rows': None, 'columns': None, 'seconds': None,
+                                      'error': '%s: %s' % (type(error).__name__, error)}],
+                           'columns': [], 'categories': []}
+                for path in itertools.islice(queue, 1):
+                    pending[pool.submit(profile_file, path, chunksize, top)] = path
+
+
+
+def write_reports(results, output, fmt='json'):
+
+    """
+    Combines the per-file results and writes the files, columns and categories reports (JSON or Parquet) to the output directory.
+    Returns the dictionary name -> Pandas Data Frame of the reports.
+    """
+
+    fields = {'files': ['file', 'rows', 'columns', 'seconds', 'error'],
+              'columns': ['file', 'column', 'dtype', 'rows', 'missing', 'percent', 'n_categories'],
+              'categories': ['file', 'column', 'category', 'count', 'frequency']}
+    if not os.path.isdir(output):
+        os.makedirs(output)
+    reports = {}
+    for name in ('files', 'columns', 'categories'):
+        records = [record for result in results for record in result[name]]
+        table = pd.DataFrame(records, columns=fields[name])
+        table = table.sort_values([i for i in ('file', 'column') if i in table.columns], kind='mergesort').reset_index(drop=True)
+        if fmt == 'json':
+            table.to_json(os.path.join(output, name + '.json'), orient='records', indent=1)
+        else:
+            table.to_parquet(os.path.join(output, name + '.parquet'), index=False)
+        reports[name] = table
+    return reports
+
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(prog='stlp-profile', description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('paths', nargs='+', help='files, directories or glob patterns of CSV/Parquet files')
+    parser.add_argument('--output', default='stlp_reports', help='output directory, "stlp_reports" by default')
+    parser.add_argument('--format', choices=['json', 'parquet'], default='json')
+    parser.add_argument('--jobs', type=int, default=-1, help='number of workers, -1 (all the cores) by default')
+    parser.add_argument('--backend', choices=['processes', 'threading'], default='processes')
+    parser.add_argument('--chunksize', type=int, default=100000, help='rows read at a time, 100000 by default')
+    parser.add_argument('--top', type=int, default=20, help='most frequent categories reported per column, 20 by default')
+    args = parser.parse_args(argv)
+
+    files = find_files(args.paths)
+    if not files:
+        print('No CSV/Parquet file found!', file=sys.stderr)
+        return 1
+
+    start = time.perf_counter()
+    results = []
+    for result in profile_files(files, args.jobs, args.backend, args.chunksize, args.top):
+        record = result['files'][0]
+        if record['error']:
+            print('FAILED %s: %s' % (record['file'], record['error']), file=sys.stderr)
+        else:
+            print('%-60s rows=%-10d %8.3f s' % (record['file'], record['rows'], record['seconds']))
+        results.append(result)
+    reports = write_reports(results, args.output, args.format)
+
+    failed = int(reports['files']['error'].notnull().sum())
+    print('%d files profiled in %.3f s, %d failed, reports written to %s'
+          % (len(files) - failed, time.perf_counter() - start, failed, args.output))
+    return 1 if failed else 0
+
+
+
+if __name__ == '__main__':
+    sys.exit(main())
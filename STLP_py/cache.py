@@ -0,0 +1,235 @@
+"""
+Author: Francesco Capponi <capponi.francesco87@gmail.com>
+
+License: BSD 3 clause
+
+"""
+
+
+
+from __future__ import print_function, division
+import os
+import pickle
+import hashlib
+import tempfile
+from collections import OrderedDict
+import pandas as pd
+import numpy as np
+
+
+
+class ResultCache(object):
+
+    """
+    Cache of per-column results (null counts, value counts...), keyed by a hash of the column content and of the computation.
+    Pass an instance as the cache parameter of MissingData and CategoricalHero: columns that did not change since a previous
+    call are not recomputed. Numeric columns are hashed byte-wise, object columns via pd.util.hash_pandas_object, which costs about
+    as much as their value counts: the cache pays off for the expensive per-column work, such as the comparisons made by
+    CategoricalHero.shape_detector, rather than for cheap counts such as the nulls of MissingData.count.
+
+    Parameters
+    ----------
+    max_items : int, number of results kept in memory (least recently used ones are evicted first), 1024 by default.
+
+    directory : string, None by default. If given, results are also pickled to this directory, which acts as a second,
+    persistent, layer: results evicted from memory, or computed by another process, are loaded from there.
+
+    max_bytes : int, maximum size of the cached files, 1 GB by default. The least recently used files are removed first
+    (reads refresh the modification time, so that a new instance on the same directory keeps the same order).
+
+    Attributes
+    ----------
+    hits_ : int, number of results found in the cache (in memory or on disk).
+
+    disk_hits_ : int, number of results found on disk only.
+
+    misses_ : int, number of results that had to be computed.
+
+    """
+
+
+
+    def __init__(self, max_items=1024, directory=None, max_bytes=2**30):
+        if not isinstance(max_items, int) or max_items < 0:
+            raise ValueError('max_items has to be a non negative integer!')
+        elif max_bytes < 0:
+            raise ValueError('max_bytes has to be a non negative number!')
+        self.max_items = max_items
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits_ = 0
+        self.disk_hits_ = 0
+        self.misses_ = 0
+        self.__memory = OrderedDict()
+        self.__disk = OrderedDict()
+        self.__bytes = 0
+        if directory is not None:
+            if not os.path.isdir(directory):
+                os.makedirs(directory)
+            # files already in the directory, least recently used first
+            files = []
+            for name in os.listdir(directory):
+                if name.endswith('.pkl'):
+                    info = os.stat(os.path.join(directory, name))
+                    files.append((info.st_mtime, name[:-4], info.st_size))
+            for mtime, key, size in sorted(files):
+                self.__disk[key] = size
+                self.__bytes += size
+
+
+
+    def key(self, columns, tag):
+
+        """
+        Returns the key of a computation (tag, e.g. "nullcount") on a column (Pandas Series), or on a tuple of columns:
+        it depends on the values and the dtypes of the columns (categories of categorical columns included, used or not),
+        not on their names or indexes.
+        """
+
+        digest = hashlib.sha1(str(tag).encode())
+        for column in (columns if isinstance(columns, tuple) else (columns,)):
+            digest.update(str(column.dtype).encode())
+            values = column.values
+            if isinstance(column.dtype, pd.CategoricalDtype):
+                # categories (in order), ordering flag and codes
+                digest.update(str(column.dtype.ordered).encode())
+                digest.update(pd.util.hash_pandas_object(pd.Series(column.cat.categories), index=False).values)
+                digest.update(np.ascontiguousarray(column.cat.codes.values).view(np.uint8))
+            elif isinstance(values, np.ndarray) and values.dtype.kind in 'biufcmM':
+                # raw bytes of numeric columns are hashed directly
+                digest.update(np.ascontiguousarray(values).view(np.uint8))
+            else:
+                digest.update(pd.util.hash_pandas_object(column, index=False).values)
+        return digest.hexdigest()
+
+
+
+    def get(self, key, default=None):
+
+        """
+        Returns the result stored with the given key, default if there is none.
+        """
+
+        if key in self.__memory:
+            self.__memory.move_to_end(key)
+            self.hits_ += 1
+            return self.__memory[key]
+        path = self.__path(key)
+        if path is not None and os.path.exists(path):
+            try:
+                with open(path, 'rb') as f:
+                    value = pickle.load(f)
+            except (OSError, EOFError, pickle.UnpicklingError):
+                value = None
+            else:
+                os.utime(path, None)
+                self.__track(key, path)
+                self.__remember(key, value)
+                self.hits_ += 1
+                self.disk_hits_ += 1
+                return value
+        self.misses_ += 1
+        return default
+
+
+
+    def put(self, key, value):
+
+        """
+        Stores a result with the given key, in memory and, if a directory was given, on disk.
+        """
+
+        self.__remember(key, value)
+        path = self.__path(key)
+        if path is not None:
+            handle, temporary = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(handle, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, path)
+            self.__track(key, path)
+            self.__evict()
+
+
+
+    def columns(self, X, labels, tag, compute):
+
+        """
+        Returns a dictionary label -> result of the computation tag on each column of X (a Pandas Data Frame, or a tuple of
+        data frames for computations involving the same column of several data frames), calling compute(missing) only for
+        the list of labels whose result is not in the cache; compute has to return a mapping label -> result.
+        """
+
+        frames = X if isinstance(X, tuple) else (X,)
+        keys = dict((i, self.key(tuple(frame[i] for frame in frames), tag)) for i in labels)
+        results = {}
+        missing = []
+        for i in labels:
+            value = self.get(keys[i], _MISSING)
+            if value is _MISSING:
+                missing.append(i)
+            else:
+                results[i] = value
+        if missing:
+            computed = compute(missing)
+            for i in missing:
+                results[i] = computed[i]
+                self.put(keys[i], computed[i])
+        return dict((i, results[i]) for i in labels)
+
+
+
+    def clear(self):
+
+        """
+        Removes every result, from memory and from disk, and resets the counters.
+        """
+
+        self.__memory.clear()
+        for key in self.__disk:
+            try:
+                os.remove(self.__path(key))
+            except OSError:
+                pass
+        self.__disk.clear()
+        self.__bytes = 0
+        self.hits_ = self.disk_hits_ = self.misses_ = 0
+
+    ##############################################################################################
+
+
+
+    def __path(self, key):
+        if self.directory is None:
+            return None
+        return os.path.join(self.directory, key + '.pkl')
+
+
+
+    def __remember(self, key, value):
+        self.__memory[key] = value
+        self.__memory.move_to_end(key)
+        while len(self.__memory) > self.max_items:
+            self.__memory.popitem(last=False)
+
+
+
+    def __track(self, key, path):
+        # (re)inserts a file as the most recently used one
+        size = os.path.getsize(path)
+        self.__bytes += size - self.__disk.pop(key, 0)
+        self.__disk[key] = size
+
+
+
+    def __evict(self):
+        while self.__bytes > self.max_bytes and self.__disk:
+            key, size = self.__disk.popitem(last=False)
+            self.__bytes -= size
+            try:
+                os.remove(self.__path(key))
+            except OSError:
+                pass
+
+
+
+_MISSING = object()
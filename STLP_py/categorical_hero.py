@@ -0,0 +1,1390 @@
+"""
+Author: Francesco Capponi <capponi.francesco87@gmail.com>
+
+License: BSD 3 clause
+
+"""
+
+
+
+from __future__ import print_function, division
+import pickle
+import pandas as pd
+import numpy as np
+from ._parallel import map_columns
+from .sketches import ColumnSketch, HyperLogLog, hash_values
+from .instrumentation import NULL_PROFILER
+from .missing_data import _iter_chunks
+from ._arrow import is_arrow, value_counts, isin, is_numeric, numeric_values, null_mask, column_values, take
+from ._sampling import check_sample_params, sample_batches, wilson, missed_mass
+
+
+
+class CategoricalHero(object):
+
+    """
+    Class for dealing with categorical features belonging to a data set.
+    Data sets can be Pandas Data Frames or pyarrow Tables/RecordBatches (except in approximate mode): Arrow columns are dictionary
+    encoded to get their categories and frequencies, and the sliced tables are built from zero-copy slices whenever possible.
+
+    Parameters
+    ----------
+    n_jobs : int, number of workers used to compute the per-column value counts, 1 by default (serial). -1 uses all the available cores.
+
+    backend : string, values = ["threading","processes"], "threading" by default.
+    With "processes" numeric columns are shared with the workers through shared memory blocks.
+
+    profiler : STLP_py.Profiler instance, None by default. If given, the time (and memory) spent in each phase is recorded
+    in profiler.records_, column by column for value counts, frequency tables and slicing masks.
+
+    cache : STLP_py.ResultCache instance, None by default. If given, the per-column results (value counts, and the whole comparison
+    made by shape_detector) of the columns whose content did not change since a previous call are read from the cache.
+
+    Private parameters
+    ----------
+    __ifselect : boolean variable, used to check whether or not the "shape_detector" method has been called
+    __iffit : boolean variable, used to check whether or not the "fit" method has been called
+    __ifmulti : boolean variable, used to check whether or not the "shape_detector_multi" method has been called
+
+    Attributes
+    ----------
+    detected_ : list, features whose categorical outcomes differ in the two data frames.
+
+    detector_ : dictionary, feature -> data frame with the relative frequencies of its outcomes in the two data frames, and the percentage of missing values.
+
+    sketches_ : dictionary, feature -> (train, test) STLP_py.ColumnSketch. Only in approximate mode.
+
+    cardinality_ : dictionary, feature -> (train, test) estimated number of categories. Only in approximate mode.
+
+    n_mismatching_ : dictionary, feature -> (train, test) number of categories of each data frame absent from the other one,
+    estimated when more than max_report of them were found. Only in approximate mode.
+
+    drift_ : Pandas Data Frame, one row per feature, with population stability index ("psi"), chi-square statistic of homogeneity
+    ("chi2"), its p-value ("p_value"), Jensen-Shannon divergence in bits ("js"), number of categories ("n_categories") and fractions
+    of missing values ("missing_train", "missing_test"). Only in drift mode.
+
+    edges_ : dictionary, numeric feature -> array of its bin edges, shape = [bins + 1], evenly spaced over the train range. Only in numeric mode.
+
+    intervals_ : dictionary, feature -> data frame with the estimated relative frequency ("Frequency") of each category in the train and
+    test samples, and the bounds of its Wilson confidence interval ("Lower", "Upper"); the last row refers to missing values. Only in sampled mode.
+
+    missed_ : Pandas Data Frame, one row per feature, with the Good-Turing estimate of the probability that an observation of the train
+    ("train") or test ("test") set belongs to a category absent from its sample. Only in sampled mode.
+
+    n_sampled_ : tuple, number of observations actually sampled from the train and test sets. Only in sampled mode.
+
+    vocabulary_ : dictionary, feature -> Pandas Index of the categories seen by the fit method (hashed lookups).
+
+    frames_ : list, names of the data frames given to shape_detector_multi.
+
+    mismatched_ : list, features whose categorical outcomes differ across the data frames given to shape_detector_multi.
+
+    presence_ : dictionary, feature -> boolean data frame (categories x data frames), True where the category appears in the data frame.
+
+    frequency_ : dictionary, feature -> data frame (categories x data frames) with the relative frequencies of the categories, NaN when absent,
+    and the percentage of missing values.
+
+    """
+
+
+
+    def __init__(self, n_jobs=1, backend='threading', profiler=None, cache=None):
+        self.n_jobs = n_jobs
+        self.backend = backend
+        self.profiler = profiler
+        self.cache = cache
+        self.__profiler = NULL_PROFILER if profiler is None else profiler
+        self.__ifselect = True
+        self.__iffit = True
+        self.__ifmulti = True
+
+
+
+    def shape_detector(self,X,Y,labels,approximate=False,sketch_params=None,chunksize=100000,drift=False,numeric=None,bins=10,
+                       sampled=False,sample_params=None):
+
+        """
+
+        It detects categorical features with different categorical outcomes in X and Y.
+        It takes two data frames (usually the train and test set of a machine learning experiment), a list of columns and prints out those features whose outcomes differ when moving from one data frame to the other.
+        These information are quite useful since they allow the user to identify that subset of categorical outcomes shared both by train and test set, and use them for training and prediction procedures.
+
+        Parameters
+        ----------
+        X : Pandas Data Frame-like, shape = [n_samplesX, n_features]
+
+        Y : Pandas Data Frame-like, shape = [n_samplesY, n_features]
+
+        labels : list-like, shape = [n_features]
+        List of strings characterizing the columns.
+
+        approximate : boolean, False by default. If True, each column is summarized by bounded-memory sketches (see STLP_py.ColumnSketch):
+        HyperLogLog for the number of categories, count-min sketch for the frequencies and Bloom filter for testing whether a category
+        of one data frame is present in the other one. In this case detector_ only lists the mismatching categories, with estimated
+        frequencies, and a mismatching category may go undetected with probability about fpr. At most max_report mismatching categories
+        of each data frame are kept (the most frequent ones, according to the count-min sketch), so that memory stays bounded also
+        for disjoint high cardinality features; all of them are counted in n_mismatching_, but shape_slicer only drops the observations
+        of the reported ones. X and Y have to be data frames, each column is read twice (sketching, then membership tests).
+
+        sketch_params : dictionary, parameters of STLP_py.ColumnSketch (precision, error, confidence, capacity, fpr), and max_report
+        (1000 by default). Used only if approximate is True.
+
+        chunksize : int, number of rows sketched at each step, 100000 by default. Used only if approximate is True.
+
+        drift : boolean, False by default. If True, the drift statistics of every feature (also those with the same categories in X and Y)
+        are computed from the same value counts, in a single vectorized batch, and stored in drift_. Not available in approximate mode.
+
+        numeric : list-like, numeric features (not in labels), None by default. The range of each of them is split into evenly spaced bins
+        (edges_) over the train values; the test values falling outside the train range, or into bins empty in train (and the train values
+        falling into bins empty in test), are detected like unshared categories. Their detector_ table has one row per interval: below the
+        train range, each bin, above the train range. The bins being evenly spaced, the bin of a value is the integer part of its value
+        rescaled to the train range: the observations are binned arithmetically, for all the numeric features at once, and counted with
+        one bincount per chunk of chunksize observations. In drift mode, the drift statistics of the binned features are added to drift_.
+
+        bins : int, number of bins of each numeric feature, 10 by default.
+
+        sampled : boolean, False by default. If True, the categories and their frequencies are estimated from random samples of X and Y
+        (which can also be paths to csv/parquet files, or iterables of data frames), with confidence intervals (intervals_) and the
+        probability that an observation belongs to a category missed by the sample (missed_). A category absent from one sample may
+        still be present in the whole data set. Numeric features are always binned on the whole data sets, hence X and Y have to be
+        data frames or Arrow tables when numeric is given.
+
+        sample_params : dictionary, sampling parameters: size (number of sampled observations of each data set, 100000 by default),
+        confidence (0.95), tolerance (None: if given, the sampling of a data set stops as soon as every interval, and the missed
+        probability, are within tolerance), batch (number of observations sampled between two checks, 10000), block (number of
+        contiguous observations sampled together, 1) and random_state. See MissingData.count_sample. Used only if sampled is True.
+
+        """
+
+        if approximate:
+            if drift:
+                raise ValueError('drift is not available in approximate mode!')
+            elif sampled:
+                raise ValueError('approximate and sampled modes cannot be combined!')
+            self._approximate_detector(X,Y,labels,sketch_params,chunksize)
+        elif sampled:
+            if numeric is not None and not all(isinstance(Z, pd.DataFrame) or is_arrow(Z) for Z in (X,Y)):
+                raise ValueError('Numeric features are binned on the whole data sets: X and Y have to be dataframes or Arrow tables!')
+            self._sampled_detector(X,Y,labels,sample_params,drift)
+        else:
+            self._shape_detector(X,Y,labels,drift)
+        if numeric is not None:
+            self._numeric_detector(X,Y,numeric,labels,bins,chunksize,drift)
+
+
+
+    def shape_slicer(self,X,Y,choice='train',output='frame'):
+
+        """
+
+        It removes from X or Y (or both) those observations containing categories that are not present in such data sets
+        It takes information from the attribute detector_: hence it has to be used after calling the shape_detector(X,Y,labels) method.
+        Numeric features are handled in the same way, their observations being assigned to the intervals of detector_ through edges_.
+        A single boolean mask is built for each data frame and applied once, so that duplicated indexes are handled correctly.
+
+        Parameters
+        ----------
+        X : Pandas Data Frame-like, shape = [n_samplesX, n_features]
+
+        Y : Pandas Data Frame-like, shape = [n_samplesY, n_features]
+
+        choice : string, values = ["train","test","both"]
+        "train": remove categories that appears in test set but not in train set
+        "test": remove categories that appears in train set but not in test set
+        "both": remove categories that appears in train set but not in test set and viceversa
+
+        output : string, values = ["frame","mask","index"]
+        "frame": return the sliced data frames
+        "mask": return boolean arrays, True for the observations to keep, without copying the data frames
+        "index": return positional indexers of the observations to keep (to be used with iloc), without copying the data frames
+
+        """
+
+        return self._shape_slicer(X,Y,choice,output)
+
+
+    def shape_detector_multi(self,frames,labels,names=None):
+
+        """
+
+        It compares the categorical outcomes of any number of data frames (e.g. train, validation, test and scoring batches) at once.
+        The value counts of each data frame are computed only once; for every feature, the presence of each category in each data frame
+        is stored in presence_ and its relative frequencies in frequency_.
+
+        Parameters
+        ----------
+        frames : list of Pandas Data Frames, or dictionary name -> Pandas Data Frame
+
+        labels : list-like, shape = [n_features]
+        List of strings characterizing the columns.
+
+        names : list-like, names of the data frames when frames is a list, 0,1,2... by default.
+
+        """
+
+        return self._shape_detector_multi(frames,labels,names)
+
+
+
+    def shape_slicer_multi(self,frames,reference=None,output='frame'):
+
+        """
+
+        It removes from the given data frames those observations containing categories missing in some of the reference data frames.
+        It takes information from the attribute presence_: hence it has to be used after calling the shape_detector_multi method.
+
+        Parameters
+        ----------
+        frames : dictionary name -> Pandas Data Frame (any subset of the data frames given to shape_detector_multi),
+        or list of Pandas Data Frames in the same order as frames_
+
+        reference : list-like, names of the data frames whose shared categories are kept, all of them (frames_) by default
+
+        output : string, values = ["frame","mask","index"]
+        "frame": return the sliced data frames
+        "mask": return boolean arrays, True for the observations to keep
+        "index": return positional indexers of the observations to keep
+
+        It returns a dictionary name -> sliced data frame (or mask, or indexer).
+
+        """
+
+        return self._shape_slicer_multi(frames,reference,output)
+
+
+
+    def fit(self,X,labels):
+
+        """
+
+        It stores the set of categorical outcomes of each feature of X (usually the train set), so that new batches,
+        or single observations, can later be checked against it without rescanning X.
+
+        Parameters
+        ----------
+        X : Pandas Data Frame-like, shape = [n_samples, n_features]
+
+        labels : list-like, shape = [n_features]
+        List of strings characterizing the columns.
+
+        """
+
+        return self._fit(X,labels)
+
+
+
+    def transform(self,Y,output='frame'):
+
+        """
+
+        It removes from Y those observations containing categories not seen by the fit method (missing values are kept).
+
+        Parameters
+        ----------
+        Y : Pandas Data Frame-like, shape = [n_samples, n_features]
+
+        output : string, values = ["frame","mask","index"]
+        "frame": return the sliced data frame
+        "mask": return a boolean array, True for the observations to keep
+        "index": return the positional indexer of the observations to keep
+
+        """
+
+        return self._transform(Y,output)
+
+
+
+    def unseen(self,Y):
+
+        """
+
+        It returns a dictionary feature -> array of the categories of Y not seen by the fit method.
+
+        Parameters
+        ----------
+        Y : Pandas Data Frame-like, shape = [n_samples, n_features]
+
+        """
+
+        return self._unseen(Y)
+
+
+
+    def is_known(self,row):
+
+        """
+
+        It checks a single observation against the fitted categories: True if every fitted feature has a known category (or a missing value).
+
+        Parameters
+        ----------
+        row : dictionary-like (dict, Pandas Series), feature -> value
+
+        """
+
+        return self._is_known(row)
+
+
+
+    def save(self,path):
+
+        """
+
+        It saves the fitted categories to disk.
+
+        Parameters
+        ----------
+        path : string, destination file
+
+        """
+
+        return self._save(path)
+
+
+
+    def load(self,path):
+
+        """
+
+        It loads categories previously saved with the save method, as if fit had been called. It returns the instance itself.
+
+        Parameters
+        ----------
+        path : string, file written by the save method
+
+        """
+
+        return self._load(path)
+
+
+#################################################################################################
+
+
+
+    def __sanitycheck(self,X, Y,labels):
+        # sanity check: just to be sure the user is giving the right parameters
+        if not (isinstance(X, pd.DataFrame) or is_arrow(X)):
+            raise ValueError('X has to be a dataframe or an Arrow table!')
+        elif not (isinstance(Y, pd.DataFrame) or is_arrow(Y)):
+            raise ValueError('Y has to be a dataframe or an Arrow table!')
+        elif not isinstance(labels, list):
+            raise ValueError('Labels has to be a list!')
+        elif not all(isinstance(s, str) for s in labels):
+            raise ValueError('Labels has to be a list of strings!')
+
+
+
+    def _shape_detector(self,X,Y,labels,drift=False):
+
+        with self.__phase('sanitycheck'):
+            self.__sanitycheck(X, Y, labels)
+        self.__ifselect = False
+        self.detected_=[]
+        self.detector_={}
+        self.edges_={}
+
+        if self.cache is not None and not (is_arrow(X) or is_arrow(Y)):
+            # the whole comparison of a feature is cached, keyed by the content of its train and test columns
+            results=self.cache.columns((X,Y),labels,'shape_detector',lambda missing: self.__compare(
+                self.__countvalues(X, missing),self.__countvalues(Y, missing),missing,len(X),len(Y)))
+        else:
+            results=self.__compare(self.__countvalues(X, labels),self.__countvalues(Y, labels),labels,len(X),len(Y))
+        self.__collect(results,labels,len(X),len(Y),drift)
+
+
+
+    def _detect_counts(self,counts1,counts2,labels,rows1,rows2,drift=False):
+
+        # shape detection from value counts computed elsewhere (e.g. by Pipeline, during its own scan of the data)
+        self.__ifselect = False
+        self.detected_=[]
+        self.detector_={}
+        self.edges_={}
+        self.__collect(self.__compare(counts1,counts2,labels,rows1,rows2),labels,rows1,rows2,drift)
+
+        return self
+
+
+
+    def __collect(self,results,labels,rows1,rows2,drift=False):
+
+        for i in labels:
+            if results[i][2] is not None:
+                # the cached tables do not know the name of their feature: it is only added here
+                table=results[i][2]
+                self.detected_.append(i)
+                self.detector_[i]=pd.concat([table['train'],table['test']],axis=1,keys=[('train',i),('test',i)])
+
+        if drift:
+            with self.__phase('drift'):
+                self.drift_=_drift_table(dict((i,results[i][0]) for i in labels),dict((i,results[i][1]) for i in labels),
+                                         labels,rows1,rows2)
+
+
+
+    def __compare(self,allcounts1,allcounts2,labels,rows1,rows2):
+
+        # value counts are computed once per column: their index is the set of categorical outcomes
+        # (the same set get_dummies would produce), their values are reused for the frequency table
+        results={}
+        for i in labels:
+            counts1=allcounts1[i]
+            counts2=allcounts2[i]
+            temp1=None
+        # outcomes are unique, hence the two sets are equal if and only if they have the same size
+        # and every outcome of the first one is found (by hash lookup) in the second one
+            with self.__phase('compare', i):
+                check=len(counts1)!=len(counts2) or not counts1.index.isin(counts2.index).all()
+            if check:
+               with self.__phase('frequency_table', i):
+                   # compute Pandas series with index given by the categorical outcome and
+                   # values given by their relative frequence
+                   freq1=(counts1/counts1.sum()).sort_values()
+                   freq2=(counts2/counts2.sum()).sort_values()
+
+                   # compute the percentage of missing values for a given categorical variable
+                   # these are relevant information, since tell the user whether or not a mismatch
+                   # between the categorical outcomes of the two sets could be caused by missing data.
+                   percent1 = (rows1-counts1.sum())/rows1
+                   percent2 = (rows2-counts2.sum())/rows2
+
+                   temp1 = pd.concat([freq1,freq2],axis=1,keys=['train','test'],sort=True)
+                   temp1.loc["% missings"] = [percent1,percent2]
+            results[i]=(counts1,counts2,temp1)
+
+        return results
+
+
+
+    def __phase(self, name, column=None, rows=None):
+        return self.__profiler.phase('CategoricalHero', name, column, rows)
+
+
+
+    def __valuecounts(self, X, labels):
+
+        if self.cache is not None and not is_arrow(X):
+            return self.cache.columns(X, labels, 'value_counts', lambda missing: self.__countvalues(X, missing))
+        return self.__countvalues(X, labels)
+
+
+
+    def __countvalues(self, X, labels):
+
+        if self.n_jobs != 1 and not is_arrow(X):
+            with self.__phase('value_counts', rows=len(X)):
+                return map_columns(_value_counts, X, labels, self.n_jobs, self.backend)
+        counts={}
+        for i in labels:
+            with self.__phase('value_counts', i, len(X)):
+                counts[i]=value_counts(X,i)
+        return counts
+
+
+
+    def _approximate_detector(self,X,Y,labels,sketch_params=None,chunksize=100000):
+
+        self.__sanitycheck(X, Y, labels)
+        if is_arrow(X) or is_arrow(Y):
+            raise ValueError('Arrow tables are not supported in approximate mode!')
+        elif not isinstance(chunksize, int) or chunksize <= 0:
+            raise ValueError('The chunksize has to be a positive integer!')
+        sketch_params = dict(sketch_params or {})
+        max_report = sketch_params.pop('max_report', 1000)
+        if not isinstance(max_report, int) or max_report <= 0:
+            raise ValueError('max_report has to be a positive integer!')
+        self.__ifselect = False
+        self.detected_=[]
+        self.detector_={}
+        self.edges_={}
+        self.sketches_={}
+        self.cardinality_={}
+        self.n_mismatching_={}
+
+        for i in labels:
+            with self.__phase('sketch', i, len(X)+len(Y)):
+                sketch1=ColumnSketch(**sketch_params)
+                sketch2=ColumnSketch(**sketch_params)
+                for start in range(0,len(X),chunksize):
+                    sketch1.update(X[i].iloc[start:start+chunksize])
+                for start in range(0,len(Y),chunksize):
+                    sketch2.update(Y[i].iloc[start:start+chunksize])
+            self.sketches_[i]=(sketch1,sketch2)
+            self.cardinality_[i]=(sketch1.hll_.estimate(),sketch2.hll_.estimate())
+
+            # outcomes of one data frame certainly missing in the other one, according to its Bloom filter
+            with self.__phase('membership', i, len(X)+len(Y)):
+                only1,n1=_unseen(X[i],sketch2.bloom_,sketch1,chunksize,max_report)
+                only2,n2=_unseen(Y[i],sketch1.bloom_,sketch2,chunksize,max_report)
+            self.n_mismatching_[i]=(n1,n2)
+            if only1 or only2:
+                count1=sketch1.n_rows_-sketch1.n_nulls_
+                count2=sketch2.n_rows_-sketch2.n_nulls_
+                freq1=pd.Series(sketch1.cms_.estimate(list(only1))/count1,index=list(only1.values()),dtype=float).sort_values()
+                freq2=pd.Series(sketch2.cms_.estimate(list(only2))/count2,index=list(only2.values()),dtype=float).sort_values()
+                self.detected_.append(i)
+
+                temp1 = pd.concat([freq1,freq2],axis=1,keys=[('train',i),('test',i)],sort=True)
+                temp1.loc["% missings"] = [sketch1.n_nulls_/sketch1.n_rows_,sketch2.n_nulls_/sketch2.n_rows_]
+                self.detector_[i]=temp1
+
+
+
+    def _sampled_detector(self,X,Y,labels,sample_params=None,drift=False):
+
+        if not isinstance(labels, list):
+            raise ValueError('Labels has to be a list!')
+        elif not all(isinstance(s, str) for s in labels):
+            raise ValueError('Labels has to be a list of strings!')
+        params=check_sample_params(sample_params)
+        self.__ifselect = False
+        self.detected_=[]
+        self.detector_={}
+        self.edges_={}
+
+        allcounts=[]
+        rows=[]
+        for Z in (X,Y):
+            counts=dict((i,pd.Series([],dtype=np.int64)) for i in labels)
+            n=0
+            for chunk in sample_batches(Z,labels,params['size'],params['batch'],params['block'],params['random_state']):
+                with self.__phase('value_counts', rows=len(chunk)):
+                    for i in labels:
+                        counts[i]=counts[i].add(value_counts(chunk,i),fill_value=0)
+                    n+=len(chunk)
+                if params['tolerance'] is not None and self.__tight(counts,n,params['confidence'],params['tolerance']):
+                    break
+            allcounts.append(dict((i,c.astype(np.int64).sort_values(ascending=False,kind='mergesort')) for i,c in counts.items()))
+            rows.append(n)
+
+        self.__collect(self.__compare(allcounts[0],allcounts[1],labels,rows[0],rows[1]),labels,rows[0],rows[1],drift)
+        self.n_sampled_=tuple(rows)
+
+        with self.__phase('intervals'):
+            self.intervals_={}
+            for i in labels:
+                # categories absent from one sample have a null estimate, but not a null upper bound
+                categories=allcounts[0][i].index.union(allcounts[1][i].index,sort=False)
+                sides=[]
+                for counts,n in zip(allcounts,rows):
+                    frequency,lower,upper=_frequency_intervals(counts[i].reindex(categories,fill_value=0).values,n,params['confidence'])
+                    sides.append(pd.DataFrame({'Frequency':frequency,'Lower':lower,'Upper':upper},index=list(categories)+["% missings"]))
+                self.intervals_[i]=pd.concat(sides,axis=1,keys=['train','test'])
+            self.missed_=pd.DataFrame({'train':[missed_mass(allcounts[0][i].values) for i in labels],
+                                       'test':[missed_mass(allcounts[1][i].values) for i in labels]},index=labels)
+
+
+
+    def __tight(self,counts,n,confidence,tolerance):
+
+        # every frequency (and fraction of missing values) is known within tolerance, and unseen categories are unlikely
+        for i in counts:
+            frequency,lower,upper=_frequency_intervals(counts[i].values,n,confidence)
+            if np.any(upper-frequency>tolerance) or np.any(frequency-lower>tolerance) or missed_mass(counts[i].values)>tolerance:
+                return False
+        return True
+
+
+
+    def _numeric_detector(self,X,Y,numeric,labels,bins=10,chunksize=100000,drift=False):
+
+        # called right after the categorical detection, whose results are extended
+        with self.__phase('sanitycheck'):
+            self.__sanitycheck(X, Y, numeric)
+            if any(i in labels for i in numeric):
+                raise ValueError('Numeric features cannot be in labels too!')
+            elif not all(is_numeric(X,i) and is_numeric(Y,i) for i in numeric):
+                raise ValueError('Numeric features have to be numeric columns!')
+            elif not isinstance(bins, int) or bins <= 0:
+                raise ValueError('The number of bins has to be a positive integer!')
+            elif not isinstance(chunksize, int) or chunksize <= 0:
+                raise ValueError('The chunksize has to be a positive integer!')
+
+        with self.__phase('range', rows=len(X)):
+            lower,upper=_numeric_range(X,numeric,chunksize)
+        with self.__phase('bins', rows=len(X)+len(Y)):
+            counts1=_numeric_counts(X,numeric,lower,upper,bins,chunksize)
+            counts2=_numeric_counts(Y,numeric,lower,upper,bins,chunksize)
+
+        # the last edge is the train maximum itself, so that shape_slicer rebuilds exactly the same range from edges_
+        edges=lower+np.where(upper>lower,upper-lower,0.)*np.linspace(0.,1.,bins+1)[:,None]
+        edges[-1]=upper
+        for j,i in enumerate(numeric):
+            self.edges_[i]=edges[:,j]
+            # column 0 holds the missing values, the others the intervals: below the range, the bins, above the range
+            c1=counts1[j]
+            c2=counts2[j]
+            if ((c1[1:]>0)!=(c2[1:]>0)).any():
+                with self.__phase('frequency_table', i):
+                    with np.errstate(invalid='ignore',divide='ignore'):
+                        freq1=np.where(c1[1:]>0,c1[1:]/c1[1:].sum(),np.nan)
+                        freq2=np.where(c2[1:]>0,c2[1:]/c2[1:].sum(),np.nan)
+                    temp1=pd.DataFrame({('train',i):freq1,('test',i):freq2},index=pd.Index(_intervals(edges[:,j]),dtype=object))
+                    temp1.loc["% missings"]=[c1[0]/len(X) if len(X) else np.nan,c2[0]/len(Y) if len(Y) else np.nan]
+                self.detected_.append(i)
+                self.detector_[i]=temp1
+
+        if drift:
+            with self.__phase('drift'):
+                # the intervals play the role of the categories
+                binned1=dict((i,pd.Series(counts1[j,1:]).loc[lambda c: c>0]) for j,i in enumerate(numeric))
+                binned2=dict((i,pd.Series(counts2[j,1:]).loc[lambda c: c>0]) for j,i in enumerate(numeric))
+                table=_drift_table(binned1,binned2,list(numeric),len(X),len(Y))
+                self.drift_=pd.concat([self.drift_,table]) if labels else table
+
+
+
+    def _shape_slicer(self,X,Y,choice="train",output="frame"):
+
+        if not (isinstance(X, pd.DataFrame) or is_arrow(X)):
+            raise ValueError('X has to be a dataframe or an Arrow table!')
+        elif not (isinstance(Y, pd.DataFrame) or is_arrow(Y)):
+            raise ValueError('Y has to be a dataframe or an Arrow table!')
+
+        if self.__ifselect:
+            raise ValueError('You have to call the shape_detector( X,Y, labels) method first!')
+
+        if choice not in ("train","test","both"):
+            raise ValueError('choice can assumes only three values: "train","test" and "both"!')
+        elif output not in ("frame","mask","index"):
+            raise ValueError('output can assumes only three values: "frame","mask" and "index"!')
+
+        # observations to erase are accumulated in one mask per data frame
+        eraseX=np.zeros(len(X),dtype=bool)
+        eraseY=np.zeros(len(Y),dtype=bool)
+
+        for i in self.detected_:
+            if choice=="train":
+                idx=self.detector_[i]["test"].isnull().any(axis=1)
+            elif choice=="test":
+                idx=self.detector_[i]["train"].isnull().any(axis=1)
+            else:
+                idx=self.detector_[i].isnull().any(axis=1)
+            if i in self.edges_:
+                # intervals to drop, looked up by the code of each observation; the last slot (code -1) holds the missing values
+                drop=np.append(idx.values[:-1],False)
+                with self.__phase('isin', i):
+                    if choice in ("train","both"):
+                        eraseX|=drop[_numeric_codes(numeric_values(X,[i]),self.edges_[i][:1],self.edges_[i][-1:],len(self.edges_[i])-1)[:,0]]
+                    if choice in ("test","both"):
+                        eraseY|=drop[_numeric_codes(numeric_values(Y,[i]),self.edges_[i][:1],self.edges_[i][-1:],len(self.edges_[i])-1)[:,0]]
+                continue
+            toget=self.detector_[i][idx].index.values
+
+            with self.__phase('isin', i):
+                if choice in ("train","both"):
+                    eraseX|=isin(X,i,toget)
+                if choice in ("test","both"):
+                    eraseY|=isin(Y,i,toget)
+
+        if output=="mask":
+            return ~eraseX,~eraseY
+        elif output=="index":
+            return np.flatnonzero(~eraseX),np.flatnonzero(~eraseY)
+
+        with self.__phase('take', rows=len(X)+len(Y)):
+            if eraseX.any():
+                X=take(X,~eraseX)
+            if eraseY.any():
+                Y=take(Y,~eraseY)
+
+        return X,Y
+
+
+
+    def _shape_detector_multi(self,frames,labels,names=None):
+
+        frames=_named_frames(frames,names)
+        with self.__phase('sanitycheck'):
+            if len(frames)<2:
+                raise ValueError('At least two data frames are needed!')
+            for name,X in frames:
+                self.__sanitycheck(X, X, labels)
+        self.frames_=[name for name,X in frames]
+        self.mismatched_=[]
+        self.presence_={}
+        self.frequency_={}
+
+        allcounts=[self.__valuecounts(X, labels) for name,X in frames]
+
+        for i in labels:
+            with self.__phase('frequency_table', i):
+                # a single alignment of the N value counts: absent categories become NaN
+                counts=pd.concat([c[i] for c in allcounts],axis=1,keys=self.frames_,sort=True)
+                totals=counts.sum()
+                presence=counts.notnull()
+                frequency=counts/totals
+                frequency.loc["% missings"]=[(len(X)-totals[name])/len(X) if len(X) else np.nan for name,X in frames]
+            self.presence_[i]=presence
+            self.frequency_[i]=frequency
+            if not presence.values.all():
+                self.mismatched_.append(i)
+        self.__ifmulti = False
+
+
+
+    def _shape_slicer_multi(self,frames,reference=None,output="frame"):
+
+        if self.__ifmulti:
+            raise ValueError('You have to call the shape_detector_multi( frames, labels) method first!')
+        frames=_named_frames(frames,None if isinstance(frames,dict) else self.frames_)
+        reference=self.frames_ if reference is None else list(reference)
+        if not all(name in self.frames_ for name in reference):
+            raise ValueError('reference has to be a subset of frames_!')
+        elif output not in ("frame","mask","index"):
+            raise ValueError('output can assumes only three values: "frame","mask" and "index"!')
+
+        erase=dict((name,np.zeros(len(X),dtype=bool)) for name,X in frames)
+        for i in self.mismatched_:
+            # categories missing in at least one reference data frame
+            shared=self.presence_[i][reference].values.all(axis=1)
+            toget=self.presence_[i].index.values[~shared]
+            if not len(toget):
+                continue
+            with self.__phase('isin', i):
+                for name,X in frames:
+                    erase[name]|=isin(X,i,toget)
+
+        if output=="mask":
+            return dict((name,~erase[name]) for name,X in frames)
+        elif output=="index":
+            return dict((name,np.flatnonzero(~erase[name])) for name,X in frames)
+        with self.__phase('take', rows=sum(len(X) for name,X in frames)):
+            return dict((name,take(X,~erase[name]) if erase[name].any() else X) for name,X in frames)
+
+
+
+    def _fit(self,X,labels):
+
+        self.__sanitycheck(X, X, labels)
+
+        allcounts=self.__valuecounts(X, labels)
+        self.vocabulary_=dict((i,_vocabulary(allcounts[i].index)) for i in labels)
+        self.__iffit = False
+
+        return self
+
+
+
+    def __checkfit(self):
+        if self.__iffit:
+            raise ValueError('You have to call the fit( X, labels) method first!')
+
+
+
+    def __known(self,Y):
+        # one hash lookup per observation: get_indexer relies on the hash table cached by each vocabulary
+        known={}
+        for i,vocabulary in self.vocabulary_.items():
+            if is_arrow(Y):
+                known[i]=isin(Y,i,vocabulary)|null_mask(Y,[i])[:,0]
+            else:
+                column=Y[i]
+                known[i]=(vocabulary.get_indexer(column.values)>=0)|column.isnull().values
+        return known
+
+
+
+    def _transform(self,Y,output="frame"):
+
+        self.__checkfit()
+        if not (isinstance(Y, pd.DataFrame) or is_arrow(Y)):
+            raise ValueError('Y has to be a dataframe or an Arrow table!')
+        elif output not in ("frame","mask","index"):
+            raise ValueError('output can assumes only three values: "frame","mask" and "index"!')
+
+        keep=np.ones(len(Y),dtype=bool)
+        for mask in self.__known(Y).values():
+            keep&=mask
+
+        if output=="mask":
+            return keep
+        elif output=="index":
+            return np.flatnonzero(keep)
+        return Y if keep.all() else take(Y,keep)
+
+
+
+    def _unseen(self,Y):
+
+        self.__checkfit()
+        if not (isinstance(Y, pd.DataFrame) or is_arrow(Y)):
+            raise ValueError('Y has to be a dataframe or an Arrow table!')
+
+        known=self.__known(Y)
+        return dict((i,pd.unique(column_values(Y,i,~known[i]))) for i in self.vocabulary_)
+
+
+
+    def _is_known(self,row):
+
+        self.__checkfit()
+        for i,vocabulary in self.vocabulary_.items():
+            value=row[i]
+            if not pd.isnull(value) and value not in vocabulary:
+                return False
+        return True
+
+
+
+    def _save(self,path):
+
+        self.__checkfit()
+        state=dict((i,vocabulary.values) for i,vocabulary in self.vocabulary_.items())
+        with open(path,'wb') as f:
+            pickle.dump(state,f,protocol=pickle.HIGHEST_PROTOCOL)
+
+
+
+    def _load(self,path):
+
+        with open(path,'rb') as f:
+            state=pickle.load(f)
+        self.vocabulary_=dict((i,_vocabulary(values)) for i,values in state.items())
+        self.__iffit = False
+
+        return self
+
+
+
+class CategoricalImputer(object):
+
+    """
+    Frequency based imputation of missing values in categorical features: each missing value is replaced by a category
+    drawn at random according to the frequencies observed, for its feature, during the fit.
+
+    Parameters
+    ----------
+    random_state : int or None, seed of the random number generator, None by default.
+
+    Private parameters
+    ----------
+    __counts : dictionary, feature -> Pandas Series with the number of observations of each category
+    __iffit : boolean variable, used to check whether or not the "fit" method has been called
+    __rng : numpy RandomState, reset by each fit
+
+    Attributes
+    ----------
+    labels_ : list, the features the imputer has been fitted on.
+
+    categories_ : dictionary, feature -> array of its categories.
+
+    probabilities_ : dictionary, feature -> array of the relative frequencies of its categories.
+
+    """
+
+
+
+    def __init__(self, random_state=None):
+        self.random_state = random_state
+        self.labels_ = []
+        self.__counts = {}
+        self.__iffit = True
+        self.__rng = None
+
+
+
+    def fit(self, X, labels, chunksize=100000):
+
+        """
+            Computes the frequencies of the categories of each feature.
+            Parameters
+            ----------
+            X : Pandas Data Frame-like, path to a csv/parquet file or iterable of Pandas Data Frames (see MissingData.count_stream)
+
+            labels : list-like, shape = [n_features]
+            List of strings characterizing the columns.
+
+            chunksize : int, number of rows read at each step when X is a path, 100000 by default
+        """
+
+        return self._fit(X, labels, chunksize)
+
+
+
+    def partial_fit(self, X, labels=None):
+
+        """
+            Updates the frequencies with a new chunk of observations.
+            Parameters
+            ----------
+            X : Pandas Data Frame-like, shape = [n_samples, n_features]
+
+            labels : list-like, shape = [n_features]
+            List of strings characterizing the columns. By default, the features already fitted.
+        """
+
+        return self._partial_fit(X, labels)
+
+
+
+    def transform(self, X):
+
+        """
+            Returns a new data frame where missing values of the fitted features have been imputed.
+            All the missing values are drawn in a single vectorized pass, and only the imputed columns are copied.
+            Parameters
+            ----------
+            X : Pandas Data Frame-like, shape = [n_samples, n_features]
+        """
+
+        return self._transform(X)
+
+
+
+    def transform_stream(self, X, chunksize=100000):
+
+        """
+            Generator of imputed chunks, for data sets larger than RAM.
+            Parameters
+            ----------
+            X : path to a csv/parquet file, or iterable of Pandas Data Frames
+
+            chunksize : int, number of rows read at each step when X is a path, 100000 by default
+        """
+
+        if self.__iffit:
+            raise ValueError('You have to call the fit( X, labels) method first!')
+        for chunk in _iter_chunks(X, None, chunksize):
+            yield self._transform(chunk)
+
+
+
+    def fit_transform(self, X, labels):
+
+        """
+            Fits the imputer on X and returns X imputed.
+        """
+
+        self._fit(X, labels)
+        return self._transform(X)
+
+    ##############################################################################################
+
+
+
+    def __sanitycheck(self, X, labels):
+        if not isinstance(X, pd.DataFrame):
+            raise ValueError('X has to be a dataframe!')
+        elif not isinstance(labels, list):
+            raise ValueError('Labels has to be a list!')
+        elif not all(isinstance(s, str) for s in labels):
+            raise ValueError('Labels has to be a list of strings!')
+
+
+
+    def _fit(self, X, labels, chunksize=100000):
+
+        self.__counts = {}
+        self.labels_ = []
+        for chunk in _iter_chunks(X, labels, chunksize):
+            self._partial_fit(chunk, labels)
+        self.__rng = np.random.RandomState(self.random_state)
+
+        return self
+
+
+
+    def _partial_fit(self, X, labels=None):
+
+        if labels is None:
+            if not self.labels_:
+                raise ValueError('Labels have to be given at the first call!')
+            labels = self.labels_
+        self.__sanitycheck(X, labels)
+
+        for i in labels:
+            counts = X[i].value_counts()
+            if i in self.__counts:
+                counts = self.__counts[i].add(counts, fill_value=0)
+            self.__counts[i] = counts
+        self.labels_ = list(self.__counts)
+
+        # categories without any observation cannot be drawn
+        self.categories_ = {}
+        self.probabilities_ = {}
+        for i, counts in self.__counts.items():
+            counts = counts[counts > 0]
+            self.categories_[i] = counts.index.values
+            self.probabilities_[i] = (counts / counts.sum()).values
+        if self.__rng is None:
+            self.__rng = np.random.RandomState(self.random_state)
+        self.__iffit = False
+
+        return self
+
+
+
+    def _transform(self, X):
+
+        if self.__iffit:
+            raise ValueError('You have to call the fit( X, labels) method first!')
+        elif not isinstance(X, pd.DataFrame):
+            raise ValueError('X has to be a dataframe!')
+
+        labels = []
+        positions = []
+        for i in self.labels_:
+            if len(self.categories_[i]):
+                missing = np.flatnonzero(X[i].isnull().values)
+                if len(missing):
+                    labels.append(i)
+                    positions.append(missing)
+        if not labels:
+            return X
+
+        # inverse-CDF sampling of every missing value at once: the cumulative distribution of the j-th feature is
+        # shifted by j, so that a single searchsorted over the concatenated distributions gives the global category code
+        sizes = np.array([len(self.categories_[i]) for i in labels])
+        cdf = np.concatenate([np.cumsum(self.probabilities_[i]) + j for j, i in enumerate(labels)])
+        cdf[np.cumsum(sizes) - 1] = np.arange(1, len(labels) + 1)
+        segment = np.repeat(np.arange(len(labels)), [len(p) for p in positions])
+        codes = np.searchsorted(cdf, self.__rng.random_sample(len(segment)) + segment, side='right')
+
+        X = X.copy(deep=False)
+        start = 0
+        offset = 0
+        for i, missing, size in zip(labels, positions, sizes):
+            # draws are taken from the categories of the feature itself, which keeps their dtype (and the column's one)
+            column = X[i].copy()
+            column.iloc[missing] = self.categories_[i][codes[start:start + len(missing)] - offset]
+            X[i] = column
+            start += len(missing)
+            offset += size
+
+        return X
+
+
+
+class OrdinalEncoder(object):
+
+    """
+    Ordinal encoding of categorical features. Categories are sorted alphabetically (case insensitive) and mapped to 0, 1, 2, ...;
+    features sharing the same set of categories share the same vocabulary and are encoded together, in a single pass.
+    Codes are stored in the smallest integer dtype that fits the vocabulary (int8, int16, int32 or int64).
+
+    Parameters
+    ----------
+    handle_unknown : string, values = ["missing","error"], "missing" by default.
+    "missing": categories not seen by the fit method are encoded as -1, like missing values
+    "error": categories not seen by the fit method raise a ValueError
+
+    Private parameters
+    ----------
+    __iffit : boolean variable, used to check whether or not the "fit" method has been called
+
+    Attributes
+    ----------
+    vocabularies_ : dictionary, feature -> array of its sorted categories.
+
+    groups_ : list of (array of categories, list of features sharing them).
+
+    dtypes_ : dictionary, feature -> numpy integer dtype of its codes.
+
+    """
+
+
+
+    def __init__(self, handle_unknown='missing'):
+        self.handle_unknown = handle_unknown
+        self.__iffit = True
+
+
+
+    def fit(self, X, labels):
+
+        """
+            Computes the vocabulary of each feature and groups the features with the same vocabulary.
+            Parameters
+            ----------
+            X : Pandas Data Frame-like, shape = [n_samples, n_features]
+
+            labels : list-like, shape = [n_features]
+            List of strings characterizing the columns.
+        """
+
+        return self._fit(X, labels)
+
+
+
+    def transform(self, X):
+
+        """
+            Returns a data frame with the codes of the fitted features (-1 for missing values).
+            Parameters
+            ----------
+            X : Pandas Data Frame-like, shape = [n_samples, n_features]
+        """
+
+        return self._transform(X)
+
+
+
+    def fit_transform(self, X, labels):
+
+        """
+            Fits the encoder on X and returns the codes of X.
+        """
+
+        self._fit(X, labels)
+        return self._transform(X)
+
+    ##############################################################################################
+
+
+
+    def __sanitycheck(self, X, labels):
+        if not isinstance(X, pd.DataFrame):
+            raise ValueError('X has to be a dataframe!')
+        elif not isinstance(labels, list):
+            raise ValueError('Labels has to be a list!')
+        elif not all(isinstance(s, str) for s in labels):
+            raise ValueError('Labels has to be a list of strings!')
+        elif self.handle_unknown not in ('missing', 'error'):
+            raise ValueError('handle_unknown can assumes only two values: "missing" and "error"!')
+
+
+
+    def _fit(self, X, labels):
+
+        self.__sanitycheck(X, labels)
+
+        self.vocabularies_ = {}
+        groups = {}
+        for i in labels:
+            vocabulary = sorted(X[i].dropna().unique(), key=lambda c: str(c).lower())
+            self.vocabularies_[i] = np.array(vocabulary, dtype=object)
+            groups.setdefault(tuple(vocabulary), []).append(i)
+
+        self.groups_ = [(self.vocabularies_[group[0]], group) for group in groups.values()]
+        self.dtypes_ = dict((i, _code_dtype(len(self.vocabularies_[i]))) for i in labels)
+        self.__iffit = False
+
+        return self
+
+
+
+    def _transform(self, X):
+
+        if self.__iffit:
+            raise ValueError('You have to call the fit( X, labels) method first!')
+        elif not isinstance(X, pd.DataFrame):
+            raise ValueError('X has to be a dataframe!')
+
+        encoded = {}
+        for vocabulary, group in self.groups_:
+            # the columns of a group are stacked and encoded by a single Categorical
+            values = X[group].values.ravel(order='F')
+            codes = pd.Categorical(values, categories=vocabulary).codes
+            unknown = (codes == -1) & pd.notnull(values)
+            if unknown.any() and self.handle_unknown == 'error':
+                raise ValueError('Unknown categories found: %s!' % list(pd.unique(values[unknown]))[:10])
+            codes = codes.astype(self.dtypes_[group[0]], copy=False).reshape(len(X), len(group), order='F')
+            for j, i in enumerate(group):
+                encoded[i] = codes[:, j]
+
+        return pd.DataFrame(dict((i, encoded[i]) for i in self.vocabularies_), index=X.index)
+
+
+
+def _value_counts(columns, labels):
+
+    return dict((i, columns[i].value_counts()) for i in labels)
+
+
+
+def _drift_table(counts1,counts2,labels,rows1,rows2,epsilon=1e-4):
+
+    from scipy import stats, special
+    # all the (feature, category) pairs are aligned at once: categories of every feature are factorized together,
+    # so that each pair becomes an integer (feature code * number of categories + category code); every statistic
+    # is then a sum over the categories of each feature, i.e. a weighted bincount over the feature codes
+    keys=pd.Index(labels)
+    k=len(labels)
+    sizes=[len(counts1[i]) for i in labels]+[len(counts2[i]) for i in labels]
+    values=[np.asarray(counts1[i].index,dtype=object) for i in labels]+[np.asarray(counts2[i].index,dtype=object) for i in labels]
+    codes,uniques=pd.factorize(np.concatenate(values) if values else np.array([],dtype=object))
+    pairs=np.repeat(np.tile(np.arange(k),2),sizes)*max(len(uniques),1)+codes
+    slots,inverse=np.unique(pairs,return_inverse=True)
+    n=sum(sizes[:k])
+    counts=[np.concatenate([counts1[i].values for i in labels]+[np.zeros(0)]),
+            np.concatenate([counts2[i].values for i in labels]+[np.zeros(0)])]
+    c1=np.bincount(inverse[:n],counts[0].astype(np.float64),minlength=len(slots))
+    c2=np.bincount(inverse[n:],counts[1].astype(np.float64),minlength=len(slots))
+    group=slots//max(len(uniques),1)
+
+    n1=np.bincount(group,c1,minlength=k)
+    n2=np.bincount(group,c2,minlength=k)
+    categories=np.bincount(group,minlength=k)
+    with np.errstate(invalid='ignore',divide='ignore'):
+        p=c1/n1[group]
+        q=c2/n2[group]
+
+        # population stability index, smoothed so that categories missing on one side give a finite contribution
+        ps=np.maximum(p,epsilon)
+        qs=np.maximum(q,epsilon)
+        psi=np.bincount(group,(ps-qs)*np.log(ps/qs),minlength=k)
+
+        # chi-square test of homogeneity on the 2 x n_categories contingency table
+        total=c1+c2
+        e1=total*(n1/(n1+n2))[group]
+        e2=total*(n2/(n1+n2))[group]
+        chi2=np.bincount(group,(c1-e1)**2/e1+(c2-e2)**2/e2,minlength=k)
+        pvalue=stats.chi2.sf(chi2,np.maximum(categories-1,1))
+
+        m=(p+q)/2
+        js=np.bincount(group,special.rel_entr(p,m)+special.rel_entr(q,m),minlength=k)/(2*np.log(2))
+
+    empty=(n1==0)|(n2==0)
+    table=pd.DataFrame({'psi':psi,'chi2':chi2,'p_value':pvalue,'js':js},index=keys)
+    table[empty]=np.nan
+    table['n_categories']=categories
+    table['missing_train']=(rows1-n1)/rows1 if rows1 else np.nan
+    table['missing_test']=(rows2-n2)/rows2 if rows2 else np.nan
+    return table
+
+
+
+def _numeric_range(X,numeric,chunksize):
+
+    # train range of every numeric feature, NaN-aware reductions over the chunks; features without values have an empty range at +inf
+    lower=np.full(len(numeric),np.inf)
+    upper=np.full(len(numeric),-np.inf)
+    for chunk in _iter_chunks(X,numeric,chunksize):
+        values=numeric_values(chunk,numeric)
+        if len(values):
+            lower=np.fmin(lower,np.fmin.reduce(values,axis=0))
+            upper=np.fmax(upper,np.fmax.reduce(values,axis=0))
+    empty=lower>upper
+    lower[empty]=np.inf
+    upper[empty]=np.inf
+    return lower,upper
+
+
+
+def _numeric_codes(values,lower,upper,bins):
+
+    # interval of every value: 0 below the range, 1..bins the bins, bins+1 above the range, -1 missing.
+    # Once rescaled to [0,1] within its range, every feature has the same evenly spaced edges, hence the bin of every value,
+    # for all the features at once, is given by the integer part of its rescaled value times bins
+    span=upper-lower
+    span=np.where(span>0,span,1.)
+    with np.errstate(invalid='ignore'):
+        scaled=values-lower
+        scaled*=bins/span
+        codes=np.floor(scaled,out=scaled).clip(-1,bins-1).astype(np.intp)+1
+    # values are compared with the range themselves, the last bin being closed on both sides
+    codes[values>upper]=bins+1
+    codes[np.isnan(values)]=-1
+    return codes
+
+
+
+def _numeric_counts(X,numeric,lower,upper,bins,chunksize):
+
+    # number of missing values and of observations in each interval, shape = [n_features, bins + 3]; one bincount per chunk
+    # the values of each chunk are binned about a million at a time, so that the temporaries stay in cache
+    k=len(numeric)
+    counts=np.zeros(k*(bins+3),dtype=np.int64)
+    offset=1+(bins+3)*np.arange(k)
+    block=max(2**20//max(k,1),1)
+    for chunk in _iter_chunks(X,numeric,chunksize):
+        values=numeric_values(chunk,numeric)
+        for start in range(0,len(values),block):
+            codes=_numeric_codes(values[start:start+block],lower,upper,bins)
+            codes+=offset
+            counts+=np.bincount(codes.ravel(),minlength=len(counts))
+    return counts.reshape(k,bins+3)
+
+
+
+def _intervals(edges):
+
+    # labels of the rows of a numeric detector_ table
+    bins=len(edges)-1
+    return ([pd.Interval(-np.inf,edges[0],closed='neither')]+
+            [pd.Interval(edges[b],edges[b+1],closed='left' if b<bins-1 else 'both') for b in range(bins)]+
+            [pd.Interval(edges[-1],np.inf,closed='neither')])
+
+
+
+def _frequency_intervals(counts,n,confidence):
+
+    # relative frequencies of the categories (over the non missing observations) and fraction of missing values (over all the n
+    # observations, last element), with the bounds of their Wilson intervals
+    total=counts.sum()
+    successes=np.append(counts,n-total).astype(np.float64)
+    trials=np.append(np.full(len(counts),total),n).astype(np.float64)
+    lower,upper=wilson(successes,trials,confidence)
+    return successes/np.maximum(trials,1),lower,upper
+
+
+
+def _named_frames(frames,names=None):
+
+    # list of (name, data frame) pairs from a dictionary, or from a list and its names
+    if isinstance(frames,dict):
+        return list(frames.items())
+    if not isinstance(frames,(list,tuple)):
+        raise ValueError('frames has to be a list or a dictionary of dataframes!')
+    names=list(range(len(frames))) if names is None else list(names)
+    if len(names)!=len(frames):
+        raise ValueError('names and frames must have the same length!')
+    return list(zip(names,frames))
+
+
+
+def _code_dtype(n):
+
+    # smallest signed integer dtype holding the codes 0..n-1 and the -1 of missing values
+    for dtype in (np.int8, np.int16, np.int32):
+        if n <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+
+def _vocabulary(values):
+
+    # unique categories, sorted when comparable; the hash table of the Index is built once, at the first lookup
+    vocabulary = pd.Index(values)
+    try:
+        vocabulary = vocabulary.sort_values()
+    except TypeError:
+        pass
+    vocabulary.get_indexer(vocabulary[:1])
+    return vocabulary
+
+
+
+def _unseen(column, bloom, sketch, chunksize, max_report):
+
+    # hash -> outcome of the column, for the outcomes the Bloom filter certainly does not contain, and their number.
+    # Only the max_report heaviest outcomes (according to the count-min sketch of the column) are kept: when more are
+    # found, their number is estimated by a HyperLogLog of the hashes
+    found = {}
+    seen = HyperLogLog(sketch.hll_.precision)
+    exact = True
+    for start in range(0, len(column), chunksize):
+        values = column.iloc[start:start + chunksize].dropna().values
+        hashes = hash_values(values)
+        unique, first = np.unique(hashes, return_index=True)
+        miss = ~bloom.contains(unique)
+        seen.update(unique[miss])
+        found.update(zip(unique[miss], np.asarray(values)[first[miss]]))
+        if len(found) > 2 * max_report:
+            found = _heaviest(found, sketch.cms_, max_report)
+            exact = False
+    count = len(found) if exact else max(int(round(seen.estimate())), len(found))
+    return _heaviest(found, sketch.cms_, max_report), count
+
+
+
+def _heaviest(found, cms, k):
+
+    # the k entries of found (hash -> outcome) with the largest estimated counts
+    if len(found) <= k:
+        return found
+    hashes = list(found)
+    order = np.argsort(-cms.estimate(hashes), kind='mergesort')[:k]
+    return dict((hashes[j], found[hashes[j]]) for j in order)
@@ -0,0 +1,141 @@
+"""
+Author: Francesco Capponi <capponi.francesco87@gmail.com>
+
+License: BSD 3 clause
+
+"""
+
+
+
+from __future__ import print_function, division
+import time
+import tracemalloc
+import pandas as pd
+
+
+
+class Profiler(object):
+
+    """
+    Opt-in instrumentation for MissingData and CategoricalHero: pass an instance as the profiler parameter of their
+    constructors, and each phase of their methods (sanity checks, null counting, value counts, slicing...) is recorded,
+    column by column where the work is done column by column.
+
+    Parameters
+    ----------
+    memory : boolean, False by default. If True, the bytes allocated by each phase are tracked with tracemalloc
+    (this slows down the profiled code).
+
+    callback : callable, None by default. Called with each record as soon as the corresponding phase ends.
+
+    Attributes
+    ----------
+    enabled : boolean, always True (False for the default, no-op, profiler used when none is given).
+
+    records_ : list of dictionaries, one per phase, with keys
+    "owner" (class name), "phase", "column" (None for whole frame phases), "seconds", "rows" and "bytes" (peak bytes allocated
+    during the phase, None if memory is False).
+
+    """
+
+    enabled = True
+
+
+
+    def __init__(self, memory=False, callback=None):
+        self.memory = memory
+        self.callback = callback
+        self.records_ = []
+
+
+
+    def phase(self, owner, name, column=None, rows=None):
+
+        """
+        Returns a context manager timing the enclosed block. Phases should not be nested when memory is True.
+
+        Parameters
+        ----------
+        owner : string, name of the profiled class
+
+        name : string, name of the phase
+
+        column : string, column processed by the phase, None by default
+
+        rows : int, number of observations processed by the phase, None by default
+
+        """
+
+        return _Phase(self, owner, name, column, rows)
+
+
+
+    def summary(self, by='phase'):
+
+        """
+        Returns a Pandas Data Frame with the number of calls, the total time and the peak bytes of each phase
+        (by="phase") or column (by="column"), sorted by total time.
+        """
+
+        if by not in ('phase', 'column'):
+            raise ValueError('by can assumes only two values: "phase" and "column"!')
+        records = pd.DataFrame(self.records_, columns=['owner', 'phase', 'column', 'seconds', 'rows', 'bytes'])
+        keys = ['owner', 'phase'] if by == 'phase' else ['column']
+        table = records.groupby(keys).agg(calls=('seconds', 'size'), seconds=('seconds', 'sum'), bytes=('bytes', 'max'))
+        return table.sort_values('seconds', ascending=False)
+
+
+
+    def reset(self):
+
+        """
+        Removes all the records.
+        """
+
+        self.records_ = []
+
+
+
+class _Phase(object):
+
+    def __init__(self, profiler, owner, name, column, rows):
+        self.profiler = profiler
+        self.record = {'owner': owner, 'phase': name, 'column': column, 'rows': rows, 'bytes': None}
+
+    def __enter__(self):
+        if self.profiler.memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            self.before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.record['seconds'] = time.perf_counter() - self.start
+        if self.profiler.memory:
+            self.record['bytes'] = tracemalloc.get_traced_memory()[1] - self.before
+        self.profiler.records_.append(self.record)
+        if self.profiler.callback is not None:
+            self.profiler.callback(self.record)
+        return False
+
+
+
+class _NullProfiler(object):
+
+    # default profiler: a single shared no-op context, so that non profiled runs pay a method call per phase at most
+    enabled = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def phase(self, owner, name, column=None, rows=None):
+        return self
+
+
+
+NULL_PROFILER = _NullProfiler()
@@ -0,0 +1,225 @@
+"""
+Author: Francesco Capponi <capponi.francesco87@gmail.com>
+
+License: BSD 3 clause
+
+"""
+
+
+
+from __future__ import print_function, division
+import pandas as pd
+import numpy as np
+
+
+
+class MemoryOptimizer(object):
+
+    """
+    Chooses a compact dtype for each column of a data frame (usually after MissingData.transform and CategoricalHero.shape_slicer):
+    category for low cardinality strings, smallest integer dtypes, float32 when lossless, nullable integers for integral
+    floats with missing values and sparse dtypes for mostly missing numeric columns.
+
+    Parameters
+    ----------
+    category_ratio : float, 0.5 by default. Object columns whose number of distinct values, relative to the number of
+    non missing values, is at most category_ratio become categorical.
+
+    sparse_threshold : float, 0.9 by default. Numeric columns with at least this fraction of missing values become sparse.
+
+    float_tolerance : float, 0 by default. Float64 columns become float32 if the largest relative rounding error is at most
+    float_tolerance (0: only when the conversion is exact).
+
+    Private parameters
+    ----------
+    __iffit : boolean variable, used to check whether or not the "fit" method has been called
+
+    Attributes
+    ----------
+    dtypes_ : dictionary, column -> chosen dtype (only columns whose dtype changes).
+
+    report_ : Pandas Data Frame, one row per column, with dtype and bytes before and after the transform.
+
+    bytes_before_ : int, memory used by the data frame given to transform.
+
+    bytes_after_ : int, memory used by the transformed data frame.
+
+    """
+
+
+
+    def __init__(self, category_ratio=0.5, sparse_threshold=0.9, float_tolerance=0.):
+        self.category_ratio = category_ratio
+        self.sparse_threshold = sparse_threshold
+        self.float_tolerance = float_tolerance
+        self.__iffit = True
+
+
+
+    def fit(self, X, missing=None):
+
+        """
+        Chooses the dtype of each column of X.
+
+        Parameters
+        ----------
+        X : Pandas Data Frame-like, shape = [n_samples, n_features]
+
+        missing : MissingData instance, None by default. Its fractions of missing values (percent_) are only used to choose
+        the columns that become sparse, instead of being recomputed. Whether an integral float column needs a nullable integer
+        dtype is always decided on X itself, which may hold missing values the counted frame did not.
+
+        """
+
+        return self._fit(X, missing)
+
+
+
+    def transform(self, X):
+
+        """
+        Returns a new data frame with the chosen dtypes, and fills report_, bytes_before_ and bytes_after_.
+        Columns keeping their dtype are not copied.
+
+        Parameters
+        ----------
+        X : Pandas Data Frame-like, shape = [n_samples, n_features]
+
+        """
+
+        return self._transform(X)
+
+
+
+    def fit_transform(self, X, missing=None):
+
+        """
+        Fits the optimizer on X and returns X with the chosen dtypes.
+        """
+
+        self._fit(X, missing)
+        return self._transform(X)
+
+    ##############################################################################################
+
+
+
+    def __sanitycheck(self, X):
+        if not isinstance(X, pd.DataFrame):
+            raise ValueError('X has to be a dataframe!')
+        elif not 0 <= self.category_ratio <= 1:
+            raise ValueError('category_ratio has to be between 0 and 1!')
+        elif not 0 < self.sparse_threshold <= 1:
+            raise ValueError('sparse_threshold has to be between 0 and 1!')
+        elif self.float_tolerance < 0:
+            raise ValueError('float_tolerance has to be a positive number!')
+
+
+
+    def _fit(self, X, missing=None):
+
+        self.__sanitycheck(X)
+        percent = getattr(missing, 'percent_', None)
+
+        self.dtypes_ = {}
+        for i in X.columns:
+            column = X[i]
+            if percent is not None and i in percent.index:
+                nulls = percent[i]
+            else:
+                nulls = column.isnull().mean() if len(column) else 0.
+            dtype = self.__choose(column, nulls)
+            if dtype is not None and dtype != column.dtype:
+                self.dtypes_[i] = dtype
+        self.__iffit = False
+
+        return self
+
+
+
+    def __choose(self, column, nulls):
+
+        # returns the compact dtype of a column, None to keep the current one
+        if not isinstance(column.dtype, np.dtype):
+            return None
+        kind = column.dtype.kind
+
+        if kind == 'O':
+            values = column.dropna()
+            if len(values) and values.nunique() <= self.category_ratio * len(values):
+                return 'category'
+            return None
+
+        elif kind in 'iu':
+            if not len(column):
+                return None
+            return _int_dtype(column.min(), column.max(), kind == 'i')
+
+        elif kind == 'f':
+            values = column.dropna().values
+            if not len(values):
+                return None
+            if nulls >= self.sparse_threshold:
+                return pd.SparseDtype(_float_dtype(values, self.float_tolerance), np.nan)
+            if np.isfinite(values).all() and (values == np.round(values)).all():
+                dtype = _int_dtype(values.min(), values.max(), True)
+                # integral values beyond the int64 range stay floating point
+                if dtype.kind in 'iu':
+                    if len(values) < len(column):
+                        # nullable integers, e.g. Int16
+                        return pd.api.types.pandas_dtype(dtype.name.capitalize())
+                    return dtype
+            return _float_dtype(values, self.float_tolerance)
+
+        return None
+
+
+
+    def _transform(self, X):
+
+        if self.__iffit:
+            raise ValueError('You have to call the fit( X) method first!')
+        elif not isinstance(X, pd.DataFrame):
+            raise ValueError('X has to be a dataframe!')
+
+        before = X.memory_usage(index=False, deep=True)
+        out = X.copy(deep=False)
+        for i, dtype in self.dtypes_.items():
+            if i in out.columns:
+                out[i] = X[i].astype(dtype)
+        after = out.memory_usage(index=False, deep=True)
+
+        self.report_ = pd.DataFrame({'dtype_before': X.dtypes.astype(str), 'dtype_after': out.dtypes.astype(str),
+                                     'bytes_before': before, 'bytes_after': after})
+        self.bytes_before_ = int(before.sum())
+        self.bytes_after_ = int(after.sum())
+
+        return out
+
+
+
+def _int_dtype(low, high, signed=True):
+
+    # smallest integer dtype holding the range [low, high], with the signedness of the source (as pd.to_numeric(downcast='integer')):
+    # an unsigned dtype would silently change the arithmetic of signed columns, e.g. their differences
+    candidates = (np.int8, np.int16, np.int32, np.int64) if signed else (np.uint8, np.uint16, np.uint32, np.uint64)
+    for dtype in candidates:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return np.dtype(dtype)
+    return np.dtype(np.float64)
+
+
+
+def _float_dtype(values, tolerance):
+
+    # float32 if every finite value fits and is rounded within the relative tolerance
+    finite = values[np.isfinite(values)]
+    with np.errstate(over='ignore'):
+        single = finite.astype(np.float32)
+    if not np.isfinite(single).all():
+        return np.dtype(np.float64)
+    error = np.abs(single.astype(np.float64) - finite) / np.maximum(np.abs(finite), np.finfo(np.float64).tiny)
+    if not len(error) or error.max() <= tolerance:
+        return np.dtype(np.float32)
+    return np.dtype(np.float64)
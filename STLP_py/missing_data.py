@@ -0,0 +1,819 @@
+"""
+Author: Francesco Capponi <capponi.francesco87@gmail.com>
+
+License: BSD 3 clause
+
+"""
+
+
+
+from __future__ import print_function, division
+import os
+import pandas as pd
+import numpy as np
+from ._parallel import map_columns
+from .instrumentation import NULL_PROFILER
+from ._arrow import is_arrow, column_names, null_counts, null_mask, select, take
+from ._sampling import check_sample_params, sample_batches, wilson
+
+
+
+class MissingData(object):
+
+    """
+    Extraction and study of features with missing data from a given dataset.
+    Data sets can be Pandas Data Frames or pyarrow Tables/RecordBatches: Arrow data are never converted to pandas, null counts are
+    read from the validity bitmaps (plus the NaN values of floating point columns) and transform selects columns without copying them.
+
+    Private parameters
+    ----------
+    __missings : pandas data frame built after the extraction of features with Nan values. To be used internally by the class methods
+    __ifcount : boolean variable, used to check whether or not the "count" method has been called
+    __trs : double variable, used to store the threshold value
+    __nulls : pandas series with the number of Nan values found so far for each feature
+    __rows : pandas series with the number of observations scanned so far for each feature
+    __rowlabels : list of the features used by count_rows, needed by transform_rows
+    __rowtrs : double variable, used to store the row threshold value
+
+    Parameters
+    ----------
+    n_jobs : int, number of workers used to count missing values column by column, 1 by default (serial). -1 uses all the available cores.
+
+    backend : string, values = ["threading","processes"], "threading" by default.
+    With "processes" numeric columns are shared with the workers through shared memory blocks.
+
+    profiler : STLP_py.Profiler instance, None by default. If given, the time (and memory) spent in each phase is recorded
+    in profiler.records_, column by column for the null counting.
+
+    cache : STLP_py.ResultCache instance, None by default. If given, the null counts of the columns whose content did not change
+    since a previous call are read from the cache instead of being recomputed.
+
+    Attributes
+    ----------
+    n_features_ : int
+    The number of features containing missing values.
+
+    support_ : array of shape [n_features].
+    The mask of selected features.
+
+    n_features_filter_ : int.
+    The number of features whose missing values percentage is higher than a given threshold.
+
+    support_filter_ : array of shape [n_features_filter_].
+    The mask of selected features whose missing value percentage is higher than a given threshold.
+
+    percent_ : Pandas Series, shape = [n_features].
+    The fraction of missing values of every counted feature, whatever the threshold.
+
+    cooccurrence_ : Pandas Data Frame, shape = [n_features, n_features].
+    Number of observations where both features are missing (the diagonal holds the missing values of each feature). Computed by missing_patterns.
+
+    patterns_ : Pandas Data Frame.
+    Missingness patterns (tuple of the features missing together), with their number of observations and percentage, most common first. Computed by missing_patterns.
+
+    row_missing_ : Pandas Series, shape = [n_samples].
+    Number of missing values of every observation, over the counted features (smallest unsigned integer type that fits). Computed by count_rows.
+
+    row_percent_ : Pandas Series, shape = [n_samples].
+    The fraction of missing values of every observation. Computed by count_rows.
+
+    row_histogram_ : Pandas Data Frame, shape = [n_features + 1, 3].
+    For each possible number of missing values per observation: its fraction of the features, the number and the percentage of observations. Computed by count_rows.
+
+    n_rows_filter_ : int.
+    The number of observations whose missing values percentage is higher than the row threshold. Computed by count_rows.
+
+    intervals_ : Pandas Data Frame, shape = [n_features, 3].
+    Estimated fraction of missing values of every feature ("Percent") with the bounds of its Wilson confidence interval ("Lower", "Upper").
+    Computed by count_sample.
+
+    n_sampled_ : int.
+    The number of observations actually sampled (fewer than requested when the sampling stopped early). Computed by count_sample.
+
+    """
+
+
+
+    def __init__(self, n_jobs=1, backend='threading', profiler=None, cache=None):
+        self.n_jobs = n_jobs
+        self.backend = backend
+        self.profiler = profiler
+        self.cache = cache
+        self.__profiler = NULL_PROFILER if profiler is None else profiler
+        self.__missings = None
+        self.__ifcount = True
+        self.__trs = 0.
+        self.__nulls = None
+        self.__rows = None
+        self.__rowlabels = None
+        self.__rowtrs = 0.
+
+
+
+    def count(self, X, labels,threshold=0.):
+
+        """
+            Counts the number of features with missing values
+            Parameters
+            ----------
+            X : Pandas Data Frame-like, shape = [n_samples, n_features]
+
+            labels : list-like, shape = [n_features]
+            List of strings characterizing the columns.
+
+            threshold : reference value for the percentage of missing data, 0 by default. When specified, it allows the computation of                              n_features_filter_ and support_filter_
+        """
+
+        return self._count(X, labels,threshold)
+
+
+
+    def count_stream(self, X, labels, threshold=0., chunksize=100000):
+
+        """
+            Counts the number of features with missing values, scanning the data set chunk by chunk.
+            Only per-feature counters are kept in memory, so that data sets larger than RAM can be studied.
+            Parameters
+            ----------
+            X : string or iterable
+            Path to a csv/parquet file, or iterable of Pandas Data Frames (e.g. pd.read_csv(..., chunksize=n)).
+
+            labels : list-like, shape = [n_features]
+            List of strings characterizing the columns.
+
+            threshold : reference value for the percentage of missing data, 0 by default. When specified, it allows the computation of                              n_features_filter_ and support_filter_
+
+            chunksize : int, number of rows read at each step when X is a path, 100000 by default
+        """
+
+        return self._count_stream(X, labels, threshold, chunksize)
+
+
+
+    def count_parquet(self, X, labels, threshold=0.):
+
+        """
+            Counts the number of features with missing values from the metadata of Parquet files or Arrow tables.
+            Row-group statistics stored in the file footers are used when available, otherwise only the affected
+            column chunks are read. Notice that NaN values stored in parquet files as regular floating point numbers (instead of nulls) are
+            not counted; in Arrow tables they are, as count does.
+            Parameters
+            ----------
+            X : string, list of strings or pyarrow Table/RecordBatch
+            Path to a parquet file, to a directory of parquet files, list of paths, or an in-memory Arrow table.
+
+            labels : list-like, shape = [n_features]
+            List of strings characterizing the columns.
+
+            threshold : reference value for the percentage of missing data, 0 by default. When specified, it allows the computation of                              n_features_filter_ and support_filter_
+        """
+
+        return self._count_parquet(X, labels, threshold)
+
+
+
+    def count_sample(self, X, labels, threshold=0., size=100000, confidence=0.95, tolerance=None, batch=10000, block=1, random_state=None):
+
+        """
+            Estimates the fraction of missing values of every feature from a random sample of observations, with confidence intervals (intervals_).
+            Percentages, supports and summary are then those of the sample. Data frames and Arrow tables are sampled in random blocks
+            of rows, parquet files by random row groups, csv files and iterables of data frames through a reservoir, in a single pass.
+            Parameters
+            ----------
+            X : Pandas Data Frame-like, pyarrow Table, path to a csv/parquet file or iterable of Pandas Data Frames
+
+            labels : list-like, shape = [n_features]
+            List of strings characterizing the columns.
+
+            threshold : reference value for the percentage of missing data, as in count
+
+            size : int, maximum number of observations sampled, 100000 by default
+
+            confidence : confidence level of the intervals, 0.95 by default
+
+            tolerance : float, None by default. If given, the sampling stops as soon as every interval is at most tolerance wide
+            on each side of its estimate (not available for csv files and iterables, read in a single pass)
+
+            batch : int, number of observations sampled between two checks of the intervals, 10000 by default
+
+            block : int, number of contiguous observations sampled together from data frames and Arrow tables, 1 by default.
+            Larger blocks are faster to gather, but the intervals assume independent observations: keep them small if rows are ordered.
+
+            random_state : int or None, seed of the random number generator, None by default.
+        """
+
+        return self._count_sample(X, labels, threshold, size, confidence, tolerance, batch, block, random_state)
+
+
+
+    def partial_fit(self, X, labels=None, threshold=None):
+
+        """
+            Updates the missing values counts with a new batch of observations, without rescanning the previous ones.
+            If no count has been done yet, it behaves like count.
+            Parameters
+            ----------
+            X : Pandas Data Frame-like, shape = [n_samples, n_features]
+
+            labels : list-like, shape = [n_features]
+            List of strings characterizing the columns. By default, the features already counted.
+
+            threshold : reference value for the percentage of missing data. By default, the threshold already in use.
+        """
+
+        return self._partial_fit(X, labels, threshold)
+
+
+
+    def merge(self, other):
+
+        """
+            Merges the counts of another MissingData instance into this one (e.g. for map-reduce profiling, where each worker counts its own shard).
+            The threshold of the current instance is kept. It returns the instance itself.
+            Parameters
+            ----------
+            other : MissingData instance, on which count, count_stream or partial_fit has been called.
+        """
+
+        return self._merge(other)
+
+
+
+    def missing_patterns(self, X, labels, chunksize=100000, top=None):
+
+        """
+            Studies which features are missing together: it computes the co-occurrence matrix of missing values (cooccurrence_)
+            and the frequency of each missingness pattern across observations (patterns_), in a single chunked scan.
+            Null masks are bit-packed row by row, co-occurrences are accumulated through matrix products restricted to the
+            features and observations with missing values, so no dense boolean frame of the whole data set is built.
+            Parameters
+            ----------
+            X : Pandas Data Frame-like, path to a csv/parquet file or iterable of Pandas Data Frames (see count_stream)
+
+            labels : list-like, shape = [n_features]
+            List of strings characterizing the columns.
+
+            chunksize : int, number of observations processed at each step, 100000 by default
+
+            top : int, number of most common patterns kept in patterns_, all of them by default
+        """
+
+        return self._missing_patterns(X, labels, chunksize, top)
+
+
+
+    def count_rows(self, X, labels, threshold=0., row_threshold=0., chunksize=100000, store=True):
+
+        """
+            Counts the missing values of every observation, together with the per-feature counts of count, in a single chunked scan.
+            Each chunk is turned into one null mask, summed along both axes and released, so no boolean frame of the whole data set is built.
+            Parameters
+            ----------
+            X : Pandas Data Frame-like, path to a csv/parquet file or iterable of Pandas Data Frames (see count_stream)
+
+            labels : list-like, shape = [n_features]
+            List of strings characterizing the columns.
+
+            threshold : reference value for the percentage of missing data of the features, as in count
+
+            row_threshold : reference value for the percentage of missing data of the observations, 0 by default. Used by transform_rows
+            and to compute n_rows_filter_
+
+            chunksize : int, number of observations processed at each step, 100000 by default
+
+            store : boolean, True by default. Whether row_missing_ and row_percent_ are kept: with False only the histogram is,
+            so that memory does not grow with the number of observations
+        """
+
+        return self._count_rows(X, labels, threshold, row_threshold, chunksize, store)
+
+
+
+    def summary(self):
+
+        """
+        Produces a summary table, containing feature name, total missing data and percentage of missing data
+
+        """
+
+        return self._summary()
+
+
+
+    def transform(self, X):
+
+        """
+        Return a new dataframe, where features with non null Nan-percentage have been removed
+        Parameters
+        ----------
+        X : Pandas Data Frame-like, shape = [n_samples, n_features]
+        The training input samples.
+
+        """
+
+        return self._transform(X)
+
+
+
+    def transform_rows(self, X, threshold=None, chunksize=100000, output='frame'):
+
+        """
+        Removes the observations whose missing values percentage, over the features given to count_rows, is higher than a threshold.
+        Parameters
+        ----------
+        X : Pandas Data Frame-like, shape = [n_samples, n_features]
+
+        threshold : reference value for the percentage of missing data of the observations. By default, the row threshold given to count_rows.
+
+        chunksize : int, number of observations checked at each step, 100000 by default
+
+        output : string, values = ["frame","mask","index"]
+        Whether the filtered data frame, the mask of the observations to keep or their positions are returned.
+
+        """
+
+        return self._transform_rows(X, threshold, chunksize, output)
+
+    ##############################################################################################
+
+
+    def __sanitycheck(self,X, labels, threshold=0.):
+        # sanity check: just to be sure the user is giving the right parameters
+        if not (isinstance(X, pd.DataFrame) or is_arrow(X)):
+            raise ValueError('X has to be a dataframe or an Arrow table!')
+        self.__paramcheck(labels, threshold)
+
+
+
+    def __paramcheck(self, labels, threshold=0.):
+        if not isinstance(labels, list):
+            raise ValueError('Labels has to be a list!')
+        elif not all(isinstance(s, str) for s in labels):
+            raise ValueError('Labels has to be a list of strings!')
+        elif not isinstance(threshold, float):
+            raise ValueError('The threshold has to be a positive float number!')
+        if threshold < 0 or threshold > 1:
+            raise ValueError('The threshold has to be a positive float number, between 0 and 1!')
+
+
+
+    def _count(self, X, labels, threshold=0.):
+
+        with self.__phase('sanitycheck'):
+            self.__sanitycheck(X, labels, threshold)
+
+        # Counting total number of nan values for each column
+        self.__nulls = self.__nullcount(X, labels)
+        self.__rows = pd.Series(len(X), index=labels)
+        with self.__phase('build'):
+            self.__build(threshold)
+
+
+
+    def _count_nulls(self, nulls, rows, threshold=0.):
+
+        # fits the counter from null counts computed elsewhere (e.g. by Pipeline, during its own scan of the data)
+        self.__paramcheck(list(nulls.index), threshold)
+        self.__nulls = nulls.astype(np.int64)
+        self.__rows = pd.Series(rows, index=nulls.index, dtype=np.int64)
+        self.__build(threshold)
+
+        return self
+
+
+
+    def _count_stream(self, X, labels, threshold=0., chunksize=100000):
+
+        self.__paramcheck(labels, threshold)
+        if not isinstance(chunksize, int) or chunksize <= 0:
+            raise ValueError('The chunksize has to be a positive integer!')
+
+        nulls = pd.Series(0, index=labels, dtype=np.int64)
+        rows = pd.Series(0, index=labels, dtype=np.int64)
+
+        # only the counters survive each iteration, the chunk is released right after
+        chunks = _iter_chunks(X, labels, chunksize)
+        while True:
+            with self.__phase('read'):
+                chunk = next(chunks, None)
+            if chunk is None:
+                break
+            if not (isinstance(chunk, pd.DataFrame) or is_arrow(chunk)):
+                raise ValueError('Each chunk has to be a dataframe!')
+            with self.__phase('nullcount', rows=len(chunk)):
+                nulls += null_counts(chunk, labels)
+                rows += len(chunk)
+
+        self.__nulls = nulls
+        self.__rows = rows
+        with self.__phase('build'):
+            self.__build(threshold)
+
+
+
+    def _count_parquet(self, X, labels, threshold=0.):
+
+        self.__paramcheck(labels, threshold)
+
+        with self.__phase('metadata'):
+            self.__nulls, self.__rows = _parquet_counts(X, labels)
+        with self.__phase('build'):
+            self.__build(threshold)
+
+
+
+    def _missing_patterns(self, X, labels, chunksize=100000, top=None):
+
+        self.__paramcheck(labels)
+        if not isinstance(chunksize, int) or chunksize <= 0:
+            raise ValueError('The chunksize has to be a positive integer!')
+
+        k = len(labels)
+        cooccurrence = np.zeros((k, k), dtype=np.int64)
+        patterns = {}
+        nrows = 0
+
+        for chunk in _iter_chunks(X, labels, chunksize):
+            with self.__phase('nullmask', rows=len(chunk)):
+                mask = null_mask(chunk, labels)
+            nrows += len(mask)
+
+            with self.__phase('cooccurrence', rows=len(mask)):
+                # only features and observations with at least one missing value enter the product,
+                # sparse when missing values are rare; float32 sums are exact up to 2**24 observations, hence larger
+                # chunks are multiplied in slices
+                cols = np.flatnonzero(mask.any(axis=0))
+                sub = mask[mask.any(axis=1)][:, cols]
+                # chunks without missing values add nothing
+                if sub.size:
+                    if sub.mean() < 0.05:
+                        from scipy import sparse
+                        sub = sparse.csr_matrix(sub, dtype=np.int64)
+                        cooccurrence[np.ix_(cols, cols)] += sub.T.dot(sub).toarray()
+                    else:
+                        for start in range(0, len(sub), 2**24):
+                            part = sub[start:start + 2**24].astype(np.float32)
+                            cooccurrence[np.ix_(cols, cols)] += np.rint(part.T.dot(part)).astype(np.int64)
+
+            with self.__phase('patterns', rows=len(mask)):
+                # each observation becomes a row of ceil(k/8) bytes, hashed as a single opaque value
+                packed = np.ascontiguousarray(np.packbits(mask, axis=1))
+                keys = packed.view(np.dtype((np.void, packed.shape[1]))).ravel()
+                unique, counts = np.unique(keys, return_counts=True)
+                for key, count in zip(unique, counts):
+                    key = key.tobytes()
+                    patterns[key] = patterns.get(key, 0) + int(count)
+
+        self.cooccurrence_ = pd.DataFrame(cooccurrence, index=labels, columns=labels)
+
+        table = pd.Series(patterns, dtype=np.int64).sort_values(ascending=False, kind='mergesort')
+        if top is not None:
+            table = table.iloc[:top]
+        names = np.array(labels, dtype=object)
+        missing = [tuple(names[np.unpackbits(np.frombuffer(key, dtype=np.uint8))[:k].astype(bool)]) for key in table.index]
+        self.patterns_ = pd.DataFrame({'Missing': missing,
+                                       'n_missing': [len(m) for m in missing],
+                                       'Total': table.values,
+                                       'Percent': table.values / nrows})
+
+
+
+    def _count_rows(self, X, labels, threshold=0., row_threshold=0., chunksize=100000, store=True):
+
+        self.__paramcheck(labels, threshold)
+        self.__paramcheck(labels, row_threshold)
+        if not isinstance(chunksize, int) or chunksize <= 0:
+            raise ValueError('The chunksize has to be a positive integer!')
+
+        k = len(labels)
+        dtype = np.min_scalar_type(k)
+        nulls = np.zeros(k, dtype=np.int64)
+        histogram = np.zeros(k + 1, dtype=np.int64)
+        counts, index = [], []
+        position = 0
+
+        chunks = _iter_chunks(X, labels, chunksize)
+        while True:
+            with self.__phase('read'):
+                chunk = next(chunks, None)
+            if chunk is None:
+                break
+            if not (isinstance(chunk, pd.DataFrame) or is_arrow(chunk)):
+                raise ValueError('Each chunk has to be a dataframe!')
+            with self.__phase('nullcount', rows=len(chunk)):
+                # one chunk-sized mask gives both the per-feature and the per-observation counts
+                mask = null_mask(chunk, labels)
+                nulls += mask.sum(axis=0)
+                rowcount = mask.sum(axis=1).astype(dtype)
+                histogram += np.bincount(rowcount, minlength=k + 1)
+            if store:
+                # Arrow chunks have no index: observations are numbered by position
+                counts.append(rowcount)
+                index.append(pd.RangeIndex(position, position + len(chunk)) if is_arrow(chunk) else chunk.index)
+            position += len(chunk)
+
+        self.__nulls = pd.Series(nulls, index=labels)
+        self.__rows = pd.Series(histogram.sum(), index=labels, dtype=np.int64)
+        with self.__phase('build'):
+            self.__build(threshold)
+
+        self.__rowlabels = list(labels)
+        self.__rowtrs = row_threshold
+        fraction = np.arange(k + 1) / max(k, 1)
+        self.row_histogram_ = pd.DataFrame({'Fraction': fraction,
+                                            'Total': histogram,
+                                            'Percent': histogram / max(histogram.sum(), 1)},
+                                           index=pd.RangeIndex(k + 1, name='n_missing'))
+        self.n_rows_filter_ = int(histogram[np.arange(k + 1) > _row_limit(row_threshold, k)].sum())
+        if store:
+            index = index[0].append(index[1:]) if index else pd.RangeIndex(0)
+            counts = np.concatenate(counts) if counts else np.zeros(0, dtype=dtype)
+            self.row_missing_ = pd.Series(counts, index=index)
+            self.row_percent_ = self.row_missing_ / max(k, 1)
+
+
+
+    def _count_sample(self, X, labels, threshold=0., size=100000, confidence=0.95, tolerance=None, batch=10000, block=1, random_state=None):
+
+        self.__paramcheck(labels, threshold)
+        params = check_sample_params({'size': size, 'confidence': confidence, 'tolerance': tolerance, 'batch': batch,
+                                'block': block, 'random_state': random_state})
+
+        nulls = np.zeros(len(labels), dtype=np.int64)
+        rows = 0
+        for chunk in sample_batches(X, labels, params['size'], params['batch'], params['block'], params['random_state']):
+            with self.__phase('nullcount', rows=len(chunk)):
+                nulls += null_counts(chunk, labels).values
+                rows += len(chunk)
+            if tolerance is not None:
+                lower, upper = wilson(nulls, rows, confidence)
+                if np.all(upper - nulls / rows <= tolerance) and np.all(nulls / rows - lower <= tolerance):
+                    break
+
+        self.__nulls = pd.Series(nulls, index=labels)
+        self.__rows = pd.Series(rows, index=labels, dtype=np.int64)
+        with self.__phase('build'):
+            self.__build(threshold)
+
+        lower, upper = wilson(nulls, rows, confidence)
+        self.intervals_ = pd.DataFrame({'Percent': nulls / max(rows, 1), 'Lower': lower, 'Upper': upper}, index=labels)
+        self.n_sampled_ = rows
+
+
+
+    def _partial_fit(self, X, labels=None, threshold=None):
+
+        if labels is None:
+            if self.__nulls is None:
+                raise ValueError('Labels have to be given at the first call!')
+            labels = list(self.__nulls.index)
+        if threshold is None:
+            threshold = self.__trs
+        with self.__phase('sanitycheck'):
+            self.__sanitycheck(X, labels, threshold)
+
+        self.__update(self.__nullcount(X, labels), pd.Series(len(X), index=labels))
+        with self.__phase('build'):
+            self.__build(threshold)
+
+
+
+    def _merge(self, other):
+
+        if not isinstance(other, MissingData):
+            raise ValueError('Only MissingData instances can be merged!')
+        elif self.__ifcount or other.__ifcount:
+            raise ValueError('You have to call the count( X, labels,threshold) method on both instances first!')
+
+        self.__update(other.__nulls, other.__rows)
+        self.__build(self.__trs)
+
+        return self
+
+
+
+    def __phase(self, name, column=None, rows=None):
+        return self.__profiler.phase('MissingData', name, column, rows)
+
+
+
+    def __nullcount(self, X, labels):
+
+        if self.cache is not None and not is_arrow(X):
+            nulls = self.cache.columns(X, labels, 'nullcount', lambda missing: self.__countnulls(X, missing))
+            return pd.Series(nulls, index=labels, dtype=np.int64)
+        return self.__countnulls(X, labels)
+
+
+
+    def __countnulls(self, X, labels):
+
+        if is_arrow(X):
+            # null counts are stored in the Arrow arrays, there is nothing worth splitting among workers
+            with self.__phase('nullcount', rows=len(X)):
+                return null_counts(X, labels)
+        elif self.n_jobs != 1:
+            with self.__phase('nullcount', rows=len(X)):
+                return pd.Series(map_columns(_nullcount, X, labels, self.n_jobs, self.backend), index=labels, dtype=np.int64)
+        elif self.__profiler.enabled:
+            # profiled runs count column by column, to find out which columns dominate the cost
+            nulls = pd.Series(0, index=labels, dtype=np.int64)
+            for i in labels:
+                with self.__phase('nullcount', i, len(X)):
+                    nulls[i] = X[i].isnull().sum()
+            return nulls
+        return X[labels].isnull().sum()
+
+
+
+    def __update(self, nulls, rows):
+
+        # features seen only by one of the two counters keep their own number of observations
+        if self.__nulls is None:
+            self.__nulls, self.__rows = nulls, rows
+        else:
+            self.__nulls = self.__nulls.add(nulls, fill_value=0).astype(np.int64)
+            self.__rows = self.__rows.add(rows, fill_value=0).astype(np.int64)
+
+
+
+    def __build(self, threshold=0.):
+
+        self.__trs = threshold
+
+        # Count percentage of nan values
+        total = self.__nulls.sort_values(ascending=False)
+        percent=(self.__nulls/self.__rows).sort_values(ascending=False)
+
+        # Define a private dataframe, to be used inside the other methods
+        self.__missings = pd.concat([total, percent], axis=1,keys=['Total','Percent'])
+        self.__ifcount = False # needed as a check for summary
+        self.percent_ = self.__missings['Percent']
+
+        self.support_=list(self.__missings[(self.__missings['Percent']>0.)].index)
+        self.n_features_=len(self.support_)
+
+        if self.__trs > 0:
+            self.support_filter_=list(self.__missings[(self.__missings['Percent']> self.__trs)].index)
+            self.n_features_filter_=len(self.support_filter_)
+        else:
+            self.support_filter_=self.support_
+            self.n_features_filter_=self.n_features_
+
+
+
+    def _summary(self):
+
+      if self.__ifcount:
+          raise ValueError('You have to call the count( X, labels,threshold) method first!')
+      else:
+         return self.__missings[(self.__missings['Percent']>self.__trs)]
+
+
+
+    def _transform(self,X):
+
+        if self.__ifcount:
+            raise ValueError('You have to call the count( X, labels,threshold) method first!')
+        else:
+            if self.n_features_filter_ > 0:
+                with self.__phase('drop', rows=len(X)):
+                    if is_arrow(X):
+                        X=select(X,[i for i in column_names(X) if i not in self.support_filter_])
+                    else:
+                        X=X.drop(self.support_filter_,axis=1)
+
+        return X
+
+
+
+    def _transform_rows(self, X, threshold=None, chunksize=100000, output='frame'):
+
+        if self.__rowlabels is None:
+            raise ValueError('You have to call the count_rows( X, labels) method first!')
+        elif not (isinstance(X, pd.DataFrame) or is_arrow(X)):
+            raise ValueError('X has to be a dataframe or an Arrow table!')
+        elif output not in ("frame","mask","index"):
+            raise ValueError('output can assumes only three values: "frame","mask" and "index"!')
+        if threshold is None:
+            threshold = self.__rowtrs
+        self.__paramcheck(self.__rowlabels, threshold)
+        if not isinstance(chunksize, int) or chunksize <= 0:
+            raise ValueError('The chunksize has to be a positive integer!')
+
+        # the null mask is never larger than one chunk
+        limit = _row_limit(threshold, len(self.__rowlabels))
+        keep = np.empty(len(X), dtype=bool)
+        start = 0
+        with self.__phase('rowfilter', rows=len(X)):
+            for chunk in _iter_chunks(X, self.__rowlabels, chunksize):
+                keep[start:start + len(chunk)] = null_mask(chunk, self.__rowlabels).sum(axis=1) <= limit
+                start += len(chunk)
+
+        if output == "mask":
+            return keep
+        elif output == "index":
+            return np.flatnonzero(keep)
+        return X if keep.all() else take(X, keep)
+
+
+
+def _nullcount(columns, labels):
+
+    return dict((i, int(columns[i].isnull().sum())) for i in labels)
+
+
+
+def _row_limit(threshold, k):
+
+    # largest number of missing values (out of k) whose fraction is not above threshold, robust to rounding (e.g. 0.29 * 100)
+    return int(np.floor(threshold * k + 1e-9))
+
+
+
+def _iter_chunks(X, labels, chunksize):
+
+    # yields data frames holding (at least) the requested columns (all of them if labels is None), reading at most chunksize rows at a time
+    if isinstance(X, str):
+        if X.endswith(('.parquet', '.pq')):
+            try:
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise ImportError('pyarrow is required to read parquet files!')
+            for batch in pq.ParquetFile(X).iter_batches(batch_size=chunksize, columns=labels):
+                yield batch.to_pandas()
+        else:
+            for chunk in pd.read_csv(X, usecols=labels, chunksize=chunksize):
+                yield chunk
+    elif isinstance(X, pd.DataFrame):
+        for start in range(0, len(X), chunksize):
+            yield X.iloc[start:start + chunksize]
+    elif is_arrow(X):
+        # zero-copy slices
+        for start in range(0, len(X), chunksize):
+            yield X.slice(start, chunksize)
+    else:
+        for chunk in X:
+            yield chunk
+
+
+
+def _parquet_counts(X, labels):
+
+    # null and row counters from Arrow/Parquet metadata: column data are decoded only when statistics are missing
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError('pyarrow is required to read parquet files!')
+
+    nulls = pd.Series(0, index=labels, dtype=np.int64)
+    rows = pd.Series(0, index=labels, dtype=np.int64)
+
+    if is_arrow(X):
+        # in-memory Arrow tables and record batches: null counts kept next to the validity bitmaps, plus the NaN values
+        # of floating point columns, as count does
+        nulls[:] = null_counts(X, labels).values
+        rows[:] = X.num_rows
+        return nulls, rows
+
+    for path in _parquet_files(X):
+        pfile = pq.ParquetFile(path)
+        meta = pfile.metadata
+        position = {}
+        for j in range(meta.num_columns):
+            position[meta.schema.column(j).path] = j
+        for i in labels:
+            if i not in position:
+                raise ValueError('Column %s not found in %s!' % (i, path))
+
+        for g in range(meta.num_row_groups):
+            group = meta.row_group(g)
+            toread = []
+            for i in labels:
+                statistics = group.column(position[i]).statistics
+                if statistics is not None and statistics.has_null_count:
+                    nulls[i] += statistics.null_count
+                else:
+                    toread.append(i)
+            if toread:
+                chunk = pfile.read_row_group(g, columns=toread)
+                for i in toread:
+                    nulls[i] += chunk.column(i).null_count
+            rows += group.num_rows
+
+    return nulls, rows
+
+
+
+def _parquet_files(X):
+
+    if isinstance(X, str):
+        X = [X]
+    files = []
+    for path in X:
+        if os.path.isdir(path):
+            for root, dirs, names in sorted(os.walk(path)):
+                files.extend(os.path.join(root, name) for name in sorted(names) if name.endswith(('.parquet', '.pq')))
+        else:
+            files.append(path)
+    return files
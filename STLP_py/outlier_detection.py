@@ -0,0 +1,303 @@
+"""
+Author: Francesco Capponi <capponi.francesco87@gmail.com>
+
+License: BSD 3 clause
+
+"""
+
+
+
+from __future__ import print_function, division
+import pandas as pd
+import numpy as np
+from .missing_data import _iter_chunks
+
+
+
+class GeneralizedESD(object):
+
+    """
+    Generalized ESD (extreme Studentized deviate) test for outliers (Rosner, 1983), run on many numeric features at once.
+
+    At step i the value farthest from the mean of the remaining observations is removed; its Studentized deviation R_i
+    is compared with the critical value lambda_i, and the number of outliers is the largest i such that R_i > lambda_i.
+    Since only the max_outliers smallest and largest values can ever be removed, each feature is summarized by its
+    number of observations, mean and sum of squared deviations plus those extreme values: the test then runs on all the
+    features together, updating the mean and variance incrementally after each removal. The summary can be computed
+    chunk by chunk (fit_stream), for columns larger than RAM.
+
+    Parameters
+    ----------
+    max_outliers : int, upper bound on the number of outliers of each feature, 10 by default.
+
+    alpha : float, significance level of the test, 0.05 by default.
+
+    Private parameters
+    ----------
+    __iffit : boolean variable, used to check whether or not the "fit" method has been called
+
+    Attributes
+    ----------
+    n_outliers_ : Pandas Series, number of outliers detected for each feature.
+
+    outliers_ : dictionary, feature -> array of its outlying values, in order of removal.
+
+    lower_ : Pandas Series, values of a feature smaller than or equal to lower_ are outliers (NaN when there is none on that side).
+
+    upper_ : Pandas Series, values of a feature larger than or equal to upper_ are outliers (NaN when there is none on that side).
+
+    statistics_ : Pandas Data Frame, shape = [max_outliers, 2 * n_features], test statistics R_i and critical values lambda_i.
+
+    """
+
+
+
+    def __init__(self, max_outliers=10, alpha=0.05):
+        self.max_outliers = max_outliers
+        self.alpha = alpha
+        self.__iffit = True
+
+
+
+    def fit(self, X, labels):
+
+        """
+            Runs the test on the numeric features of X.
+            Parameters
+            ----------
+            X : Pandas Data Frame-like, shape = [n_samples, n_features]
+
+            labels : list-like, shape = [n_features]
+            List of strings characterizing the numeric columns.
+        """
+
+        return self._fit(X, labels)
+
+
+
+    def fit_stream(self, X, labels, chunksize=100000):
+
+        """
+            Runs the test scanning the data set chunk by chunk: only the summary of each feature is kept in memory.
+            Parameters
+            ----------
+            X : path to a csv/parquet file, or iterable of Pandas Data Frames (see MissingData.count_stream)
+
+            labels : list-like, shape = [n_features]
+            List of strings characterizing the numeric columns.
+
+            chunksize : int, number of rows read at each step when X is a path, 100000 by default
+        """
+
+        return self._fit_stream(X, labels, chunksize)
+
+
+
+    def transform(self, X, output='frame'):
+
+        """
+            Removes from X the observations holding an outlier in any of the tested features.
+            Parameters
+            ----------
+            X : Pandas Data Frame-like, shape = [n_samples, n_features]
+
+            output : string, values = ["frame","mask","index"]
+            "frame": return the sliced data frame
+            "mask": return a boolean array, True for the observations to keep
+            "index": return the positional indexer of the observations to keep
+        """
+
+        return self._transform(X, output)
+
+    ##############################################################################################
+
+
+
+    def __paramcheck(self, labels):
+        if not isinstance(labels, list):
+            raise ValueError('Labels has to be a list!')
+        elif not all(isinstance(s, str) for s in labels):
+            raise ValueError('Labels has to be a list of strings!')
+        elif not isinstance(self.max_outliers, int) or self.max_outliers <= 0:
+            raise ValueError('max_outliers has to be a positive integer!')
+        elif not 0 < self.alpha < 1:
+            raise ValueError('alpha has to be between 0 and 1!')
+
+
+
+    def _fit(self, X, labels):
+
+        if not isinstance(X, pd.DataFrame):
+            raise ValueError('X has to be a dataframe!')
+        self.__paramcheck(labels)
+
+        summary = _Summary(self.max_outliers, len(labels))
+        summary.update(X[labels].values)
+        self.__test(summary, labels)
+
+        return self
+
+
+
+    def _fit_stream(self, X, labels, chunksize=100000):
+
+        self.__paramcheck(labels)
+        if not isinstance(chunksize, int) or chunksize <= 0:
+            raise ValueError('The chunksize has to be a positive integer!')
+
+        summary = _Summary(self.max_outliers, len(labels))
+        for chunk in _iter_chunks(X, labels, chunksize):
+            if not isinstance(chunk, pd.DataFrame):
+                raise ValueError('Each chunk has to be a dataframe!')
+            summary.update(chunk[labels].values)
+        self.__test(summary, labels)
+
+        return self
+
+
+
+    def __test(self, summary, labels):
+
+        from scipy import stats
+        r = self.max_outliers
+        k = len(labels)
+        n = summary.count.astype(np.float64)
+        count = n.copy()
+        mean = summary.mean.copy()
+        m2 = summary.m2.copy()
+        low = np.zeros(k, dtype=np.int64)
+        high = np.zeros(k, dtype=np.int64)
+        columns = np.arange(k)
+
+        R = np.full((r, k), np.nan)
+        lam = np.full((r, k), np.nan)
+        removed = np.full((r, k), np.nan)
+        fromhigh = np.zeros((r, k), dtype=bool)
+
+        for step in range(r):
+            # the critical value needs at least one degree of freedom left
+            active = count - 1 >= 2
+            if not active.any():
+                break
+            xl = summary.lows[np.minimum(low, r - 1), columns]
+            xh = summary.highs[np.minimum(high, r - 1), columns]
+            dl = np.abs(xl - mean)
+            dh = np.abs(xh - mean)
+            takehigh = dh >= dl
+            x = np.where(takehigh, xh, xl)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                std = np.sqrt(m2 / (count - 1))
+                deviation = np.where(std > 0, np.maximum(dl, dh) / std, 0.)
+
+            i = step + 1
+            p = 1 - self.alpha / (2 * (n - i + 1))
+            dof = np.maximum(n - i - 1, 1)
+            t = stats.t.ppf(p, dof)
+            critical = (n - i) * t / np.sqrt((n - i - 1 + t ** 2) * (n - i + 1))
+
+            R[step] = np.where(active, deviation, np.nan)
+            lam[step] = np.where(active, critical, np.nan)
+            removed[step] = np.where(active, x, np.nan)
+            fromhigh[step] = takehigh & active
+
+            # incremental removal of x from the mean and the sum of squared deviations
+            newcount = np.where(active, count - 1, count)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                newmean = np.where(active, (count * mean - x) / newcount, mean)
+            m2 = np.where(active, np.maximum(m2 - (x - mean) * (x - newmean), 0.), m2)
+            mean = newmean
+            count = newcount
+            high += takehigh & active
+            low += ~takehigh & active
+
+        significant = R > lam
+        steps = np.arange(1, r + 1)[:, None]
+        noutliers = np.max(np.where(significant, steps, 0), axis=0)
+
+        self.n_outliers_ = pd.Series(noutliers, index=labels)
+        self.outliers_ = {}
+        lower = np.full(k, np.nan)
+        upper = np.full(k, np.nan)
+        for j, i in enumerate(labels):
+            taken = slice(0, noutliers[j])
+            self.outliers_[i] = removed[taken, j]
+            highs = removed[taken, j][fromhigh[taken, j]]
+            lows = removed[taken, j][~fromhigh[taken, j]]
+            if len(highs):
+                upper[j] = highs.min()
+            if len(lows):
+                lower[j] = lows.max()
+        self.lower_ = pd.Series(lower, index=labels)
+        self.upper_ = pd.Series(upper, index=labels)
+        self.statistics_ = pd.concat([pd.DataFrame(R, columns=labels), pd.DataFrame(lam, columns=labels)],
+                                     axis=1, keys=['R', 'lambda'])
+        self.statistics_.index = steps.ravel()
+        self.__iffit = False
+
+
+
+    def _transform(self, X, output="frame"):
+
+        if self.__iffit:
+            raise ValueError('You have to call the fit( X, labels) method first!')
+        elif not isinstance(X, pd.DataFrame):
+            raise ValueError('X has to be a dataframe!')
+        elif output not in ("frame","mask","index"):
+            raise ValueError('output can assumes only three values: "frame","mask" and "index"!')
+
+        erase = np.zeros(len(X), dtype=bool)
+        for i in self.n_outliers_.index[self.n_outliers_ > 0]:
+            values = X[i].values
+            if not np.isnan(self.lower_[i]):
+                erase |= values <= self.lower_[i]
+            if not np.isnan(self.upper_[i]):
+                erase |= values >= self.upper_[i]
+
+        if output == "mask":
+            return ~erase
+        elif output == "index":
+            return np.flatnonzero(~erase)
+        return X[~erase] if erase.any() else X
+
+
+
+class _Summary(object):
+
+    # mergeable per-feature summary: count, mean and sum of squared deviations (Chan et al. parallel update),
+    # plus the r smallest values (ascending) and the r largest ones (descending), padded with NaN
+
+    def __init__(self, r, k):
+        self.r = r
+        self.count = np.zeros(k, dtype=np.int64)
+        self.mean = np.zeros(k)
+        self.m2 = np.zeros(k)
+        self.lows = np.full((r, k), np.nan)
+        self.highs = np.full((r, k), np.nan)
+
+    def update(self, values):
+        # column major, so that the per column partial sorts run on contiguous memory
+        values = np.asfortranarray(values, dtype=np.float64)
+        count = np.sum(~np.isnan(values), axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(count > 0, np.nansum(values, axis=0) / count, 0.)
+        m2 = np.nansum((values - mean) ** 2, axis=0)
+
+        total = self.count + count
+        delta = mean - self.mean
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.mean = np.where(total > 0, self.mean + delta * count / total, 0.)
+            self.m2 = self.m2 + m2 + np.where(total > 0, delta ** 2 * self.count * count / total, 0.)
+        self.count = total
+
+        # NaN are sorted last, both for the smallest values and for the (negated) largest ones
+        self.lows = np.sort(np.vstack([self.lows, _smallest(values, self.r)]), axis=0)[:self.r]
+        self.highs = -np.sort(np.vstack([-self.highs, _smallest(-values, self.r)]), axis=0)[:self.r]
+
+
+
+def _smallest(values, r):
+
+    # the r smallest values of each column, NaN last: a partial sort is enough
+    if len(values) > r:
+        values = np.partition(values, r - 1, axis=0)[:r]
+    return values
@@ -0,0 +1,202 @@
+"""
+Author: Francesco Capponi <capponi.francesco87@gmail.com>
+
+License: BSD 3 clause
+
+"""
+
+
+
+from __future__ import print_function, division
+import pandas as pd
+import numpy as np
+from .missing_data import MissingData
+from .categorical_hero import CategoricalHero
+from .instrumentation import NULL_PROFILER
+
+
+
+class Pipeline(object):
+
+    """
+    Fused preprocessing of a train (X) and test (Y) data frame: the steps
+    MissingData.count -> MissingData.transform -> CategoricalHero.shape_detector -> CategoricalHero.shape_slicer
+    in a single scan of the data.
+
+    Each categorical column is factorized once per data frame: its codes give at the same time the number of missing values,
+    the value counts, the set of categories and, through a lookup table of the mismatching categories, the observations to
+    remove. Other columns are only read to count their missing values. Features with too many missing values are skipped by
+    the later steps, and the output data frames are materialized once, at the end.
+
+    Parameters
+    ----------
+    threshold : float, reference value for the fraction of missing values (see MissingData.count), 0 by default.
+    Features of X above it are removed from both data frames.
+
+    choice : string, values = ["train","test","both"], "train" by default, data frames to slice (see CategoricalHero.shape_slicer).
+
+    drift : boolean, False by default. If True, the drift statistics of the categorical features are computed as well
+    (see CategoricalHero.shape_detector).
+
+    profiler : STLP_py.Profiler instance, None by default. If given, the time (and memory) spent on each column is recorded.
+
+    Attributes
+    ----------
+    missing_ : MissingData instance, fitted on the missing values of X (summary, percent_, support_filter_...).
+
+    hero_ : CategoricalHero instance, fitted on the categorical features left (detected_, detector_, drift_...).
+
+    dropped_ : list, features removed because of their missing values.
+
+    mask_ : tuple of two boolean arrays, True for the observations of X and Y that are kept.
+
+    """
+
+
+
+    def __init__(self, threshold=0., choice='train', drift=False, profiler=None):
+        self.threshold = threshold
+        self.choice = choice
+        self.drift = drift
+        self.profiler = profiler
+        self.__profiler = NULL_PROFILER if profiler is None else profiler
+
+
+
+    def fit_transform(self, X, Y, labels, categorical=None, output='frame'):
+
+        """
+        Runs the whole pipeline and returns the preprocessed data frames.
+
+        Parameters
+        ----------
+        X : Pandas Data Frame-like, shape = [n_samplesX, n_features]
+
+        Y : Pandas Data Frame-like, shape = [n_samplesY, n_features]
+
+        labels : list-like, shape = [n_features]
+        List of strings characterizing the columns whose missing values are counted.
+
+        categorical : list-like, features (among labels) compared by the shape detector, by default those of X with object or category dtype.
+
+        output : string, values = ["frame","mask","index"]
+        "frame": return the preprocessed data frames
+        "mask": return boolean arrays, True for the observations to keep (columns to drop are in dropped_)
+        "index": return positional indexers of the observations to keep
+
+        """
+
+        return self._fit_transform(X, Y, labels, categorical, output)
+
+    ##############################################################################################
+
+
+
+    def __sanitycheck(self, X, Y, labels, categorical, output):
+        if not isinstance(X, pd.DataFrame):
+            raise ValueError('X has to be a dataframe!')
+        elif not isinstance(Y, pd.DataFrame):
+            raise ValueError('Y has to be a dataframe!')
+        elif not isinstance(labels, list):
+            raise ValueError('Labels has to be a list!')
+        elif not all(isinstance(s, str) for s in labels):
+            raise ValueError('Labels has to be a list of strings!')
+        elif not all(i in labels for i in categorical):
+            raise ValueError('Categorical features have to be among the labels!')
+        elif not isinstance(self.threshold, float) or not 0 <= self.threshold <= 1:
+            raise ValueError('The threshold has to be a positive float number, between 0 and 1!')
+        elif self.choice not in ("train","test","both"):
+            raise ValueError('choice can assumes only three values: "train","test" and "both"!')
+        elif output not in ("frame","mask","index"):
+            raise ValueError('output can assumes only three values: "frame","mask" and "index"!')
+
+
+
+    def __phase(self, name, column=None, rows=None):
+        return self.__profiler.phase('Pipeline', name, column, rows)
+
+
+
+    def _fit_transform(self, X, Y, labels, categorical=None, output='frame'):
+
+        if categorical is None:
+            categorical = [i for i in labels if i in X.columns and (X[i].dtype == object or str(X[i].dtype) == 'category')]
+        self.__sanitycheck(X, Y, labels, categorical, output)
+
+        rows1, rows2 = len(X), len(Y)
+        nulls = pd.Series(0, index=labels, dtype=np.int64)
+        counts1, counts2 = {}, {}
+        erase1 = np.zeros(rows1, dtype=bool)
+        erase2 = np.zeros(rows2, dtype=bool)
+
+        others = [i for i in labels if i not in set(categorical)]
+        if others:
+            with self.__phase('nullcount', rows=rows1):
+                # column by column: no intermediate frame is built
+                for i in others:
+                    nulls[i] = X[i].isnull().sum()
+
+        for i in categorical:
+            with self.__phase('factorize', i, rows1):
+                codes1, uniques1, frequency1 = _factorize(X[i])
+            nulls[i] = rows1 - frequency1.sum()
+            # features removed by the missing values step are not compared
+            if rows1 and nulls[i] / rows1 > self.threshold:
+                continue
+            with self.__phase('factorize', i, rows2):
+                codes2, uniques2, frequency2 = _factorize(Y[i])
+            counts1[i] = pd.Series(frequency1, index=uniques1, name=i)
+            counts2[i] = pd.Series(frequency2, index=uniques2, name=i)
+
+            # observations holding a category missing in the other data frame (see CategoricalHero.shape_slicer)
+            with self.__phase('mask', i, rows1 + rows2):
+                if self.choice in ("train","both"):
+                    erase1 |= _lookup(~uniques1.isin(uniques2), codes1)
+                if self.choice in ("test","both"):
+                    erase2 |= _lookup(~uniques2.isin(uniques1), codes2)
+
+        self.missing_ = MissingData()._count_nulls(nulls, rows1, self.threshold)
+        self.dropped_ = list(self.missing_.support_filter_)
+        compared = [i for i in categorical if i in counts1]
+        self.hero_ = CategoricalHero(profiler=self.profiler)._detect_counts(counts1, counts2, compared, rows1, rows2, self.drift)
+        self.mask_ = (~erase1, ~erase2)
+
+        if output == "mask":
+            return self.mask_
+        elif output == "index":
+            return np.flatnonzero(~erase1), np.flatnonzero(~erase2)
+        with self.__phase('take', rows=rows1 + rows2):
+            return _materialize(X, ~erase1, self.dropped_), _materialize(Y, ~erase2, self.dropped_)
+
+
+
+def _factorize(column):
+
+    # codes (-1 for missing values), categories and their number of occurrences, in a single hash pass
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        # the codes are already there; unused categories are kept, as value_counts does
+        codes = column.cat.codes.values.astype(np.intp)
+        uniques = pd.CategoricalIndex(column.cat.categories, dtype=column.dtype)
+    else:
+        codes, uniques = pd.factorize(column)
+        uniques = pd.Index(uniques)
+    frequency = np.bincount(codes + 1, minlength=len(uniques) + 1)[1:]
+    return codes, uniques, frequency
+
+
+
+def _lookup(table, codes):
+
+    # table[code] for every observation, False for the missing values (code -1 reads the appended False)
+    return np.append(table, False)[codes]
+
+
+
+def _materialize(X, keep, dropped):
+
+    # a single copy of the kept rows and columns, none if nothing is removed
+    dropped = set(dropped)
+    columns = [j for j, i in enumerate(X.columns) if i not in dropped]
+    if keep.all():
+        return X if len(columns) == X.shape[1] else X.iloc[:, columns]
+    return X.iloc[np.flatnonzero(keep), columns]
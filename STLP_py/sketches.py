@@ -0,0 +1,330 @@
+"""
+Author: Francesco Capponi <capponi.francesco87@gmail.com>
+
+License: BSD 3 clause
+
+"""
+
+
+
+from __future__ import print_function, division
+import pandas as pd
+import numpy as np
+
+
+
+def hash_values(values):
+
+    """
+    Returns 64 bit hashes of the given values (NaN have to be removed beforehand).
+    Numeric values are hashed as float64, so that an integer column and its float twin (e.g. the same integer coded
+    categories, with missing values) give the same hashes; integers beyond 2**53 may collide. Other values are hashed
+    according to their dtype.
+
+    Parameters
+    ----------
+    values : array-like, shape = [n_samples]
+
+    """
+
+    dtype = getattr(values, 'dtype', None)
+    if dtype is not None and pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+        # + 0. turns -0. into 0., which compares equal to it
+        return pd.util.hash_array(np.asarray(values, dtype=np.float64) + 0.)
+    return pd.util.hash_array(np.asarray(values))
+
+
+
+def _split(hashes):
+    # two independent 32 bit hashes, combined by double hashing (Kirsch-Mitzenmacher) into as many hash functions as needed
+    hashes = np.asarray(hashes, dtype=np.uint64)
+    return (hashes & np.uint64(0xffffffff)).astype(np.int64), (hashes >> np.uint64(32)).astype(np.int64) | 1
+
+
+
+class HyperLogLog(object):
+
+    """
+    HyperLogLog cardinality estimator.
+
+    Parameters
+    ----------
+    precision : int, between 4 and 18. The sketch uses 2**precision registers, the relative standard error is about 1.04/sqrt(2**precision).
+
+    Attributes
+    ----------
+    registers_ : array of shape [2**precision], uint8.
+
+    """
+
+
+
+    def __init__(self, precision=14):
+        if not isinstance(precision, int) or precision < 4 or precision > 18:
+            raise ValueError('The precision has to be an integer between 4 and 18!')
+        self.precision = precision
+        self.registers_ = np.zeros(2**precision, dtype=np.uint8)
+
+
+
+    def update(self, hashes):
+
+        """
+        Adds 64 bit hashes to the sketch.
+        """
+
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        bits = 64 - self.precision
+        index = (hashes >> np.uint64(bits)).astype(np.int64)
+        rest = hashes & np.uint64((1 << bits) - 1)
+        # rank = position of the leftmost 1-bit; bit lengths are computed on 32 bit halves, where float conversion is exact
+        high = (rest >> np.uint64(32)).astype(np.float64)
+        low = (rest & np.uint64(0xffffffff)).astype(np.float64)
+        length = np.where(high > 0, np.frexp(high)[1] + 32, np.frexp(low)[1])
+        rank = (bits - length + 1).astype(np.uint8)
+        np.maximum.at(self.registers_, index, rank)
+        return self
+
+
+
+    def merge(self, other):
+
+        """
+        Merges another sketch with the same precision into this one.
+        """
+
+        if not isinstance(other, HyperLogLog) or other.precision != self.precision:
+            raise ValueError('Only HyperLogLog sketches with the same precision can be merged!')
+        np.maximum(self.registers_, other.registers_, out=self.registers_)
+        return self
+
+
+
+    def estimate(self):
+
+        """
+        Returns the estimated number of distinct values.
+        """
+
+        m = len(self.registers_)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1., -self.registers_.astype(np.int64)))
+        zeros = np.count_nonzero(self.registers_ == 0)
+        if raw <= 2.5 * m and zeros > 0:
+            return m * np.log(m / zeros)
+        return raw
+
+
+
+class CountMinSketch(object):
+
+    """
+    Count-min sketch for frequency estimation. Estimates never underestimate the true counts, and exceed them
+    by more than error * total count with probability at most 1 - confidence.
+
+    Parameters
+    ----------
+    error : float, relative error on the counts.
+
+    confidence : float, probability that the error bound holds.
+
+    Attributes
+    ----------
+    table_ : array of shape [depth, width], int64.
+
+    total_ : int, total count added to the sketch.
+
+    """
+
+
+
+    def __init__(self, error=0.001, confidence=0.99):
+        if not 0 < error < 1 or not 0 < confidence < 1:
+            raise ValueError('error and confidence have to be between 0 and 1!')
+        self.error = error
+        self.confidence = confidence
+        self.width = int(np.ceil(np.e / error))
+        self.depth = int(np.ceil(np.log(1. / (1 - confidence))))
+        self.table_ = np.zeros((self.depth, self.width), dtype=np.int64)
+        self.total_ = 0
+
+
+
+    def update(self, hashes):
+
+        """
+        Adds 64 bit hashes (one occurrence each) to the sketch.
+        """
+
+        h1, h2 = _split(hashes)
+        for d in range(self.depth):
+            self.table_[d] += np.bincount((h1 + d * h2) % self.width, minlength=self.width)
+        self.total_ += len(h1)
+        return self
+
+
+
+    def merge(self, other):
+
+        """
+        Merges another sketch with the same error and confidence into this one.
+        """
+
+        if not isinstance(other, CountMinSketch) or other.table_.shape != self.table_.shape:
+            raise ValueError('Only CountMinSketch sketches with the same shape can be merged!')
+        self.table_ += other.table_
+        self.total_ += other.total_
+        return self
+
+
+
+    def estimate(self, hashes):
+
+        """
+        Returns the estimated counts of the given hashes.
+        """
+
+        h1, h2 = _split(hashes)
+        counts = np.empty((self.depth, len(h1)), dtype=np.int64)
+        for d in range(self.depth):
+            counts[d] = self.table_[d, (h1 + d * h2) % self.width]
+        return counts.min(axis=0)
+
+
+
+class BloomFilter(object):
+
+    """
+    Bit-packed Bloom filter for membership tests: no false negatives, false positives with probability about fpr
+    as long as fewer than capacity distinct values are added.
+
+    Parameters
+    ----------
+    capacity : int, expected number of distinct values.
+
+    fpr : float, target false positive rate.
+
+    Attributes
+    ----------
+    bits_ : array of shape [ceil(n_bits/8)], uint8.
+
+    """
+
+
+
+    def __init__(self, capacity=1000000, fpr=0.01):
+        if not isinstance(capacity, int) or capacity <= 0:
+            raise ValueError('The capacity has to be a positive integer!')
+        elif not 0 < fpr < 1:
+            raise ValueError('fpr has to be between 0 and 1!')
+        self.capacity = capacity
+        self.fpr = fpr
+        self.n_bits = int(np.ceil(-capacity * np.log(fpr) / np.log(2)**2))
+        self.n_hashes = max(int(round(self.n_bits / capacity * np.log(2))), 1)
+        self.bits_ = np.zeros((self.n_bits + 7) // 8, dtype=np.uint8)
+
+
+
+    def __positions(self, hashes):
+        h1, h2 = _split(hashes)
+        return [(h1 + k * h2) % self.n_bits for k in range(self.n_hashes)]
+
+
+
+    def update(self, hashes):
+
+        """
+        Adds 64 bit hashes to the filter.
+        """
+
+        for pos in self.__positions(hashes):
+            np.bitwise_or.at(self.bits_, pos >> 3, (1 << (pos & 7)).astype(np.uint8))
+        return self
+
+
+
+    def merge(self, other):
+
+        """
+        Merges another filter with the same capacity and fpr into this one.
+        """
+
+        if not isinstance(other, BloomFilter) or other.n_bits != self.n_bits or other.n_hashes != self.n_hashes:
+            raise ValueError('Only BloomFilter filters with the same capacity and fpr can be merged!')
+        np.bitwise_or(self.bits_, other.bits_, out=self.bits_)
+        return self
+
+
+
+    def contains(self, hashes):
+
+        """
+        Returns a boolean array, False for the hashes that have certainly not been added.
+        """
+
+        found = np.ones(len(hashes), dtype=bool)
+        for pos in self.__positions(hashes):
+            found &= ((self.bits_[pos >> 3] >> (pos & 7)) & 1).astype(bool)
+        return found
+
+
+
+class ColumnSketch(object):
+
+    """
+    Bounded-memory summary of a categorical column: distinct values (HyperLogLog), frequencies (count-min sketch)
+    and membership (Bloom filter), plus the number of observations and of missing values.
+    Sketches built on different chunks of the same column can be merged.
+
+    Parameters
+    ----------
+    precision : int, HyperLogLog precision.
+
+    error, confidence : floats, count-min sketch error bounds.
+
+    capacity, fpr : Bloom filter capacity and false positive rate.
+
+    """
+
+
+
+    def __init__(self, precision=14, error=0.001, confidence=0.99, capacity=1000000, fpr=0.01):
+        self.hll_ = HyperLogLog(precision)
+        self.cms_ = CountMinSketch(error, confidence)
+        self.bloom_ = BloomFilter(capacity, fpr)
+        self.n_rows_ = 0
+        self.n_nulls_ = 0
+
+
+
+    def update(self, column):
+
+        """
+        Adds the values of a Pandas Series (or chunk of it) to the sketch.
+        """
+
+        values = column.dropna().values
+        hashes = hash_values(values)
+        self.hll_.update(hashes)
+        self.cms_.update(hashes)
+        self.bloom_.update(hashes)
+        self.n_rows_ += len(column)
+        self.n_nulls_ += len(column) - len(values)
+        return self
+
+
+
+    def merge(self, other):
+
+        """
+        Merges the sketch of another chunk of the same column into this one.
+        """
+
+        if not isinstance(other, ColumnSketch):
+            raise ValueError('Only ColumnSketch instances can be merged!')
+        self.hll_.merge(other.hll_)
+        self.cms_.merge(other.cms_)
+        self.bloom_.merge(other.bloom_)
+        self.n_rows_ += other.n_rows_
+        self.n_nulls_ += other.n_nulls_
+        return self
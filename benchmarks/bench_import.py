@@ -0,0 +1,98 @@
+"""
+Author: Francesco Capponi <capponi.francesco87@gmail.com>
+
+License: BSD 3 clause
+
+Import-time benchmark: each import statement runs in fresh interpreters, recording the best time over a few repetitions
+and the heavy dependencies it loaded. Results are written as JSON and can be compared with a previous run:
+
+    python benchmarks/bench_import.py --output import_baseline.json
+    python benchmarks/bench_import.py --output import_new.json --baseline import_baseline.json --tolerance 0.3
+
+The run exits with status 1 if a statement loads a dependency it should not (e.g. scipy when importing the classes),
+or, with a baseline, if any statement got slower than the tolerance allows.
+
+"""
+
+from __future__ import print_function, division
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# statement -> heavy modules it must not load (recent pandas versions import pyarrow themselves, when installed)
+STATEMENTS = {'import STLP_py': ('pandas', 'numpy', 'scipy', 'pyarrow'),
+              'from STLP_py import MissingData': ('scipy',),
+              'from STLP_py import CategoricalHero': ('scipy',),
+              'from STLP_py import GeneralizedESD, Pipeline, ResultCache': ('scipy',),
+              'from STLP_py.batch_profiler import main': ('scipy',)}
+
+HEAVY = ('pandas', 'numpy', 'scipy', 'pyarrow')
+
+SCRIPT = '''
+import sys, time, json
+start = time.perf_counter()
+%s
+elapsed = time.perf_counter() - start
+print(json.dumps({"time": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+'''
+
+
+
+def measure(statement, repeat):
+
+    # best time over repeat fresh interpreters, interpreter start up excluded
+    best = float('inf')
+    for _ in range(repeat):
+        output = subprocess.check_output([sys.executable, '-c', SCRIPT % (statement, HEAVY)], cwd=ROOT)
+        result = json.loads(output.decode().strip().splitlines()[-1])
+        best = min(best, result['time'])
+    return best, result['loaded']
+
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', default='import_results.json')
+    parser.add_argument('--baseline', default=None, help='JSON file written by a previous run')
+    parser.add_argument('--tolerance', type=float, default=0.3, help='allowed relative slow down, 0.3 by default')
+    args = parser.parse_args(argv)
+
+    results = []
+    status = 0
+    for statement, forbidden in STATEMENTS.items():
+        elapsed, loaded = measure(statement, args.repeat)
+        results.append({'statement': statement, 'time': elapsed, 'loaded': loaded})
+        print('%-60s %8.4f s  loads: %s' % (statement, elapsed, ', '.join(loaded) or '-'))
+        for module in set(loaded) & set(forbidden):
+            print('REGRESSION %s loads %s' % (statement, module))
+            status = 1
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = dict((r['statement'], r) for r in json.load(f)['results'])
+        for record in results:
+            old = baseline.get(record['statement'])
+            if old is not None and old['time'] > 0:
+                record['time_ratio'] = record['time'] / old['time']
+                if record['time_ratio'] > 1 + args.tolerance:
+                    print('REGRESSION %s: %.2fx' % (record['statement'], record['time_ratio']))
+                    status = 1
+
+    with open(args.output, 'w') as f:
+        json.dump({'python': platform.python_version(), 'platform': platform.platform(), 'results': results}, f, indent=1)
+
+    return status
+
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""
+Author: Francesco Capponi <capponi.francesco87@gmail.com>
+
+License: BSD 3 clause
+
+Compares CategoricalHero.shape_detector against the former get_dummies based detector,
+on synthetic high-cardinality columns (user ids, zip codes...).
+
+Usage: python benchmarks/bench_shape_detector.py --rows 200000 --cardinality 50000
+
+"""
+
+from __future__ import print_function, division
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from STLP_py import CategoricalHero
+from datagen import categorical_frame
+
+
+
+def legacy_detector(X, Y, labels):
+
+    # the get_dummies based implementation, kept here as reference
+    detector = {}
+    for i in labels:
+        dummy1 = pd.get_dummies(X[i]).columns
+        dummy2 = pd.get_dummies(Y[i]).columns
+        check = len(dummy2.difference(dummy1)) + len(dummy1.difference(dummy2))
+        if check:
+            freq1 = ((X[i].dropna()).value_counts() / X[i].count()).sort_values()
+            freq2 = ((Y[i].dropna()).value_counts() / Y[i].count()).sort_values()
+            percent1 = (X[i].isnull().sum() / len(X[i]))
+            percent2 = (Y[i].isnull().sum() / len(Y[i]))
+            temp1 = pd.concat([freq1, freq2], axis=1, keys=[('train', i), ('test', i)], sort=True)
+            temp1.loc["% missings"] = [percent1, percent2]
+            detector[i] = temp1
+    return detector
+
+
+
+def measure(func, *args):
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--columns', type=int, default=3)
+    parser.add_argument('--cardinality', type=int, default=20000)
+    args = parser.parse_args()
+
+    X = categorical_frame(args.rows, args.columns, args.cardinality, 0.05, seed=0)
+    Y = categorical_frame(args.rows, args.columns, args.cardinality, 0.05, seed=1)
+    labels = list(X.columns)
+
+    mo = CategoricalHero()
+    old, old_time, old_peak = measure(legacy_detector, X, Y, labels)
+    _, new_time, new_peak = measure(mo.shape_detector, X, Y, labels)
+
+    assert sorted(old) == sorted(mo.detected_)
+    for i in old:
+        pd.testing.assert_frame_equal(old[i], mo.detector_[i])
+
+    print('%-12s %10s %14s' % ('detector', 'time [s]', 'peak mem [MB]'))
+    print('%-12s %10.3f %14.1f' % ('get_dummies', old_time, old_peak / 2.**20))
+    print('%-12s %10.3f %14.1f' % ('value_counts', new_time, new_peak / 2.**20))
+
+
+
+if __name__ == '__main__':
+    main()
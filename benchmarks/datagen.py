@@ -0,0 +1,72 @@
+"""
+Author: Francesco Capponi <capponi.francesco87@gmail.com>
+
+License: BSD 3 clause
+
+Synthetic data generators for the benchmarks: every generator is deterministic given its seed.
+
+"""
+
+from __future__ import print_function, division
+import numpy as np
+import pandas as pd
+
+
+
+def numeric_frame(rows, columns, missing=0.1, seed=0):
+
+    """
+    Float columns "n0", "n1", ..., each with a fraction missing of NaN values.
+    """
+
+    rng = np.random.RandomState(seed)
+    values = rng.randn(rows, columns)
+    values[rng.rand(rows, columns) < missing] = np.nan
+    return pd.DataFrame(values, columns=['n%d' % j for j in range(columns)])
+
+
+
+def categorical_frame(rows, columns, cardinality=100, missing=0.1, seed=0):
+
+    """
+    Object columns "c0", "c1", ..., holding strings drawn uniformly among cardinality categories,
+    each with a fraction missing of NaN values.
+    """
+
+    rng = np.random.RandomState(seed)
+    categories = np.array(['c%d' % k for k in range(cardinality)], dtype=object)
+    data = {}
+    for j in range(columns):
+        values = categories[rng.randint(0, cardinality, size=rows)]
+        values[rng.rand(rows) < missing] = np.nan
+        data['c%d' % j] = values
+    return pd.DataFrame(data)
+
+
+
+def mixed_frame(rows, columns, cardinality=100, missing=0.1, seed=0):
+
+    """
+    Half numeric and half categorical columns, see numeric_frame and categorical_frame.
+    """
+
+    numeric = numeric_frame(rows, columns - columns // 2, missing, seed)
+    categorical = categorical_frame(rows, columns // 2, cardinality, missing, seed + 1)
+    return pd.concat([numeric, categorical], axis=1)
+
+
+
+def train_test_frames(rows, columns, cardinality=100, missing=0.1, drift=0.01, seed=0):
+
+    """
+    Two categorical frames with the same columns; a fraction drift of the categories of each frame is replaced
+    by categories the other frame does not contain.
+    """
+
+    train = categorical_frame(rows, columns, cardinality, missing, seed)
+    test = categorical_frame(rows, columns, cardinality, missing, seed + 1)
+    rng = np.random.RandomState(seed + 2)
+    for i in train.columns:
+        train.loc[rng.rand(rows) < drift, i] = 'train_only'
+        test.loc[rng.rand(rows) < drift, i] = 'test_only'
+    return train, test
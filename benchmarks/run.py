@@ -0,0 +1,331 @@
+"""
+Author: Francesco Capponi <capponi.francesco87@gmail.com>
+
+License: BSD 3 clause
+
+Benchmark suite for the public methods of MissingData, CategoricalHero, GeneralizedESD and Pipeline.
+
+Every benchmark runs on synthetic data (see datagen.py) over the grid rows x columns x missing rate x cardinality,
+recording the best wall time over a few repetitions and the peak memory allocated by Python (tracemalloc).
+Results are written as JSON and can be compared with a previous run:
+
+    python benchmarks/run.py --output baseline.json
+    python benchmarks/run.py --output new.json --baseline baseline.json --tolerance 0.2
+
+The comparison exits with status 1 if any benchmark got slower (or bigger) than the tolerance allows.
+
+"""
+
+from __future__ import print_function, division
+import argparse
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from STLP_py import MissingData, CategoricalHero, GeneralizedESD, ResultCache, Pipeline
+from datagen import mixed_frame, numeric_frame, train_test_frames
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+
+
+BENCHMARKS = {}
+
+
+
+def benchmark(name):
+
+    # registers a function building, from the grid point, the callable to be measured
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+
+
+@benchmark('MissingData.count')
+def missing_count(rows, columns, missing, cardinality):
+    X = mixed_frame(rows, columns, cardinality, missing)
+    labels = list(X.columns)
+    return lambda: MissingData().count(X, labels, 0.05)
+
+
+
+@benchmark('MissingData.count_stream')
+def missing_count_stream(rows, columns, missing, cardinality):
+    X = mixed_frame(rows, columns, cardinality, missing)
+    labels = list(X.columns)
+    return lambda: MissingData().count_stream(X, labels, 0.05, chunksize=max(rows // 10, 1))
+
+
+
+@benchmark('MissingData.partial_fit')
+def missing_partial_fit(rows, columns, missing, cardinality):
+    X = mixed_frame(rows, columns, cardinality, missing)
+    labels = list(X.columns)
+    mo = MissingData()
+    mo.count(X, labels, 0.05)
+    return lambda: mo.partial_fit(X)
+
+
+
+@benchmark('MissingData.transform')
+def missing_transform(rows, columns, missing, cardinality):
+    X = mixed_frame(rows, columns, cardinality, missing)
+    mo = MissingData()
+    mo.count(X, list(X.columns), 0.05)
+    return lambda: (mo.summary(), mo.transform(X))
+
+
+
+@benchmark('MissingData.count_rows')
+def missing_count_rows(rows, columns, missing, cardinality):
+    X = mixed_frame(rows, columns, cardinality, missing)
+    labels = list(X.columns)
+    return lambda: MissingData().count_rows(X, labels, 0.05, 0.05)
+
+
+
+@benchmark('MissingData.transform_rows')
+def missing_transform_rows(rows, columns, missing, cardinality):
+    X = mixed_frame(rows, columns, cardinality, missing)
+    mo = MissingData()
+    mo.count_rows(X, list(X.columns), store=False)
+    return lambda: mo.transform_rows(X, 0.05)
+
+
+
+@benchmark('MissingData.count_sample')
+def missing_count_sample(rows, columns, missing, cardinality):
+    X = mixed_frame(rows, columns, cardinality, missing)
+    labels = list(X.columns)
+    return lambda: MissingData().count_sample(X, labels, 0.05, size=max(rows // 10, 1), block=100, random_state=0)
+
+
+
+@benchmark('CategoricalHero.shape_detector')
+def hero_shape_detector(rows, columns, missing, cardinality):
+    X, Y = train_test_frames(rows, columns, cardinality, missing)
+    labels = list(X.columns)
+    return lambda: CategoricalHero().shape_detector(X, Y, labels)
+
+
+
+@benchmark('CategoricalHero.shape_detector[approximate]')
+def hero_approximate_detector(rows, columns, missing, cardinality):
+    X, Y = train_test_frames(rows, columns, cardinality, missing)
+    labels = list(X.columns)
+    params = {'capacity': max(cardinality * 2, 1000)}
+    return lambda: CategoricalHero().shape_detector(X, Y, labels, approximate=True, sketch_params=params)
+
+
+
+@benchmark('CategoricalHero.shape_detector[numeric]')
+def hero_numeric_detector(rows, columns, missing, cardinality):
+    X = numeric_frame(rows, columns, missing, seed=0)
+    Y = numeric_frame(rows, columns, missing, seed=1) * 1.1
+    return lambda: CategoricalHero().shape_detector(X, Y, [], numeric=list(X.columns))
+
+
+
+if pa is not None:
+
+    @benchmark('MissingData.count[arrow]')
+    def missing_count_arrow(rows, columns, missing, cardinality):
+        X = pa.Table.from_pandas(mixed_frame(rows, columns, cardinality, missing), preserve_index=False)
+        labels = X.schema.names
+        return lambda: MissingData().count(X, labels, 0.05)
+
+
+
+    @benchmark('CategoricalHero.shape_detector[arrow]')
+    def hero_arrow_detector(rows, columns, missing, cardinality):
+        X, Y = [pa.Table.from_pandas(frame, preserve_index=False) for frame in train_test_frames(rows, columns, cardinality, missing)]
+        labels = X.schema.names
+
+        def run():
+            mo = CategoricalHero()
+            mo.shape_detector(X, Y, labels)
+            return mo.shape_slicer(X, Y, choice='both')
+        return run
+
+
+
+@benchmark('CategoricalHero.shape_detector[sampled]')
+def hero_sampled_detector(rows, columns, missing, cardinality):
+    X, Y = train_test_frames(rows, columns, cardinality, missing)
+    labels = list(X.columns)
+    params = {'size': max(rows // 10, 1), 'block': 100, 'random_state': 0}
+    return lambda: CategoricalHero().shape_detector(X, Y, labels, sampled=True, sample_params=params)
+
+
+
+@benchmark('CategoricalHero.shape_slicer')
+def hero_shape_slicer(rows, columns, missing, cardinality):
+    X, Y = train_test_frames(rows, columns, cardinality, missing)
+    mo = CategoricalHero()
+    mo.shape_detector(X, Y, list(X.columns))
+    return lambda: mo.shape_slicer(X, Y, choice='both')
+
+
+
+@benchmark('CategoricalHero.shape_detector[drift]')
+def hero_drift_detector(rows, columns, missing, cardinality):
+    X, Y = train_test_frames(rows, columns, cardinality, missing)
+    labels = list(X.columns)
+    return lambda: CategoricalHero().shape_detector(X, Y, labels, drift=True)
+
+
+
+@benchmark('CategoricalHero.shape_detector[cached]')
+def hero_cached_detector(rows, columns, missing, cardinality):
+    # warm cache, one column changed since the previous call
+    X, Y = train_test_frames(rows, columns, cardinality, missing)
+    labels = list(X.columns)
+    cache = ResultCache()
+    CategoricalHero(cache=cache).shape_detector(X, Y, labels)
+    X[labels[0]] = X[labels[0]].iloc[::-1].values
+    return lambda: CategoricalHero(cache=cache).shape_detector(X, Y, labels)
+
+
+
+@benchmark('CategoricalHero.shape_detector_multi')
+def hero_shape_detector_multi(rows, columns, missing, cardinality):
+    frames = [train_test_frames(rows, columns, cardinality, missing, seed=seed)[0] for seed in range(5)]
+    labels = list(frames[0].columns)
+    return lambda: CategoricalHero().shape_detector_multi(frames, labels)
+
+
+
+@benchmark('CategoricalHero.transform')
+def hero_transform(rows, columns, missing, cardinality):
+    X, Y = train_test_frames(rows, columns, cardinality, missing)
+    mo = CategoricalHero().fit(X, list(X.columns))
+    return lambda: mo.transform(Y)
+
+
+
+@benchmark('GeneralizedESD.fit')
+def esd_fit(rows, columns, missing, cardinality):
+    X = numeric_frame(rows, columns, missing)
+    return lambda: GeneralizedESD().fit(X, list(X.columns))
+
+
+
+@benchmark('Pipeline.fit_transform')
+def pipeline_fit_transform(rows, columns, missing, cardinality):
+    X, Y = train_test_frames(rows, columns, cardinality, missing)
+    return lambda: Pipeline(threshold=0.3, choice='both').fit_transform(X, Y, list(X.columns))
+
+
+
+@benchmark('Pipeline[unfused]')
+def pipeline_unfused(rows, columns, missing, cardinality):
+    # the same steps, one after the other
+    X, Y = train_test_frames(rows, columns, cardinality, missing)
+    labels = list(X.columns)
+
+    def run():
+        md = MissingData()
+        md.count(X, labels, 0.3)
+        X1, Y1 = md.transform(X), Y.drop(md.support_filter_, axis=1)
+        ch = CategoricalHero()
+        ch.shape_detector(X1, Y1, [i for i in labels if i in X1.columns])
+        return ch.shape_slicer(X1, Y1, choice='both')
+    return run
+
+
+
+def measure(func, repeat):
+
+    # wall time without tracing overhead, then one traced run for the peak memory
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+
+
+def key(record):
+    return (record['benchmark'], record['rows'], record['columns'], record['missing'], record['cardinality'])
+
+
+
+def compare(results, baseline, tolerance):
+
+    # returns the list of (record, metric, ratio) exceeding the tolerance
+    reference = dict((key(r), r) for r in baseline)
+    regressions = []
+    for record in results:
+        old = reference.get(key(record))
+        if old is None:
+            continue
+        for metric in ('time', 'peak_memory'):
+            if old[metric] > 0:
+                ratio = record[metric] / old[metric]
+                record[metric + '_ratio'] = ratio
+                if ratio > 1 + tolerance:
+                    regressions.append((record, metric, ratio))
+    return regressions
+
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--columns', type=int, nargs='+', default=[10])
+    parser.add_argument('--missing', type=float, nargs='+', default=[0.1])
+    parser.add_argument('--cardinality', type=int, nargs='+', default=[100, 10000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--filter', default='', help='run only the benchmarks whose name contains this string')
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--baseline', default=None, help='JSON file written by a previous run')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed relative slow down, 0.2 by default')
+    args = parser.parse_args(argv)
+
+    results = []
+    grid = itertools.product(sorted(BENCHMARKS), args.rows, args.columns, args.missing, args.cardinality)
+    for name, rows, columns, missing, cardinality in grid:
+        if args.filter not in name:
+            continue
+        func = BENCHMARKS[name](rows, columns, missing, cardinality)
+        elapsed, peak = measure(func, args.repeat)
+        record = {'benchmark': name, 'rows': rows, 'columns': columns, 'missing': missing,
+                  'cardinality': cardinality, 'time': elapsed, 'peak_memory': peak}
+        results.append(record)
+        print('%-45s rows=%-9d cols=%-5d missing=%-5.2f card=%-8d %9.4f s %10.2f MB'
+              % (name, rows, columns, missing, cardinality, elapsed, peak / 2.**20))
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.tolerance)
+        for record, metric, ratio in regressions:
+            print('REGRESSION %s %s: %.2fx' % (' '.join(str(k) for k in key(record)), metric, ratio))
+        status = 1 if regressions else 0
+
+    with open(args.output, 'w') as f:
+        json.dump({'python': platform.python_version(), 'platform': platform.platform(), 'results': results}, f, indent=1)
+
+    return status
+
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -8,12 +8,11 @@ setup(name='STLP_py',
       author='Francesco Capponi',
       author_email='capponi.francesco87@gmail.com',
       license='BSD 3 clause',
-      #packages=['boruta'],
-      #package_dir={'boruta': 'boruta'},
-      #package_data={'boruta/examples/*csv': ['boruta/examples/*.csv']},
-      #include_package_data = True,
+      packages=['STLP_py'],
+      entry_points={'console_scripts': ['stlp-profile=STLP_py.batch_profiler:main']},
       keywords=['Nan-percentage', 'shapes detection', 'ESD method','outliers','outliers detection'],
       install_requires=['numpy>=1.10.4',
-                        'scikit-learn>=0.17.1',
-                        'pandas>=0.17.0'
-                        ])
+                        'scipy',
+                        'pandas>=0.23.0'
+                        ],
+      extras_require={'parquet': ['pyarrow']})
@@ -0,0 +1,116 @@
+"""
+Author: Francesco Capponi <capponi.francesco87@gmail.com>
+
+License: BSD 3 clause
+
+"""
+
+
+
+import unittest
+from STLP_py import MissingData, CategoricalHero
+import pandas as pd
+import numpy as np
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+
+
+@unittest.skipIf(pa is None, 'pyarrow not installed')
+class ArrowTest(unittest.TestCase):
+
+    def setUp(self):
+
+        rng = np.random.RandomState(0)
+        n = 400
+        self.X = pd.DataFrame({'a': np.where(rng.rand(n) < .1, None, rng.choice(['u', 'v', 'w'], n)).astype(object),
+                               'b': rng.choice(['p', 'q', 'only_train'], n, p=[.5, .45, .05]).astype(object),
+                               'f': np.where(rng.rand(n) < .2, np.nan, rng.randn(n)),
+                               'k': rng.randint(0, 5, n)})
+        self.Y = pd.DataFrame({'a': np.where(rng.rand(n) < .1, None, rng.choice(['u', 'v', 'w', 'only_test'], n, p=[.3, .3, .3, .1])).astype(object),
+                               'b': rng.choice(['p', 'q'], n).astype(object),
+                               'f': rng.randn(n) * 2,
+                               'k': rng.randint(0, 5, n)})
+        # several chunks, a dictionary column and a NaN stored as a regular float
+        self.A = pa.concat_tables([pa.Table.from_pandas(self.X.iloc[:150], preserve_index=False),
+                                   pa.Table.from_pandas(self.X.iloc[150:], preserve_index=False)])
+        self.A = self.A.set_column(1, 'b', self.A.column('b').dictionary_encode())
+        f = self.X['f'].values
+        self.A = self.A.set_column(2, 'f', pa.chunked_array([pa.array(f[:150], from_pandas=False), pa.array(f[150:], from_pandas=False)]))
+        self.B = pa.Table.from_pandas(self.Y, preserve_index=False)
+        self.labels = ['a', 'b', 'f', 'k']
+
+
+
+    def test_missing_data(self):
+
+        md = MissingData()
+        md.count(self.X, self.labels, .15)
+        ma = MissingData()
+        ma.count(self.A, self.labels, .15)
+        pd.testing.assert_frame_equal(ma.summary(), md.summary())
+        mp = MissingData()
+        mp.count_parquet(self.A, self.labels, .15)
+        pd.testing.assert_frame_equal(mp.summary(), md.summary(), "NaN values are counted by both entry points")
+
+        A = ma.transform(self.A)
+        self.assertIsInstance(A, pa.Table)
+        self.assertEqual(A.schema.names, list(md.transform(self.X).columns))
+        self.assertEqual(A.column('a').chunk(0).buffers()[2].address, self.A.column('a').chunk(0).buffers()[2].address, "Columns are not copied")
+
+        md.count_rows(self.X, self.labels, row_threshold=.2)
+        ma.count_rows(self.A, self.labels, row_threshold=.2, chunksize=64)
+        np.testing.assert_array_equal(ma.row_missing_.values, md.row_missing_.values)
+        np.testing.assert_array_equal(ma.transform_rows(self.A, output='mask'), md.transform_rows(self.X, output='mask'))
+        self.assertEqual(ma.transform_rows(self.A).num_rows, len(md.transform_rows(self.X)))
+
+
+
+    def test_categorical_hero(self):
+
+        ch = CategoricalHero()
+        ch.shape_detector(self.X, self.Y, ['a', 'b'], drift=True, numeric=['f'], bins=4)
+        ca = CategoricalHero()
+        ca.shape_detector(self.A, self.B.to_batches()[0], ['a', 'b'], drift=True, numeric=['f'], bins=4)
+        self.assertEqual(ca.detected_, ch.detected_)
+        for i in ch.detected_:
+            pd.testing.assert_frame_equal(ca.detector_[i], ch.detector_[i])
+        pd.testing.assert_frame_equal(ca.drift_, ch.drift_)
+
+        for choice in ('train', 'test', 'both'):
+            masks = ch.shape_slicer(self.X, self.Y, choice=choice, output='mask')
+            for mask, ref in zip(ca.shape_slicer(self.A, self.B, choice=choice, output='mask'), masks):
+                np.testing.assert_array_equal(mask, ref)
+            A, B = ca.shape_slicer(self.A, self.B, choice=choice)
+            X, Y = ch.shape_slicer(self.X, self.Y, choice=choice)
+            pd.testing.assert_frame_equal(A.to_pandas().astype({'b': object}), X.reset_index(drop=True))
+            pd.testing.assert_frame_equal(B.to_pandas(), Y.reset_index(drop=True))
+
+        ca.fit(self.A, ['a', 'b'])
+        ch.fit(self.X, ['a', 'b'])
+        np.testing.assert_array_equal(ca.transform(self.B, output='mask'), ch.transform(self.Y, output='mask'))
+        self.assertEqual(list(ca.unseen(self.B)['a']), ['only_test'])
+        self.assertRaises(ValueError, ca.shape_detector, self.A, self.B, ['a'], approximate=True)
+
+
+
+    def test_zero_copy(self):
+
+        # a single run of kept observations is a slice of the original buffers
+        Y = self.X.copy()
+        Y.loc[len(Y) - 1, 'k'] = 99
+        ch = CategoricalHero()
+        ch.shape_detector(self.X, Y, ['k'])
+        source = pa.Table.from_pandas(Y, preserve_index=False)
+        A, B = ch.shape_slicer(self.A, source, choice='test')
+        self.assertIs(A, self.A)
+        self.assertEqual(B.num_rows, len(Y) - 1)
+        self.assertEqual(B.column('f').chunk(0).buffers()[1].address, source.column('f').chunk(0).buffers()[1].address)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+"""
+Author: Francesco Capponi <capponi.francesco87@gmail.com>
+
+License: BSD 3 clause
+
+"""
+
+
+
+import unittest
+import os
+import tempfile
+from STLP_py import MissingData
+from STLP_py.batch_profiler import main, find_files
+import pandas as pd
+import numpy as np
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+
+class BatchProfilerTest(unittest.TestCase):
+
+    def setUp(self):
+
+        rng = np.random.RandomState(0)
+        self.directory = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.directory, 'sub'))
+        self.frames = {}
+        for k in range(3):
+            df = pd.DataFrame({'a': np.where(rng.rand(300) < .1, None, rng.choice(['u', 'v', 'w'], 300)),
+                               'x': np.where(rng.rand(300) < .2, np.nan, rng.randn(300))})
+            path = os.path.join(self.directory, 'sub' if k else '', 'f%d.csv' % k)
+            df.to_csv(path, index=False)
+            self.frames[path] = df
+        with open(os.path.join(self.directory, 'notes.txt'), 'w') as f:
+            f.write('not a data file')
+
+
+
+    def test_reports(self):
+
+        output = os.path.join(self.directory, 'reports')
+        status = main([self.directory, '--output', output, '--jobs', '2', '--backend', 'threading', '--chunksize', '70', '--top', '2'])
+        self.assertEqual(status, 0)
+        self.assertEqual(len(find_files([self.directory])), 3)
+
+        columns = pd.read_json(os.path.join(output, 'columns.json'))
+        for path, df in self.frames.items():
+            md = MissingData()
+            md.count(df, ['a', 'x'])
+            report = columns[columns['file'] == path].set_index('column')
+            self.assertEqual(list(report['rows']), [300, 300])
+            for i in ['a', 'x']:
+                self.assertEqual(report.loc[i, 'missing'], df[i].isnull().sum())
+                self.assertAlmostEqual(report.loc[i, 'percent'], md.percent_[i])
+            self.assertEqual(report.loc['a', 'n_categories'], 3)
+
+        categories = pd.read_json(os.path.join(output, 'categories.json'))
+        self.assertEqual(len(categories), 3 * 2, "Top 2 categories per file")
+        self.assertTrue((categories['column'] == 'a').all())
+
+
+
+    def test_errors(self):
+
+        with open(os.path.join(self.directory, 'bad.csv'), 'w') as f:
+            f.write('a,b\n1,2\n"unterminated')
+        output = os.path.join(self.directory, 'reports')
+        self.assertEqual(main([os.path.join(self.directory, '*.csv'), '--output', output, '--jobs', '1', '--backend', 'threading']), 1)
+        files = pd.read_json(os.path.join(output, 'files.json'))
+        self.assertEqual(files['error'].notnull().sum(), 1)
+        self.assertEqual(main([os.path.join(self.directory, 'missing_*.csv')]), 1)
+
+
+
+    @unittest.skipIf(pyarrow is None, 'pyarrow not installed')
+    def test_parquet(self):
+
+        path = os.path.join(self.directory, 'f.parquet')
+        list(self.frames.values())[0].to_parquet(path, index=False)
+        output = os.path.join(self.directory, 'reports')
+        self.assertEqual(main([path, '--output', output, '--format', 'parquet', '--jobs', '2']), 0)
+        columns = pd.read_parquet(os.path.join(output, 'columns.parquet'))
+        self.assertEqual(list(columns['missing']), [self.frames[list(self.frames)[0]][i].isnull().sum() for i in ['a', 'x']])
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+"""
+Author: Francesco Capponi <capponi.francesco87@gmail.com>
+
+License: BSD 3 clause
+
+"""
+
+
+
+import unittest
+import os
+import tempfile
+from STLP_py import MissingData, CategoricalHero, ResultCache
+import pandas as pd
+import numpy as np
+
+
+
+class ResultCacheTest(unittest.TestCase):
+
+    def test_layers(self):
+
+        directory = tempfile.mkdtemp()
+        cache = ResultCache(max_items=2, directory=directory)
+        for key in 'abc':
+            cache.put(key, key * 3)
+        self.assertEqual(cache.get('c'), 'ccc')
+        self.assertEqual(cache.get('a'), 'aaa', "Evicted from memory, read from disk")
+        self.assertEqual((cache.hits_, cache.disk_hits_, cache.misses_), (2, 1, 0))
+        self.assertIsNone(cache.get('d'))
+        self.assertEqual(cache.misses_, 1)
+
+        other = ResultCache(directory=directory)
+        self.assertEqual(other.get('b'), 'bbb', "Persistent layer")
+
+        size = os.path.getsize(os.path.join(directory, 'a.pkl'))
+        small = ResultCache(max_items=0, directory=tempfile.mkdtemp(), max_bytes=2 * size)
+        for key in 'xyz':
+            small.put(key, key * 3)
+        self.assertIsNone(small.get('x'), "Least recently used file evicted")
+        self.assertEqual(small.get('z'), 'zzz')
+
+        cache.clear()
+        self.assertEqual(os.listdir(directory), [])
+        self.assertEqual(cache.hits_, 0)
+
+    def test_keys(self):
+
+        cache = ResultCache()
+        s = pd.Series(['a', 'b', np.nan], name='x')
+        self.assertEqual(cache.key(s, 'tag'), cache.key(s.rename('y').set_axis([3, 4, 5]), 'tag'))
+        self.assertNotEqual(cache.key(s, 'tag'), cache.key(s, 'other'))
+        self.assertNotEqual(cache.key(s, 'tag'), cache.key(pd.Series(['a', 'c', np.nan]), 'tag'))
+        self.assertNotEqual(cache.key(pd.Series([1, 2]), 'tag'), cache.key(pd.Series([1., 2.]), 'tag'))
+        c = pd.Series(pd.Categorical(['p', 'q'], categories=['p', 'q']))
+        self.assertEqual(cache.key(c, 'tag'), cache.key(c.copy(), 'tag'))
+        self.assertNotEqual(cache.key(c, 'tag'), cache.key(c.cat.add_categories('r'), 'tag'), "Unused categories")
+        self.assertNotEqual(cache.key(c, 'tag'), cache.key(c.cat.as_ordered(), 'tag'))
+
+    def test_integration(self):
+
+        rng = np.random.RandomState(0)
+        X = pd.DataFrame(dict(('c%d' % j, rng.choice(np.array(['u', 'v', 'w', np.nan], dtype=object), 100)) for j in range(4)))
+        Y = pd.DataFrame(dict(('c%d' % j, rng.choice(['u', 'v', 'z'], 50)) for j in range(4)))
+        labels = list(X.columns)
+
+        cache = ResultCache()
+        MissingData(cache=cache).count(X, labels)
+        X['c1'] = rng.choice(['u', 'v'], 100)
+        md = MissingData(cache=cache)
+        md.count(X, labels)
+        self.assertEqual((cache.hits_, cache.misses_), (3, 5), "Only the changed column is recounted")
+        reference = MissingData()
+        reference.count(X, labels)
+        pd.testing.assert_frame_equal(md.summary(), reference.summary())
+
+        cache = ResultCache()
+        CategoricalHero(cache=cache).shape_detector(X, Y, labels)
+        X['c2'] = rng.choice(['u', 'z'], 100)
+        mo = CategoricalHero(cache=cache)
+        mo.shape_detector(X, Y, labels, drift=True)
+        reference = CategoricalHero()
+        reference.shape_detector(X, Y, labels, drift=True)
+        self.assertEqual((cache.hits_, cache.misses_), (3, 5))
+        self.assertEqual(mo.detected_, reference.detected_)
+        for i in mo.detected_:
+            pd.testing.assert_frame_equal(mo.detector_[i], reference.detector_[i])
+        pd.testing.assert_frame_equal(mo.drift_, reference.drift_)
+
+
+    def test_column_names(self):
+
+        # identical or renamed columns share their cache entries, not their labels
+        X = pd.DataFrame({'a': ['u', 'v', 'v'], 'b': ['u', 'v', 'v']})
+        Y = pd.DataFrame({'a': ['u', 'w', 'w'], 'b': ['u', 'w', 'w']})
+        cache = ResultCache()
+        for run in range(2):
+            mo = CategoricalHero(cache=cache)
+            mo.shape_detector(X, Y, ['a', 'b'])
+            for i in ['a', 'b']:
+                self.assertEqual(list(mo.detector_[i].columns), [('train', i), ('test', i)])
+        mo.shape_detector(X.rename(columns={'a': 'zz'}), Y.rename(columns={'a': 'zz'}), ['zz'])
+        self.assertEqual(list(mo.detector_['zz'].columns), [('train', 'zz'), ('test', 'zz')])
+        self.assertGreater(cache.hits_, 0)
+
+        # same values, different unused categories
+        X1 = pd.DataFrame({'a': pd.Categorical(['p', 'q'], categories=['p', 'q', 'r'])})
+        X2 = pd.DataFrame({'a': pd.Categorical(['p', 'q'], categories=['p', 'q'])})
+        reference = CategoricalHero()
+        reference.shape_detector(X2, X2, ['a'])
+        cache = ResultCache()
+        CategoricalHero(cache=cache).shape_detector(X1, X2, ['a'])
+        mo = CategoricalHero(cache=cache)
+        mo.shape_detector(X2, X2, ['a'])
+        self.assertEqual(mo.detected_, reference.detected_)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,9 +8,13 @@ License: BSD 3 clause
 
 
 import unittest
-from STLP_py import CategoricalHero
+from STLP_py import CategoricalHero, CategoricalImputer, OrdinalEncoder
 import pandas as pd
 import numpy as np
+from scipy import stats
+from scipy.spatial.distance import jensenshannon
+import os
+import tempfile
 
 
 
@@ -90,5 +94,330 @@ class CategoricalHeroTest1(unittest.TestCase):
                 for k,j in zip(mo.detector_[i][colA],check[i][colB]):
                     np.testing.assert_equal(k,j,"Checking detector data frame data")
 
+    def test_slicer(self):
+
+        train = pd.DataFrame(columns=['a','b','c'], index=['0','1','1','3'])
+        train.iloc[0] = pd.Series({'a':'car', 'b':'cat', 'c':'neo'})
+        train.iloc[1] = pd.Series({'a':'truck', 'b':'dog', 'c':'morpheus'})
+        train.iloc[2] = pd.Series({'a':np.nan, 'b':'cheetah', 'c':'trinity'})
+        train.iloc[3] = pd.Series({'a':'bike', 'b':'lion', 'c':np.nan})
+
+        test = pd.DataFrame(columns=['a','b','c'], index=['0','1','2','3'])
+        test.loc['0'] = pd.Series({'a':'car', 'b':'cat', 'c':'neo'})
+        test.loc['1'] = pd.Series({'a':'truck', 'b':'dog', 'c':'morpheus'})
+        test.loc['2'] = pd.Series({'a':'tractor', 'b':'lion', 'c':'trinity'})
+        test.loc['3'] = pd.Series({'a':'bike', 'b':'lion', 'c':'morpheus'})
+
+        mo = CategoricalHero()
+        mo.shape_detector(train,test,['a','b','c'])
+
+        # "cheetah" appears only in train, "tractor" only in test; train has a duplicated index
+        X,Y = mo.shape_slicer(train,test,choice="train")
+        self.assertEqual(list(X['b']),['cat','dog','lion'],"Checking sliced train set")
+        self.assertTrue(Y is test,"Checking untouched test set")
+
+        X,Y = mo.shape_slicer(train,test,choice="test")
+        self.assertTrue(X is train,"Checking untouched train set")
+        self.assertEqual(list(Y['a']),['car','truck','bike'],"Checking sliced test set")
+
+        X,Y = mo.shape_slicer(train,test,choice="both")
+        self.assertEqual(len(X),3,"Checking sliced train set")
+        self.assertEqual(len(Y),3,"Checking sliced test set")
+
+        maskX,maskY = mo.shape_slicer(train,test,choice="both",output="mask")
+        np.testing.assert_array_equal(maskX,[True,True,False,True])
+        np.testing.assert_array_equal(maskY,[True,True,False,True])
+
+        idxX,idxY = mo.shape_slicer(train,test,choice="both",output="index")
+        np.testing.assert_array_equal(idxX,[0,1,3])
+        np.testing.assert_array_equal(idxY,[0,1,3])
+
+        self.assertRaises(ValueError,mo.shape_slicer,train,test,choice="none")
+        self.assertRaises(ValueError,mo.shape_slicer,train,test,output="none")
+
+    def test_parallel(self):
+
+        rng = np.random.RandomState(0)
+        train = pd.DataFrame(dict(('f%d' % j, rng.randint(0, 8, 100)) for j in range(5)))
+        test = pd.DataFrame(dict(('f%d' % j, rng.randint(1, 9, 100)) for j in range(5)))
+        train['s'] = np.array(['u','v','w'], dtype=object)[rng.randint(0, 3, 100)]
+        test['s'] = np.array(['u','v','z'], dtype=object)[rng.randint(0, 3, 100)]
+        labels = list(train.columns)
+
+        ref = CategoricalHero()
+        ref.shape_detector(train,test,labels)
+
+        for backend in ['threading','processes']:
+            mo = CategoricalHero(n_jobs=2, backend=backend)
+            mo.shape_detector(train,test,labels)
+            self.assertEqual(mo.detected_,ref.detected_,"Checking detected features")
+            for i in ref.detected_:
+                pd.testing.assert_frame_equal(mo.detector_[i],ref.detector_[i])
+
+    def test_approximate(self):
+
+        rng = np.random.RandomState(0)
+        train = pd.DataFrame({'a': np.array(['u%d' % k for k in rng.randint(0, 500, 5000)], dtype=object)})
+        test = pd.DataFrame({'a': np.array(['u%d' % k for k in rng.randint(0, 500, 5000)], dtype=object)})
+        train.loc[:9, 'a'] = 'only_train'
+        test.loc[:19, 'a'] = 'only_test'
+        train.loc[10:19, 'a'] = np.nan
+
+        mo = CategoricalHero()
+        mo.shape_detector(train,test,['a'],approximate=True,sketch_params={'capacity':10000},chunksize=1000)
+
+        self.assertEqual(mo.detected_,['a'],"Checking detected features")
+        table = mo.detector_['a']
+        self.assertEqual(list(table.index),['only_test','only_train','% missings'],"Checking mismatching categories")
+        self.assertTrue(np.isnan(table.loc['only_test',('train','a')]))
+        self.assertAlmostEqual(table.loc['only_test',('test','a')],20./5000,3)
+        self.assertAlmostEqual(table.loc['only_train',('train','a')],10./4990,3)
+        self.assertAlmostEqual(table.loc['% missings',('train','a')],10./5000)
+        self.assertLess(abs(mo.cardinality_['a'][0]/501. - 1),0.05,"Checking cardinality estimate")
+
+        X,Y = mo.shape_slicer(train,test,choice="both")
+        self.assertFalse((X['a']=='only_train').any())
+        self.assertFalse((Y['a']=='only_test').any())
+
+        self.assertEqual(mo.n_mismatching_['a'],(1,1))
+
+        # disjoint high cardinality features: only the heaviest mismatching categories are kept, all of them are counted
+        train = pd.DataFrame({'id':np.array(['a%d' % k for k in range(3000)],dtype=object)})
+        test = pd.DataFrame({'id':np.array(['b%d' % k for k in range(3000)],dtype=object)})
+        train.loc[:99,'id'] = 'heavy'
+        mo.shape_detector(train,test,['id'],approximate=True,sketch_params={'capacity':10000,'max_report':10},chunksize=500)
+        self.assertEqual(len(mo.detector_['id']),21,"Checking reported categories")
+        self.assertEqual(mo.detector_['id'][('train','id')].idxmax(),'heavy')
+        self.assertLess(abs(mo.n_mismatching_['id'][0]/2901. - 1),0.05,"Checking estimated number of mismatching categories")
+        self.assertEqual(mo.shape_slicer(train,test,choice='train',output='mask')[0].sum(),3000-109,"Only reported categories are dropped")
+        self.assertRaises(ValueError,mo.shape_detector,train,test,['id'],approximate=True,sketch_params={'max_report':0})
+
+        # integer coded categories, float in the frame with missing values
+        train = pd.DataFrame({'a':[1.,2.,np.nan,3.]})
+        test = pd.DataFrame({'a':[1,2,3,3]})
+        mo.shape_detector(train,test,['a'],approximate=True)
+        self.assertEqual(mo.detected_,[],"Checking mixed int and float frames")
+        mo.shape_detector(train,test.replace(3,4),['a'],approximate=True)
+        self.assertEqual(list(mo.detector_['a'].index),[3.,4.,'% missings'])
+
+    def test_vocabulary(self):
+
+        train = pd.DataFrame({'a':['car','truck',np.nan,'bike'], 'b':['cat','dog','cheetah','lion']})
+        test = pd.DataFrame({'a':['car','truck','tractor',np.nan], 'b':['cat','dog','lion','cow']})
+
+        mo = CategoricalHero()
+        self.assertRaises(ValueError,mo.transform,test)
+        mo.fit(train,['a','b'])
+
+        self.assertEqual(list(mo.vocabulary_['a']),['bike','car','truck'],"Checking fitted categories")
+        np.testing.assert_array_equal(mo.transform(test,output="mask"),[True,True,False,False])
+        np.testing.assert_array_equal(mo.transform(test,output="index"),[0,1])
+        self.assertEqual(list(mo.transform(test)['a']),['car','truck'],"Checking sliced data frame")
+        self.assertEqual(list(mo.unseen(test)['a']),['tractor'],"Checking unseen categories")
+        self.assertEqual(list(mo.unseen(test)['b']),['cow'],"Checking unseen categories")
+
+        self.assertTrue(mo.is_known({'a':'car','b':'lion'}))
+        self.assertTrue(mo.is_known(pd.Series({'a':np.nan,'b':'lion'})))
+        self.assertFalse(mo.is_known({'a':'car','b':'cow'}))
+
+        path = os.path.join(tempfile.mkdtemp(), 'vocabulary.pkl')
+        mo.save(path)
+        loaded = CategoricalHero().load(path)
+        np.testing.assert_array_equal(loaded.transform(test,output="mask"),[True,True,False,False])
+
+    def test_drift(self):
+
+        rng = np.random.RandomState(0)
+        train = pd.DataFrame({'a':rng.choice(['x','y','z'],1000,p=[.5,.3,.2]),'b':rng.choice(['u','v'],1000)})
+        test = pd.DataFrame({'a':rng.choice(['x','y','z'],800,p=[.3,.3,.4]),'b':rng.choice(['u','v','w'],800)})
+        train.loc[::10,'b'] = np.nan
+
+        mo = CategoricalHero()
+        self.assertRaises(ValueError,mo.shape_detector,train,test,['a','b'],approximate=True,drift=True)
+        mo.shape_detector(train,test,['a','b'],drift=True)
+        self.assertEqual(mo.detected_,['b'],"Drift mode does not change the detection")
+
+        for i in ['a','b']:
+            table = pd.concat([train[i].value_counts(),test[i].value_counts()],axis=1).fillna(0).values
+            chi2, pvalue = stats.chi2_contingency(table.T,correction=False)[:2]
+            p, q = table[:,0]/table[:,0].sum(), table[:,1]/table[:,1].sum()
+            self.assertAlmostEqual(mo.drift_.loc[i,'chi2'],chi2)
+            self.assertAlmostEqual(mo.drift_.loc[i,'p_value'],pvalue)
+            self.assertAlmostEqual(mo.drift_.loc[i,'js'],jensenshannon(p,q,base=2)**2)
+        self.assertGreater(mo.drift_.loc['a','psi'],0.1,"Checking shifted frequencies")
+        self.assertEqual(list(mo.drift_['n_categories']),[3,3])
+        self.assertAlmostEqual(mo.drift_.loc['b','missing_train'],0.1)
+
+    def test_numeric(self):
+
+        rng = np.random.RandomState(0)
+        train = pd.DataFrame({'a':rng.choice(['x','y'],600),'n':rng.randn(600),'gap':np.r_[rng.rand(300),rng.rand(300)+3],
+                              'k':pd.array(rng.randint(0,10,600),dtype='Int64')})
+        test = pd.DataFrame({'a':rng.choice(['x','y'],500),'n':np.r_[rng.randn(497),-9,9,np.nan],'gap':rng.rand(500)*4,
+                             'k':pd.array(rng.randint(0,10,500),dtype='Int64')})
+        train.loc[::7,'k'] = None
+        numeric = ['n','gap','k']
+
+        mo = CategoricalHero()
+        mo.shape_detector(train,test,['a'],numeric=numeric,bins=8,chunksize=128)
+        self.assertEqual(mo.detected_,['n','gap'],"Out of range values and empty train bins")
+        for i in numeric:
+            values = train[i].astype(float).dropna()
+            edges = np.linspace(values.min(),values.max(),9)
+            np.testing.assert_allclose(mo.edges_[i],edges)
+            for frame, side in ((train,'train'),(test,'test')):
+                x = frame[i].astype(float).dropna().values
+                counts = np.r_[(x<edges[0]).sum(),np.histogram(x[(x>=edges[0])&(x<=edges[-1])],edges)[0],(x>edges[-1]).sum()]
+                if i in mo.detector_:
+                    freq = mo.detector_[i][side][i].values
+                    np.testing.assert_allclose(np.nan_to_num(freq[:-1]),counts/counts.sum())
+                    self.assertAlmostEqual(freq[-1],frame[i].isnull().mean())
+        self.assertEqual(mo.detector_['n'].index[0],pd.Interval(-np.inf,mo.edges_['n'][0],closed='neither'))
+
+        # test observations out of the train support are removed, missing values are kept
+        keep = mo.shape_slicer(train,test,choice='test',output='mask')[1]
+        edges = mo.edges_['gap']
+        empty = np.flatnonzero(np.histogram(train['gap'],edges)[0]==0)
+        inside = (test['n'].between(mo.edges_['n'][0],mo.edges_['n'][-1])|test['n'].isnull())&test['gap'].between(edges[0],edges[-1])&\
+                 ~np.isin(np.clip(np.searchsorted(edges,test['gap'],side='right')-1,0,7),empty)
+        np.testing.assert_array_equal(keep,inside.values)
+        X, Y = mo.shape_slicer(train,test,choice='both')
+        self.assertEqual(len(Y),inside.sum())
+        self.assertIs(X,train,"Every train bin is populated in test")
+
+        mo.shape_detector(train,test,['a'],numeric=numeric,drift=True)
+        self.assertEqual(list(mo.drift_.index),['a']+numeric)
+        self.assertGreater(mo.drift_.loc['gap','psi'],mo.drift_.loc['n','psi'])
+        self.assertRaises(ValueError,mo.shape_detector,train,test,['a'],numeric=['a'])
+        self.assertRaises(ValueError,mo.shape_detector,train,test,['n'],numeric=['n'])
+        self.assertRaises(ValueError,mo.shape_detector,train,test,['a'],numeric=['n'],bins=0)
+
+    def test_sampled(self):
+
+        rng = np.random.RandomState(0)
+        n = 40000
+        train = pd.DataFrame({'a':np.array(['x','y','z'],dtype=object)[rng.choice(3,n,p=[.5,.3,.2])],
+                              'id':np.array(['u%d' % k for k in range(n)],dtype=object)})
+        test = pd.DataFrame({'a':np.array(['x','y','w'],dtype=object)[rng.choice(3,n,p=[.5,.4,.1])],
+                             'id':np.array(['u%d' % k for k in range(n)],dtype=object)})
+        test.loc[rng.rand(n)<.05,'a'] = np.nan
+
+        mo = CategoricalHero()
+        mo.shape_detector(train,test,['a','id'],sampled=True,sample_params={'size':4000,'random_state':0})
+        self.assertEqual(mo.n_sampled_,(4000,4000))
+        self.assertIn('a',mo.detected_)
+        for frame, side in ((train,'train'),(test,'test')):
+            table = mo.intervals_['a'][side]
+            truth = frame['a'].value_counts(normalize=True).reindex(table.index[:-1],fill_value=0.)
+            truth['% missings'] = frame['a'].isnull().mean()
+            self.assertTrue(np.all((table['Lower']<=truth)&(truth<=table['Upper'])),"Intervals cover the true frequencies")
+        self.assertEqual(mo.intervals_['a'].loc['w',('train','Frequency')],0.)
+        self.assertGreater(mo.intervals_['a'].loc['w',('train','Upper')],0.)
+        self.assertGreater(mo.missed_.loc['id','train'],.9,"Mostly unseen categories")
+        self.assertEqual(mo.missed_.loc['a','test'],0.)
+
+        mo.shape_detector(train,test,['a'],sampled=True,sample_params={'size':n,'tolerance':.03,'batch':1000,'random_state':0})
+        self.assertLess(max(mo.n_sampled_),n,"Early stop")
+
+        self.assertRaises(ValueError,mo.shape_detector,train,test,['a'],approximate=True,sampled=True)
+        self.assertRaises(ValueError,mo.shape_detector,train,test,['a'],sampled=True,sample_params={'rows':10})
+        self.assertRaises(ValueError,mo.shape_detector,iter([train]),test,['id'],sampled=True,numeric=['a'])
+
+    def test_multi(self):
+
+        train = pd.DataFrame({'a':['car','truck',np.nan,'bike'], 'b':['cat','dog','cheetah','lion']})
+        valid = pd.DataFrame({'a':['car','truck','bike','bike'], 'b':['cat','dog','lion','lion']})
+        test = pd.DataFrame({'a':['car','truck','tractor',np.nan], 'b':['cat','dog','lion','cat']})
+
+        mo = CategoricalHero()
+        self.assertRaises(ValueError,mo.shape_slicer_multi,[train,valid,test])
+        mo.shape_detector_multi([train,valid,test],['a','b'],names=['train','valid','test'])
+
+        self.assertEqual(mo.frames_,['train','valid','test'])
+        self.assertEqual(mo.mismatched_,['a','b'],"Checking mismatched features")
+        presence = mo.presence_['a']
+        self.assertEqual(list(presence.index),['bike','car','tractor','truck'])
+        self.assertEqual(list(presence['test']),[False,True,True,True])
+        self.assertEqual(list(presence['valid']),[True,True,False,True])
+        self.assertEqual(mo.frequency_['a'].loc['bike','valid'],0.5)
+        self.assertEqual(list(mo.frequency_['a'].loc['% missings']),[0.25,0.,0.25])
+
+        # pairwise detection agrees with the N-way one
+        pair = CategoricalHero()
+        pair.shape_detector(train,test,['a','b'])
+        self.assertEqual(pair.detected_,mo.mismatched_)
+
+        sliced = mo.shape_slicer_multi({'train':train,'test':test},reference=['train','valid'])
+        self.assertEqual(list(sliced['train']['a']),['car','truck','bike'],"Checking sliced data frame")
+        self.assertEqual(list(sliced['test']['b']),['cat','dog','cat'],"Checking sliced data frame")
+        masks = mo.shape_slicer_multi([train,valid,test],output="mask")
+        np.testing.assert_array_equal(masks['valid'],[True,True,False,False])
+        np.testing.assert_array_equal(mo.shape_slicer_multi({'test':test},output="index")['test'],[0,1,3])
+        self.assertRaises(ValueError,mo.shape_slicer_multi,[train],reference=['other'])
+
+class CategoricalImputerTest(unittest.TestCase):
+
+    def test_imputation(self):
+
+        rng = np.random.RandomState(1)
+        df = pd.DataFrame({'a':np.array(['x','y','z'],dtype=object)[rng.choice(3,20000,p=[.6,.3,.1])],
+                           'b':np.array(['p','q'],dtype=object)[rng.choice(2,20000)],
+                           'n':rng.rand(20000)})
+        df.loc[rng.rand(20000)<.3,'a'] = np.nan
+        df.loc[:9,'n'] = np.nan
+        original = df.copy()
+
+        mo = CategoricalImputer(random_state=0)
+        self.assertRaises(ValueError,mo.transform,df)
+        self.assertRaises(ValueError,mo.partial_fit,df)
+        out = mo.fit_transform(df,['a','b'])
+
+        self.assertTrue(df.equals(original),"Checking the input is not modified")
+        self.assertEqual(out['a'].isnull().sum(),0,"Checking imputed feature")
+        self.assertEqual(out['n'].isnull().sum(),10,"Checking features not fitted are untouched")
+        self.assertTrue(out['b'].equals(df['b']),"Checking features without missing values are untouched")
+        pd.testing.assert_series_equal(out['a'][df['a'].notnull()],df['a'][df['a'].notnull()])
+
+        frequencies = out['a'][df['a'].isnull()].value_counts(normalize=True)
+        np.testing.assert_allclose(frequencies[['x','y','z']].values,[.6,.3,.1],atol=.02)
+
+        coded = pd.DataFrame({'a':[1.,2.,np.nan,2.],'c':pd.Categorical(['p',None,'q','p'])})
+        self.assertEqual(list(CategoricalImputer(random_state=0).fit_transform(coded,['a','c']).dtypes),list(coded.dtypes),"Checking dtypes")
+
+        again = CategoricalImputer(random_state=0).fit_transform(df,['a','b'])
+        self.assertTrue(out.equals(again),"Checking the seed")
+
+        chunks = [df.iloc[:10000],df.iloc[10000:]]
+        streamed = CategoricalImputer(random_state=0).fit(iter(chunks),['a','b'])
+        np.testing.assert_allclose(streamed.probabilities_['a'],mo.probabilities_['a'])
+        out = pd.concat(list(streamed.transform_stream(chunks)))
+        self.assertEqual(out['a'].isnull().sum(),0,"Checking streamed imputation")
+
+class OrdinalEncoderTest(unittest.TestCase):
+
+    def test_encoding(self):
+
+        train = pd.DataFrame({'g1':['low','High','mid',np.nan], 'g2':['mid','mid','low','High'], 'o':['b','a','a','c']})
+        test = pd.DataFrame({'g1':['low','zzz'], 'g2':['High',np.nan], 'o':['c','a']}, index=['x','y'])
+
+        mo = OrdinalEncoder()
+        codes = mo.fit_transform(train,['g1','g2','o'])
+
+        self.assertEqual(list(mo.vocabularies_['g1']),['High','low','mid'],"Checking case insensitive sorting")
+        self.assertEqual([g for v,g in mo.groups_],[['g1','g2'],['o']],"Checking shared vocabularies")
+        self.assertEqual(list(codes['g1']),[1,0,2,-1],"Checking codes")
+        self.assertEqual(list(codes['o']),[1,0,0,2],"Checking codes")
+        self.assertTrue(all(dtype == np.int8 for dtype in codes.dtypes),"Checking compact dtypes")
+
+        codes = mo.transform(test)
+        self.assertEqual(list(codes.index),['x','y'],"Checking index")
+        self.assertEqual(list(codes['g1']),[1,-1],"Checking unknown categories")
+        self.assertEqual(list(codes['g2']),[0,-1],"Checking missing values")
+
+        self.assertRaises(ValueError,OrdinalEncoder('error').fit(train,['g1']).transform,test)
+
+        wide = pd.DataFrame({'w':['c%d' % k for k in range(300)]})
+        self.assertEqual(OrdinalEncoder().fit_transform(wide,['w'])['w'].dtype,np.int16,"Checking dtype promotion")
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,56 @@
+"""
+Author: Francesco Capponi <capponi.francesco87@gmail.com>
+
+License: BSD 3 clause
+
+"""
+
+
+
+import unittest
+from STLP_py import MissingData, CategoricalHero, Profiler
+import pandas as pd
+import numpy as np
+
+
+
+class ProfilerTest(unittest.TestCase):
+
+    def test_records(self):
+
+        train = pd.DataFrame({'a':['car','truck',np.nan,'bike'], 'b':['cat','dog','cheetah','lion']})
+        test = pd.DataFrame({'a':['car','truck','tractor','bike'], 'b':['cat','dog','lion','lion']})
+
+        seen = []
+        profiler = Profiler(memory=True, callback=seen.append)
+
+        mo = MissingData(profiler=profiler)
+        mo.count(train,['a','b'])
+        ch = CategoricalHero(profiler=profiler)
+        ch.shape_detector(train,test,['a','b'])
+        ch.shape_slicer(train,test,choice="both")
+
+        self.assertEqual(seen,profiler.records_,"Checking callback")
+        phases = set((r['owner'],r['phase']) for r in profiler.records_)
+        for phase in [('MissingData','nullcount'),('MissingData','build'),('CategoricalHero','value_counts'),
+                      ('CategoricalHero','frequency_table'),('CategoricalHero','isin'),('CategoricalHero','take')]:
+            self.assertIn(phase,phases,"Checking recorded phases")
+
+        nullcount = [r for r in profiler.records_ if r['phase']=='nullcount']
+        self.assertEqual([r['column'] for r in nullcount],['a','b'],"Checking per-column records")
+        self.assertEqual([r['rows'] for r in nullcount],[4,4],"Checking row counts")
+        self.assertTrue(all(r['seconds']>=0 and r['bytes'] is not None for r in profiler.records_))
+
+        summary = profiler.summary(by='column')
+        self.assertEqual(summary.loc['a','calls'],1+2+1+1+1,"Checking per-column summary")
+
+        # profiled and non profiled runs give the same results
+        ref = MissingData()
+        ref.count(train,['a','b'])
+        pd.testing.assert_frame_equal(mo.summary(),ref.summary())
+
+        profiler.reset()
+        self.assertEqual(profiler.records_,[])
+
+if __name__ == '__main__':
+    unittest.main()
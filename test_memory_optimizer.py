@@ -0,0 +1,72 @@
+"""
+Author: Francesco Capponi <capponi.francesco87@gmail.com>
+
+License: BSD 3 clause
+
+"""
+
+
+
+import unittest
+from STLP_py import MissingData, MemoryOptimizer
+import pandas as pd
+import numpy as np
+
+
+
+class MemoryOptimizerTest(unittest.TestCase):
+
+    def test_dtypes(self):
+
+        rng = np.random.RandomState(0)
+        n = 1000
+        df = pd.DataFrame({'s':np.array(['a','b','c'],dtype=object)[rng.randint(0,3,n)],
+                           'id':np.array(['u%d' % k for k in range(n)],dtype=object),
+                           'i':rng.randint(0,200,n).astype(np.int64),
+                           'u':rng.randint(0,200,n).astype(np.uint64),
+                           'neg':rng.randint(-1000,1000,n),
+                           'f':rng.rand(n),
+                           'half':rng.rand(n).astype(np.float32).astype(np.float64),
+                           'fi':np.where(rng.rand(n)<.2,np.nan,rng.randint(0,50,n).astype(float)),
+                           'sp':np.where(rng.rand(n)<.95,np.nan,rng.rand(n))})
+        original = df.copy()
+
+        md = MissingData()
+        md.count(df,list(df.columns))
+        mo = MemoryOptimizer()
+        out = mo.fit_transform(df,md)
+
+        expected = {'s':'category','id':'object','i':'int16','u':'uint8','neg':'int16','f':'float64',
+                    'half':'float32','fi':'Int8','sp':'Sparse[float64, nan]'}
+        self.assertEqual(dict(out.dtypes.astype(str)),expected,"Checking chosen dtypes")
+        self.assertTrue(df.equals(original),"Checking the input is not modified")
+
+        for i in df.columns:
+            restored = out[i].sparse.to_dense() if i == 'sp' else out[i]
+            pd.testing.assert_series_equal(restored.astype(df[i].dtype),df[i])
+
+        small = MemoryOptimizer().fit_transform(pd.DataFrame({'a':[1,2,3],'b':[2,5,9]}))
+        self.assertEqual(list(small['a']-small['b']),[-1,-3,-6],"Checking signed columns stay signed")
+
+        self.assertEqual(mo.bytes_before_,int(df.memory_usage(index=False,deep=True).sum()))
+        self.assertLess(mo.bytes_after_,mo.bytes_before_,"Checking bytes saved")
+        self.assertEqual(list(mo.report_.index),list(df.columns),"Checking report")
+
+        lossy = MemoryOptimizer(float_tolerance=1e-6).fit(df)
+        self.assertEqual(lossy.dtypes_['f'],np.float32,"Checking float tolerance")
+        self.assertRaises(ValueError,MemoryOptimizer().transform,df)
+
+        # missing values counted on another frame only hint at sparse columns
+        train = pd.DataFrame({'k':[1.,2.,3.,4.]})
+        test = pd.DataFrame({'k':[1.,np.nan,3.,4.]})
+        md.count(train,['k'])
+        self.assertEqual(str(MemoryOptimizer().fit_transform(test,md)['k'].dtype),'Int8')
+
+        # integral floats beyond the int64 range are not made nullable floats
+        huge = pd.DataFrame({'h':[1e20,np.nan,3e20,1.]})
+        mo = MemoryOptimizer(float_tolerance=0.)
+        self.assertEqual(mo.fit_transform(huge)['h'].dtype,np.float64)
+        self.assertLessEqual(mo.bytes_after_,mo.bytes_before_)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,15 @@ import unittest
 from STLP_py import MissingData
 import pandas as pd
 import numpy as np
+import os
+import tempfile
+import warnings
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
 
 """ Test data frame
 
@@ -59,6 +68,198 @@ class MissingDataTest(unittest.TestCase):
             for k in mo.transform(df).columns:
                 self.assertEqual(mo.transform(df)[k].all(),j[k].all(),"Checking transformed data frame data")
 
+    def test_count_stream(self):
+        df = pd.DataFrame(columns=['a','b','c','d'], index=['0','1','2'])
+        df.loc['0'] = pd.Series({'a':np.nan, 'b':5, 'c':2, 'd':np.nan})
+        df.loc['1'] = pd.Series({'a':np.nan, 'b':5, 'c':np.nan, 'd':np.nan})
+        df.loc['2'] = pd.Series({'a':np.nan, 'b':5, 'c':2, 'd':3})
+
+        ref = MissingData()
+        ref.count(df,['a','b','c','d'],.4)
+
+        chunks = [df.iloc[:2], df.iloc[2:]]
+        path = os.path.join(tempfile.mkdtemp(), 'df.csv')
+        df.to_csv(path, index=False)
+
+        for source in [chunks, iter(chunks), path, df]:
+            mo = MissingData()
+            mo.count_stream(source,['a','b','c','d'],.4,chunksize=2)
+            self.assertEqual(mo.support_,ref.support_,"Checking global support")
+            self.assertEqual(mo.support_filter_,ref.support_filter_,"Checking filtered support")
+            np.testing.assert_allclose(mo.summary().values.astype(float),ref.summary().values.astype(float))
+            self.assertEqual(mo.transform(df).shape,ref.transform(df).shape,"Checking transformed data frame shape")
+
+    def test_partial_fit_merge(self):
+        df = pd.DataFrame(columns=['a','b','c','d'], index=['0','1','2'])
+        df.loc['0'] = pd.Series({'a':np.nan, 'b':5, 'c':2, 'd':np.nan})
+        df.loc['1'] = pd.Series({'a':np.nan, 'b':5, 'c':np.nan, 'd':np.nan})
+        df.loc['2'] = pd.Series({'a':np.nan, 'b':5, 'c':2, 'd':3})
+
+        ref = MissingData()
+        ref.count(df,['a','b','c','d'],.4)
+
+        mo = MissingData()
+        mo.partial_fit(df.iloc[:1],['a','b','c','d'],.4)
+        mo.partial_fit(df.iloc[1:])
+        self.assertEqual(mo.support_,ref.support_,"Checking global support")
+        self.assertEqual(mo.support_filter_,ref.support_filter_,"Checking filtered support")
+        np.testing.assert_allclose(mo.summary().values.astype(float),ref.summary().values.astype(float))
+
+        mo1 = MissingData()
+        mo1.count(df.iloc[:2],['a','b','c','d'],.4)
+        mo2 = MissingData()
+        mo2.count(df.iloc[2:],['a','b','c','d'],.4)
+        mo1.merge(mo2)
+        self.assertEqual(mo1.support_,ref.support_,"Checking global support")
+        self.assertEqual(mo1.support_filter_,ref.support_filter_,"Checking filtered support")
+        np.testing.assert_allclose(mo1.summary().values.astype(float),ref.summary().values.astype(float))
+
+        self.assertRaises(ValueError,MissingData().merge,mo1)
+
+    @unittest.skipIf(pa is None, "pyarrow not installed")
+    def test_count_parquet(self):
+        df = pd.DataFrame({'a':[np.nan,np.nan,np.nan], 'b':[5.,5.,5.], 'c':[2.,np.nan,2.], 'd':[np.nan,np.nan,3.]})
+
+        ref = MissingData()
+        ref.count(df,['a','b','c','d'],.4)
+
+        folder = tempfile.mkdtemp()
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        pq.write_table(table, os.path.join(folder, 'stats.parquet'), row_group_size=2)
+        pq.write_table(table, os.path.join(folder, 'nostats.parquet'), row_group_size=2, write_statistics=False)
+
+        for source in [os.path.join(folder, 'stats.parquet'), os.path.join(folder, 'nostats.parquet'), table]:
+            mo = MissingData()
+            mo.count_parquet(source,['a','b','c','d'],.4)
+            self.assertEqual(mo.support_,ref.support_,"Checking global support")
+            self.assertEqual(mo.support_filter_,ref.support_filter_,"Checking filtered support")
+            np.testing.assert_allclose(mo.summary().values.astype(float),ref.summary().values.astype(float))
+
+        mo = MissingData()
+        mo.count_parquet(folder,['a','b','c','d'],.4)
+        np.testing.assert_allclose(mo.summary()['Percent'].values,ref.summary()['Percent'].values)
+        self.assertEqual(list(mo.summary()['Total']),[2*x for x in ref.summary()['Total']],"Checking counts over a directory")
+
+    def test_parallel(self):
+        rng = np.random.RandomState(0)
+        df = pd.DataFrame(rng.rand(50,6), columns=['a','b','c','d','e','f'])
+        df[df > .7] = np.nan
+        df['g'] = np.where(rng.rand(50) > .5, 'x', None)
+
+        ref = MissingData()
+        ref.count(df,list(df.columns),.3)
+
+        for backend in ['threading','processes']:
+            mo = MissingData(n_jobs=3, backend=backend)
+            mo.count(df,list(df.columns),.3)
+            pd.testing.assert_frame_equal(mo.summary(),ref.summary())
+            self.assertEqual(mo.support_,ref.support_,"Checking global support")
+
+        self.assertRaises(ValueError,MissingData(n_jobs=0).count,df,['a'])
+
+    def test_missing_patterns(self):
+        df = pd.DataFrame({'a':[np.nan,np.nan,np.nan,1.], 'b':[5.,5.,5.,5.], 'c':[2.,np.nan,2.,np.nan], 'd':[np.nan,np.nan,3.,4.]})
+
+        mo = MissingData()
+        mo.missing_patterns(df,['a','b','c','d'],chunksize=3)
+
+        mask = df.isnull().values.astype(float)
+        np.testing.assert_array_equal(mo.cooccurrence_.values,mask.T.dot(mask))
+        self.assertEqual(list(mo.cooccurrence_.index),['a','b','c','d'],"Checking co-occurrence labels")
+
+        patterns = dict(zip(mo.patterns_['Missing'],mo.patterns_['Total']))
+        self.assertEqual(patterns,{('a','d'):1,('a','c','d'):1,('a',):1,('c',):1},"Checking missingness patterns")
+        self.assertAlmostEqual(mo.patterns_['Percent'].sum(),1.)
+
+        # dense and sparse products agree
+        rng = np.random.RandomState(0)
+        dense = pd.DataFrame(rng.rand(300,20))
+        dense.columns = ['f%d' % j for j in range(20)]
+        dense[dense < .3] = np.nan
+        mo.missing_patterns(dense,list(dense.columns),chunksize=100,top=5)
+        mask = dense.isnull().values.astype(float)
+        np.testing.assert_array_equal(mo.cooccurrence_.values,mask.T.dot(mask))
+        self.assertEqual(len(mo.patterns_),5,"Checking top patterns")
+
+        # chunks without any missing value
+        with warnings.catch_warnings():
+            warnings.simplefilter('error',RuntimeWarning)
+            mo.missing_patterns(df.fillna(0.),['a','b','c','d'],chunksize=3)
+        self.assertEqual(mo.cooccurrence_.values.sum(),0)
+
+    def test_count_rows(self):
+        df = pd.DataFrame({'a':[np.nan,np.nan,np.nan,1.], 'b':[5.,5.,5.,5.], 'c':[2.,np.nan,2.,np.nan], 'd':[np.nan,np.nan,3.,4.]}, index=list('wxyz'))
+        labels = ['a','b','c','d']
+
+        ref = MissingData()
+        ref.count(df,labels,.4)
+        mo = MissingData()
+        mo.count_rows(df,labels,.4,row_threshold=.3,chunksize=3)
+        pd.testing.assert_frame_equal(mo.summary(),ref.summary())
+        self.assertEqual(mo.support_filter_,ref.support_filter_,"Same scan, same per-column results")
+
+        np.testing.assert_array_equal(mo.row_missing_.values,[2,3,1,1])
+        self.assertEqual(list(mo.row_missing_.index),list('wxyz'))
+        np.testing.assert_allclose(mo.row_percent_.values,[.5,.75,.25,.25])
+        self.assertEqual(list(mo.row_histogram_['Total']),[0,2,1,1,0])
+        self.assertEqual(mo.n_rows_filter_,2)
+
+        pd.testing.assert_frame_equal(mo.transform_rows(df,chunksize=3),df.loc[['y','z']])
+        np.testing.assert_array_equal(mo.transform_rows(df,threshold=.5,output='mask'),[True,False,True,True])
+        np.testing.assert_array_equal(mo.transform_rows(df,threshold=0.,output='index'),[])
+        self.assertIs(mo.transform_rows(df,threshold=1.),df,"Nothing removed, nothing copied")
+
+        # streamed input, histogram only
+        chunks = (df.iloc[k:k + 2] for k in range(0,4,2))
+        ms = MissingData()
+        ms.count_rows(chunks,labels,store=False)
+        pd.testing.assert_frame_equal(ms.row_histogram_,mo.row_histogram_)
+        self.assertFalse(hasattr(ms,'row_missing_'))
+
+        self.assertRaises(ValueError,MissingData().transform_rows,df)
+        self.assertRaises(ValueError,mo.transform_rows,df,output='rows')
+
+    def test_count_sample(self):
+        rng = np.random.RandomState(0)
+        n = 50000
+        df = pd.DataFrame({'a':np.where(rng.rand(n)<.3,np.nan,1.), 'b':np.where(rng.rand(n)<.001,np.nan,1.), 'c':np.ones(n)})
+        labels = ['a','b','c']
+        truth = df.isnull().mean().values
+
+        mo = MissingData()
+        mo.count_sample(df,labels,.2,size=5000,random_state=0)
+        self.assertEqual(mo.n_sampled_,5000)
+        self.assertEqual(list(mo.intervals_.columns),['Percent','Lower','Upper'])
+        self.assertTrue(np.all((mo.intervals_['Lower']<=truth)&(truth<=mo.intervals_['Upper'])),"Intervals cover the true fractions")
+        self.assertEqual(mo.intervals_.loc['c','Lower'],0.)
+        self.assertGreater(mo.intervals_.loc['c','Upper'],0.,"No missing value seen is not a certainty")
+        self.assertEqual(mo.support_filter_,['a'])
+
+        again = MissingData()
+        again.count_sample(df,labels,.2,size=5000,random_state=0)
+        pd.testing.assert_frame_equal(again.intervals_,mo.intervals_)
+
+        # early stop as soon as the intervals are narrow enough
+        mo.count_sample(df,labels,.2,size=n,tolerance=.02,batch=500,block=10,random_state=1)
+        self.assertLess(mo.n_sampled_,n)
+        self.assertTrue(np.all(mo.intervals_['Upper']-mo.intervals_['Lower']<=.04))
+
+        # single pass reservoir over a stream
+        chunks = (df.iloc[k:k + 7000] for k in range(0,n,7000))
+        mo.count_sample(chunks,labels,size=3000,random_state=0)
+        self.assertEqual(mo.n_sampled_,3000)
+        self.assertTrue(np.all((mo.intervals_['Lower']<=truth)&(truth<=mo.intervals_['Upper'])))
+
+        if pa is not None:
+            path = os.path.join(tempfile.mkdtemp(),'sample.parquet')
+            pq.write_table(pa.Table.from_pandas(df,preserve_index=False),path,row_group_size=1000)
+            mo.count_sample(path,labels,size=4500,random_state=0)
+            self.assertEqual(mo.n_sampled_,4500,"Whole row groups, the last one trimmed")
+
+        self.assertRaises(ValueError,mo.count_sample,df,labels,size=0)
+        self.assertRaises(ValueError,mo.count_sample,df,labels,confidence=1.)
+        self.assertRaises(ValueError,mo.count_sample,df,labels,tolerance=0.)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,92 @@
+"""
+Author: Francesco Capponi <capponi.francesco87@gmail.com>
+
+License: BSD 3 clause
+
+"""
+
+
+
+import unittest
+from STLP_py import GeneralizedESD
+from scipy import stats
+import pandas as pd
+import numpy as np
+
+
+
+def naive_esd(x, r, alpha):
+
+    # textbook generalized ESD, one feature at a time
+    x = x[~np.isnan(x)]
+    n = len(x)
+    R, lam = [], []
+    for i in range(1, r + 1):
+        if len(x) < 3:
+            break
+        deviation = np.abs(x - x.mean())
+        j = np.argmax(deviation)
+        R.append(deviation[j] / x.std(ddof=1))
+        t = stats.t.ppf(1 - alpha / (2 * (n - i + 1)), n - i - 1)
+        lam.append((n - i) * t / np.sqrt((n - i - 1 + t ** 2) * (n - i + 1)))
+        x = np.delete(x, j)
+    significant = [i + 1 for i in range(len(R)) if R[i] > lam[i]]
+    return (max(significant) if significant else 0), np.array(R)
+
+
+
+class GeneralizedESDTest(unittest.TestCase):
+
+    def setUp(self):
+
+        rng = np.random.RandomState(0)
+        self.df = pd.DataFrame(rng.randn(400, 12), columns=['x%d' % j for j in range(12)])
+        for j in range(12):
+            rows = rng.choice(400, j % 4, replace=False)
+            self.df.iloc[rows, j] += rng.choice([-1, 1], len(rows)) * rng.uniform(5, 9, len(rows))
+        self.df[rng.rand(400, 12) < .05] = np.nan
+        self.labels = list(self.df.columns)
+
+
+
+    def test_fit(self):
+
+        mo = GeneralizedESD(max_outliers=8).fit(self.df, self.labels)
+        for i in self.labels:
+            k, R = naive_esd(self.df[i].values, 8, .05)
+            self.assertEqual(mo.n_outliers_[i], k)
+            np.testing.assert_allclose(mo.statistics_['R'][i].values[:len(R)], R)
+            self.assertEqual(len(mo.outliers_[i]), k)
+        self.assertTrue((mo.n_outliers_.values >= np.arange(12) % 4).all())
+
+        kept = mo.transform(self.df)
+        for i in self.labels:
+            self.assertFalse(kept[i].isin(mo.outliers_[i]).any())
+        mask = mo.transform(self.df, output='mask')
+        self.assertEqual(mask.sum(), len(kept))
+        np.testing.assert_array_equal(mo.transform(self.df, output='index'), np.flatnonzero(mask))
+
+
+
+    def test_fit_stream(self):
+
+        mo = GeneralizedESD(max_outliers=8).fit(self.df, self.labels)
+        chunks = (self.df.iloc[k:k + 33] for k in range(0, len(self.df), 33))
+        ms = GeneralizedESD(max_outliers=8).fit_stream(chunks, self.labels)
+        pd.testing.assert_series_equal(ms.n_outliers_, mo.n_outliers_)
+        pd.testing.assert_frame_equal(ms.statistics_, mo.statistics_)
+
+
+
+    def test_errors(self):
+
+        mo = GeneralizedESD()
+        self.assertRaises(ValueError, mo.transform, self.df)
+        self.assertRaises(ValueError, mo.fit, self.df, 'x0')
+        self.assertRaises(ValueError, GeneralizedESD(max_outliers=0).fit, self.df, self.labels)
+        self.assertRaises(ValueError, GeneralizedESD(alpha=2).fit, self.df, self.labels)
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+"""
+Author: Francesco Capponi <capponi.francesco87@gmail.com>
+
+License: BSD 3 clause
+
+"""
+
+
+
+import unittest
+import json
+import os
+import subprocess
+import sys
+
+
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+
+def loaded(statement):
+
+    # heavy modules loaded by statement, in a fresh interpreter
+    script = '%s\nimport sys, json\nprint(json.dumps([m for m in ("pandas", "numpy", "scipy") if m in sys.modules]))' % statement
+    return json.loads(subprocess.check_output([sys.executable, '-c', script], cwd=ROOT).decode().strip().splitlines()[-1])
+
+
+
+class PackageTest(unittest.TestCase):
+
+    def test_lazy(self):
+
+        self.assertEqual(loaded('import STLP_py'), [])
+        self.assertNotIn('scipy', loaded('from STLP_py import MissingData, CategoricalHero, GeneralizedESD, Pipeline'))
+
+
+
+    def test_attributes(self):
+
+        import STLP_py
+        for name in STLP_py.__all__:
+            self.assertTrue(isinstance(getattr(STLP_py, name), type) or callable(getattr(STLP_py, name)))
+            self.assertIn(name, dir(STLP_py))
+        self.assertRaises(AttributeError, getattr, STLP_py, 'NotAClass')
+
+
+
+if __name__ == '__main__':
+    unittest.main()
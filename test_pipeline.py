@@ -0,0 +1,80 @@
+"""
+Author: Francesco Capponi <capponi.francesco87@gmail.com>
+
+License: BSD 3 clause
+
+"""
+
+
+
+import unittest
+from STLP_py import MissingData, CategoricalHero, Pipeline
+import pandas as pd
+import numpy as np
+
+
+
+class PipelineTest(unittest.TestCase):
+
+    def setUp(self):
+
+        rng = np.random.RandomState(0)
+        n = 500
+        categories = np.array(['u', 'v', 'w', 'x', np.nan], dtype=object)
+        self.X = pd.DataFrame({'a': categories[rng.randint(0, 5, n)],
+                               'b': np.where(rng.rand(n) < .01, 'only_train', categories[rng.randint(0, 4, n)]).astype(object),
+                               'sparse': np.where(rng.rand(n) < .5, np.nan, categories[rng.randint(0, 4, n)]),
+                               'n': np.where(rng.rand(n) < .05, np.nan, rng.randn(n)),
+                               'gap': np.where(rng.rand(n) < .6, np.nan, rng.randn(n))})
+        self.Y = pd.DataFrame({'a': np.where(rng.rand(n) < .02, 'only_test', categories[rng.randint(0, 5, n)]).astype(object),
+                               'b': categories[rng.randint(0, 4, n)],
+                               'sparse': categories[rng.randint(0, 4, n)],
+                               'n': rng.randn(n),
+                               'gap': rng.randn(n)})
+        # categorical dtype, with categories unused in train
+        self.X['c'] = pd.Categorical(rng.choice(['p', 'q'], n), categories=['p', 'q', 'r'])
+        self.Y['c'] = pd.Categorical(rng.choice(['p', 'q', 'r'], n), categories=['p', 'q', 'r'])
+        self.labels = list(self.X.columns)
+
+
+
+    def test_equivalence(self):
+
+        for choice in ('train', 'test', 'both'):
+            md = MissingData()
+            md.count(self.X, self.labels, 0.3)
+            X = md.transform(self.X)
+            Y = self.Y.drop(md.support_filter_, axis=1)
+            ch = CategoricalHero()
+            ch.shape_detector(X, Y, ['a', 'b', 'c'], drift=True)
+            X, Y = ch.shape_slicer(X, Y, choice=choice)
+
+            mo = Pipeline(threshold=0.3, choice=choice, drift=True)
+            A, B = mo.fit_transform(self.X, self.Y, self.labels)
+            pd.testing.assert_frame_equal(A, X)
+            pd.testing.assert_frame_equal(B, Y)
+            self.assertEqual(sorted(mo.dropped_), ['gap', 'sparse'])
+            pd.testing.assert_frame_equal(mo.missing_.summary(), md.summary())
+            self.assertEqual(mo.hero_.detected_, ch.detected_)
+            for i in ch.detected_:
+                pd.testing.assert_frame_equal(mo.hero_.detector_[i], ch.detector_[i])
+            pd.testing.assert_frame_equal(mo.hero_.drift_, ch.drift_)
+
+        mask1, mask2 = mo.fit_transform(self.X, self.Y, self.labels, output='mask')
+        self.assertEqual(mask1.sum(), len(A))
+        np.testing.assert_array_equal(mo.fit_transform(self.X, self.Y, self.labels, output='index')[1], np.flatnonzero(mask2))
+
+
+
+    def test_untouched(self):
+
+        X = self.X[['n']].fillna(0.)
+        A, B = Pipeline().fit_transform(X, X, ['n'])
+        self.assertIs(A, X, "Nothing removed, nothing copied")
+        self.assertRaises(ValueError, Pipeline(choice='none').fit_transform, X, X, ['n'])
+        self.assertRaises(ValueError, Pipeline().fit_transform, X, X, ['n'], categorical=['a'])
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+"""
+Author: Francesco Capponi <capponi.francesco87@gmail.com>
+
+License: BSD 3 clause
+
+"""
+
+
+
+import unittest
+from STLP_py import HyperLogLog, CountMinSketch, BloomFilter, ColumnSketch, hash_values
+import pandas as pd
+import numpy as np
+
+
+
+class SketchesTest(unittest.TestCase):
+
+    def test_hyperloglog(self):
+
+        hashes = hash_values(np.arange(100000))
+        sketch = HyperLogLog(14).update(hashes)
+        self.assertLess(abs(sketch.estimate()/100000. - 1), 0.05, "Checking cardinality estimate")
+
+        first = HyperLogLog(14).update(hashes[:60000])
+        second = HyperLogLog(14).update(hashes[40000:])
+        np.testing.assert_array_equal(first.merge(second).registers_, sketch.registers_)
+        self.assertRaises(ValueError, first.merge, HyperLogLog(10))
+
+    def test_countmin(self):
+
+        values = np.r_[np.zeros(1000), np.arange(1, 20000)]
+        sketch = CountMinSketch(0.001, 0.99).update(hash_values(values))
+        estimates = sketch.estimate(hash_values(np.arange(0, 100.)))
+        self.assertTrue((estimates[1:] >= 1).all(), "Checking counts are never underestimated")
+        self.assertLessEqual(estimates[0] - 1000, 0.001*len(values), "Checking error bound")
+
+        half = CountMinSketch(0.001, 0.99).update(hash_values(values[:5000]))
+        half.merge(CountMinSketch(0.001, 0.99).update(hash_values(values[5000:])))
+        np.testing.assert_array_equal(half.table_, sketch.table_)
+
+    def test_bloom(self):
+
+        hashes = hash_values(np.arange(20000))
+        bloom = BloomFilter(10000, 0.01).update(hashes[:10000])
+        self.assertTrue(bloom.contains(hashes[:10000]).all(), "Checking no false negatives")
+        self.assertLess(bloom.contains(hashes[10000:]).mean(), 0.03, "Checking false positive rate")
+
+    def test_column_sketch(self):
+
+        column = pd.Series(['a', 'b', np.nan, 'a', 'c', np.nan])
+        sketch = ColumnSketch(capacity=100).update(column[:3]).merge(ColumnSketch(capacity=100).update(column[3:]))
+        self.assertEqual(sketch.n_rows_, 6, "Checking number of observations")
+        self.assertEqual(sketch.n_nulls_, 2, "Checking number of missing values")
+        self.assertEqual(list(sketch.cms_.estimate(hash_values(np.array(['a'], dtype=object)))), [2])
+        self.assertAlmostEqual(sketch.hll_.estimate(), 3, 1)
+
+if __name__ == '__main__':
+    unittest.main()